@@ -4,19 +4,28 @@ from dataclasses import dataclass
 from pathlib import Path
 import re
 import sys
-from typing import Any, List, Optional
+from typing import TYPE_CHECKING, List, Optional
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(PROJECT_ROOT))
 
-import streamlit as st
+import streamlit as st  # noqa: E402
 
-from src.agent.prompts import SYSTEM_PROMPT
-from src.config.settings import Settings
-from src.llm.openai_client import OpenAIClient
-from src.retrieval.qdrant_store import get_client, search
-from src.schemas import AnswerResult, Citation
-from src.utils.text import join_nonempty
+from src.agent.prompts import SYSTEM_PROMPT  # noqa: E402
+from src.agent.warmup import Warmup, start_warmup  # noqa: E402
+from src.llm.openai_client import OpenAIClient  # noqa: E402
+from src.retrieval.courses import list_courses, list_titles  # noqa: E402
+from src.retrieval.query_cache import get_query_cache  # noqa: E402
+from src.retrieval.retriever import search_rows  # noqa: E402
+from src.schemas import AnswerResult, Citation  # noqa: E402
+from src.utils.text import join_nonempty  # noqa: E402
+from src.utils.tracing import span, traced  # noqa: E402
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+CONFIG_PATH = PROJECT_ROOT / "config.yaml"
+ALL_COURSES = "All courses"
 
 
 # UI styling
@@ -67,6 +76,7 @@ class UIStyle:
     output_mode: str
     length: str
     context_breadth: str
+    diversify: bool = False
 
 
 def _looks_like_graded_work(q: str) -> bool:
@@ -97,46 +107,72 @@ def _top_k_for_breadth(breadth: str, default_k: int) -> int:
     return default_k
 
 
+@st.cache_resource
+def _warmup() -> Warmup:
+    # Started once per server process; runs while the first page renders.
+    return start_warmup(CONFIG_PATH)
+
+
 def _load_cfg() -> Settings:
-    
-    return Settings.load().resolve_paths(PROJECT_ROOT)
+    from src.config.settings import Settings
 
+    return Settings.snapshot(CONFIG_PATH)
 
-@st.cache_data(ttl=300)
-def _list_available_titles() -> List[str]:
-    cfg = _load_cfg()
-    client = get_client(cfg)
 
-    titles: set[str] = set()
-    offset: Optional[Any] = None
+def _course_cfg(cfg: Settings) -> Settings:
+    # With course shards, scope retrieval to the course picked in the sidebar.
+    course = st.session_state.get("course")
+    if not cfg.course_shards or not course or course == ALL_COURSES:
+        return cfg
+    return cfg.override(course=course)
 
-    max_points = 4000
-    seen = 0
 
-    while seen < max_points:
-        points, next_offset = client.scroll(
-            collection_name=cfg.qdrant_collection,
-            limit=256,
-            offset=offset,
-            with_payload=True,
-            with_vectors=False,
-        )
+def _llm(cfg: Settings) -> OpenAIClient:
+    warm = _warmup()
+    if warm.ready and warm.cfg is cfg and warm.llm is not None:
+        return warm.llm
+    return OpenAIClient(cfg)
+
 
-        if not points:
-            break
+# The first render waits at most this long for the titles fetched by warm-up.
+_WARMUP_WAIT_S = 0.25
 
-        for p in points:
-            payload = p.payload or {}
-            title = payload.get("title") or payload.get("filename") or payload.get("doc_id")
-            if isinstance(title, str) and title.strip():
-                titles.add(title.strip())
 
-        seen += len(points)
-        if next_offset is None:
-            break
-        offset = next_offset
+def _list_available_titles(course: Optional[str] = None) -> List[str]:
+    warm = _warmup()
+    # The first render reuses the catalog fetched during warm-up, if it is
+    # already there; later renders use the cached direct lookup.
+    if course is None and warm.wait(timeout=_WARMUP_WAIT_S):
+        if warm.cfg is _load_cfg() and warm.titles is not None:
+            titles, warm.titles = warm.titles, None
+            return titles
 
-    return sorted(titles)
+    titles = _lookup_titles(course)
+    if not titles and not warm.ready:
+        # The store may still be connecting; look again once warm-up is done.
+        _lookup_titles.clear()
+        _rerun_when_warm()
+    return titles
+
+
+@st.cache_data(ttl=300)
+def _lookup_titles(course: Optional[str] = None) -> List[str]:
+    cfg = _load_cfg()
+    if course is not None:
+        cfg = cfg.override(course=course)
+    # One read of the document catalog; no payload scroll.
+    return list_titles(cfg)
+
+
+@st.fragment(run_every=0.5)
+def _rerun_when_warm() -> None:
+    if _warmup().ready:
+        st.rerun()
+
+
+@st.cache_data(ttl=300)
+def _list_available_courses() -> List[str]:
+    return list_courses(_load_cfg())
 
 
 def _build_context(citations: List[Citation]) -> str:
@@ -187,34 +223,36 @@ If context is insufficient, say what is missing and what to look for.
 """.strip()
 
 
+@traced("retrieve")
 def _retrieve_citations(
     question: str,
     *,
     top_k: int,
     selected_titles: List[str],
     source: str = "pdf",
+    diversify: bool = False,
 ) -> List[Citation]:
-    cfg = _load_cfg()
-    llm = OpenAIClient(cfg)
+    with span("settings"):
+        cfg = _load_cfg()
+        llm = _llm(cfg)
 
-    query_emb = llm.embed_texts([question])[0]
-    rows = search(
-        get_client(cfg),
-        cfg.qdrant_collection,
+    with span("embed_query"):
+        query_emb = get_query_cache(cfg).embed(llm.embed_texts, [question])[0]
+    cfg = _course_cfg(cfg)
+    rows = search_rows(
+        cfg,
+        question,
         query_emb,
-        top_k=top_k * 6,
+        top_k=top_k,
         source=source,
+        titles=selected_titles,
+        mmr=diversify,
     )
 
-    selected = {t.strip().lower() for t in selected_titles if t.strip()}
     citations: List[Citation] = []
 
     for score, payload in rows:
         title = (payload.get("title") or payload.get("filename") or payload.get("doc_id") or "").strip()
-        title_l = title.lower()
-
-        if selected and title_l not in selected:
-            continue
 
         quote = payload.get("text") or ""
         chunk_id = payload.get("chunk_id")
@@ -229,12 +267,10 @@ def _retrieve_citations(
             )
         )
 
-        if len(citations) >= top_k:
-            break
-
     return citations
 
 
+@traced("ask_rag")
 def ask_rag(
     question: str,
     *,
@@ -250,6 +286,7 @@ def ask_rag(
         top_k=top_k,
         selected_titles=selected_titles,
         source="pdf",
+        diversify=style.diversify,
     )
 
     if not citations:
@@ -259,13 +296,13 @@ def ask_rag(
             warnings=["No relevant context retrieved from the current knowledge base."],
         )
 
-    context = _build_context(citations)
-    llm = OpenAIClient(cfg)
+    with span("prompt"):
+        context = _build_context(citations)
+        system_prompt = _build_system_prompt(style, allow_code=allow_code)
+        user_prompt = _build_user_prompt(question, context, selected_titles)
+    llm = _llm(cfg)
 
-    answer = llm.chat(
-        _build_system_prompt(style, allow_code=allow_code),
-        _build_user_prompt(question, context, selected_titles),
-    )
+    answer = llm.chat(system_prompt, user_prompt)
 
     warnings: List[str] = []
     if _looks_like_graded_work(question):
@@ -365,6 +402,8 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+_warmup()
+
 st.markdown(_RED_PRIMARY_CSS, unsafe_allow_html=True)
 
 st.markdown(
@@ -380,7 +419,15 @@ st.markdown(
 with st.sidebar:
     st.header("AI-TA Controls")
 
-    titles = _list_available_titles()
+    course = None
+    if _load_cfg().course_shards:
+        course = st.selectbox(
+            "Course",
+            [ALL_COURSES] + _list_available_courses(),
+            key="course",
+            help="Search one course's books, or all courses at once.",
+        )
+    titles = _list_available_titles(None if course in (None, ALL_COURSES) else course)
 
     st.multiselect(
         "Books to use (optional filter)",
@@ -400,6 +447,11 @@ with st.sidebar:
     )
     length = st.selectbox("Answer length", ["Short", "Normal", "Detailed"], index=1)
     context_breadth = st.selectbox("Context breadth", ["Narrow", "Normal", "Wide"], index=1)
+    diversify = st.checkbox(
+        "Skip near-duplicate passages",
+        value=_load_cfg().mmr,
+        help="Prefer passages that add new information over overlapping ones.",
+    )
 
     allow_code = output_mode == "Explanation + Python snippet"
 
@@ -419,6 +471,7 @@ style = UIStyle(
     output_mode=output_mode,
     length=length,
     context_breadth=context_breadth,
+    diversify=diversify,
 )
 
 tab_chat, tab_sources, tab_study, tab_about, tab_help = st.tabs(
@@ -530,7 +583,7 @@ Output requirements:
 """.strip()
 
         cfg = _load_cfg()
-        llm = OpenAIClient(cfg)
+        llm = _llm(cfg)
 
         with right:
             st.markdown("**Settings**")
@@ -2,15 +2,31 @@ from __future__ import annotations
 
 import argparse
 
-from src.indexing.index_build import index_pdfs
+from src.config.settings import Settings
+from src.indexing.index_build import format_report, index_pdfs
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--reset", action="store_true")
+    parser.add_argument(
+        "--blue-green",
+        action="store_true",
+        help=(
+            "with --reset: build a new version and switch the alias once it "
+            "passes smoke checks"
+        ),
+    )
     args = parser.parse_args()
 
-    index_pdfs(reset=args.reset)
+    cfg = Settings.snapshot().override(blue_green=True if args.blue_green else None)
+    stats = index_pdfs(reset=args.reset, cfg=cfg)
+    print("\n".join(format_report(stats)))
+    if stats.chunks_resumed or stats.embeddings_reused:
+        print(
+            f"resumed: {stats.chunks_resumed} chunks already written, "
+            f"{stats.embeddings_reused} embeddings reused from the journal"
+        )
 
 
 if __name__ == "__main__":
@@ -18,4 +34,5 @@ if __name__ == "__main__":
 
 # Run when needed:
 #python scripts/01_index_pdfs.py
-#python scripts/01_index_pdfs.py --reset
\ No newline at end of file
+#python scripts/01_index_pdfs.py --reset
+#python scripts/01_index_pdfs.py --reset --blue-green
@@ -4,33 +4,66 @@ import argparse
 
 from src.config.settings import Settings
 from src.llm.openai_client import OpenAIClient
-from src.retrieval.qdrant_store import get_client, search
+from src.retrieval.courses import course_settings
+from src.retrieval.qdrant_store import (
+    get_client,
+    qdrant_guard,
+    search_params,
+    search_with_stats,
+)
+from src.retrieval.side_store import get_side_store
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("query", type=str)
     parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--source", type=str, default=None)
+    parser.add_argument(
+        "--title",
+        action="append",
+        default=[],
+        help="Restrict to a book title; repeatable.",
+    )
+    parser.add_argument("--min-score", type=float, default=None)
+    parser.add_argument(
+        "--course",
+        type=str,
+        default=None,
+        help="Course shard to query (store.course_shards).",
+    )
     args = parser.parse_args()
 
-    cfg = Settings.load()
+    cfg = Settings.snapshot()
+    if args.course:
+        cfg = course_settings(cfg, args.course)
     llm = OpenAIClient(cfg)
     client = get_client(cfg)
 
     embedding = llm.embed_texts([args.query])[0]
 
-    rows = search(
+    rows, stats = search_with_stats(
         client,
         cfg.qdrant_collection,
         embedding,
         top_k=args.top_k or cfg.top_k,
+        source=args.source,
+        titles=args.title,
+        min_score=args.min_score,
+        params=search_params(cfg.tuning_profile()),
+        guard=qdrant_guard(cfg),
     )
 
-    for score, payload in rows:
+    for score, payload in get_side_store(cfg).hydrate(rows):
         print(score, payload.get("doc_id"), payload.get("chunk_id"))
         print(payload.get("text", "")[:400])
         print()
-        
+
+    print(
+        f"hits={stats.hits} limit={stats.limit} filtered={stats.filtered} "
+        f"payload_bytes={stats.payload_bytes} latency_ms={stats.latency_ms:.1f}"
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Modules on the app's import path, and the heavy dependencies that should stay
+# unloaded until a client is first needed.
+APP_MODULES = [
+    "src.config.settings",
+    "src.llm.openai_client",
+    "src.retrieval.qdrant_store",
+    "src.agent.pipeline",
+    "src.agent.warmup",
+]
+HEAVY_MODULES = ["openai", "qdrant_client", "pydantic_settings"]
+
+_IMPORT_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+loaded = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+_ANSWER_PROBE = """
+import json, time
+t0 = time.perf_counter()
+from src.agent.warmup import start_warmup
+warm = start_warmup()
+from src.agent.pipeline import ask
+t_import = time.perf_counter() - t0
+warm.wait()
+t_warm = time.perf_counter() - t0
+result = ask({question!r})
+t_answer = time.perf_counter() - t0
+print(json.dumps({{
+    "import_s": t_import,
+    "warmup_s": t_warm,
+    "first_answer_s": t_answer,
+    "warmup_steps": warm.timings,
+    "warmup_errors": warm.errors,
+    "citations": len(result.citations),
+}}))
+"""
+
+
+def _run_probe(code: str) -> Dict[str, Any]:
+    # Every probe runs in a fresh interpreter so nothing is already imported.
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def measure_imports(repeat: int) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    for module in APP_MODULES:
+        runs = [
+            _run_probe(_IMPORT_PROBE.format(module=module, heavy=HEAVY_MODULES))
+            for _ in range(repeat)
+        ]
+        rows.append(
+            {
+                "module": module,
+                "best_s": min(r["seconds"] for r in runs),
+                "heavy_loaded": runs[0]["loaded"],
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Report import time and time-to-first-answer."
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--question",
+        type=str,
+        default=None,
+        help="Also measure a cold ask() end to end (needs OpenAI and Qdrant).",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"imports": measure_imports(max(1, args.repeat))}
+    if args.question:
+        report["first_answer"] = _run_probe(
+            _ANSWER_PROBE.format(question=args.question)
+        )
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for row in report["imports"]:
+        heavy = ", ".join(row["heavy_loaded"]) or "-"
+        print(f"{row['module']:<32} {row['best_s'] * 1000:8.1f} ms   heavy: {heavy}")
+
+    if "first_answer" in report:
+        fa = report["first_answer"]
+        print()
+        print(f"import          {fa['import_s']:.2f} s")
+        print(f"warm-up done    {fa['warmup_s']:.2f} s  {fa['warmup_steps']}")
+        print(
+            f"first answer    {fa['first_answer_s']:.2f} s  "
+            f"({fa['citations']} citations)"
+        )
+        if fa["warmup_errors"]:
+            print(f"warm-up errors  {fa['warmup_errors']}")
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# python scripts/04_startup_bench.py
+# python scripts/04_startup_bench.py --question "What is overfitting?"
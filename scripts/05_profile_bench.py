@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.config.settings import Settings
+from src.retrieval.qdrant_store import (
+    ensure_collection,
+    estimate_ram_bytes,
+    get_client,
+    search_params,
+)
+
+
+def _sample_vectors(client, collection: str, limit: int) -> np.ndarray:
+    vectors: List[List[float]] = []
+    offset = None
+    while len(vectors) < limit:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=min(256, limit - len(vectors)),
+            offset=offset,
+            with_payload=False,
+            with_vectors=True,
+        )
+        vectors.extend(p.vector for p in points)
+        if offset is None or not points:
+            break
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _synthetic_vectors(n: int, dim: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    # A few hundred topic centres make the data clustered like real chunks.
+    centres = rng.standard_normal((max(8, n // 50), dim)).astype(np.float32)
+    assign = rng.integers(0, len(centres), size=n)
+    return centres[assign] + 0.35 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+
+
+def _wait_green(client, collection: str, timeout_s: float = 600.0) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        info = client.get_collection(collection)
+        if str(getattr(info.status, "value", info.status)) == "green":
+            return
+        time.sleep(0.5)
+
+
+def bench_profile(
+    client, cfg: Settings, name: str, vectors: np.ndarray, queries: np.ndarray, k: int
+) -> Dict:
+    from qdrant_client.models import PointStruct
+
+    profile = cfg.tuning_profile(name)
+    collection = f"{cfg.qdrant_collection}__bench_{name}"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    ensure_collection(client, collection, vector_size=vectors.shape[1], profile=profile)
+
+    for start in range(0, len(vectors), 256):
+        batch = vectors[start : start + 256]
+        client.upsert(
+            collection_name=collection,
+            points=[
+                PointStruct(id=start + i, vector=v.tolist(), payload={})
+                for i, v in enumerate(batch)
+            ],
+        )
+    _wait_green(client, collection)
+
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :k]
+    params = search_params(profile)
+    latencies: List[float] = []
+    hits = 0
+    for q, expected in zip(queries, truth):
+        t = time.perf_counter()
+        res = client.query_points(
+            collection_name=collection, query=q.tolist(), limit=k, search_params=params
+        )
+        latencies.append((time.perf_counter() - t) * 1000.0)
+        hits += len({p.id for p in res.points} & set(expected.tolist()))
+
+    client.delete_collection(collection)
+    ram = estimate_ram_bytes(profile, len(vectors), vectors.shape[1])
+    return {
+        "profile": name,
+        "ram_mb": ram["total"] / 1e6,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "recall": hits / float(len(queries) * k),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare collection tuning profiles on a live Qdrant."
+    )
+    parser.add_argument("--profiles", nargs="*", default=None)
+    parser.add_argument("--points", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument(
+        "--synthetic", action="store_true", help="Use random clustered vectors."
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cfg = Settings.snapshot()
+    client = get_client(cfg)
+
+    if args.synthetic:
+        vectors = _synthetic_vectors(args.points, cfg.embedding_dim, args.seed)
+    else:
+        vectors = _sample_vectors(client, cfg.qdrant_collection, args.points)
+    vectors = _normalize(vectors)
+
+    rng = np.random.default_rng(args.seed)
+    picks = rng.integers(0, len(vectors), size=args.queries)
+    queries = _normalize(
+        vectors[picks] + 0.05 * rng.standard_normal((args.queries, vectors.shape[1]))
+    )
+
+    names = args.profiles or sorted(cfg.collection_profiles)
+    print(
+        f"{len(vectors)} points x {vectors.shape[1]} dims, "
+        f"{len(queries)} queries, k={args.top_k}"
+    )
+    print(f"{'profile':<12} {'ram_mb':>8} {'p50_ms':>8} {'p95_ms':>8} {'recall':>7}")
+    for name in names:
+        row = bench_profile(
+            client, cfg, name, vectors, queries.astype(np.float32), args.top_k
+        )
+        print(
+            f"{row['profile']:<12} {row['ram_mb']:8.2f} {row['p50_ms']:8.2f} "
+            f"{row['p95_ms']:8.2f} {row['recall']:7.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# python scripts/05_profile_bench.py
+# python scripts/05_profile_bench.py --synthetic --points 20000
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from src.config.settings import Settings
+from src.indexing.snapshot import export_bundle, import_bundle
+from src.retrieval.store_base import get_vector_store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Export or import a packed index bundle."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    exp = sub.add_parser(
+        "export", help="Write the configured store to a bundle directory."
+    )
+    exp.add_argument("out", type=Path)
+    exp.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+
+    imp = sub.add_parser("import", help="Bulk-load a bundle into the configured store.")
+    imp.add_argument("bundle", type=Path)
+    imp.add_argument(
+        "--reset",
+        action="store_true",
+        help="Drop the target store, its side store and document vectors first.",
+    )
+    imp.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore embed model/chunking mismatches and missing chunk text.",
+    )
+
+    args = parser.parse_args()
+    cfg = Settings.snapshot()
+    store = get_vector_store(cfg)
+
+    if args.command == "export":
+        stats = export_bundle(store, args.out, cfg, dtype=args.dtype)
+        verb = "exported"
+    else:
+        stats = import_bundle(
+            args.bundle, store, cfg, force=args.force, reset=args.reset
+        )
+        verb = "imported"
+
+    rate = stats.points / stats.seconds if stats.seconds > 0 else 0.0
+    print(
+        f"{verb} {stats.points} points (dim {stats.dim}) in {stats.seconds:.2f}s "
+        f"({rate:.0f} points/s, {stats.bytes_on_disk / 1e6:.1f} MB on disk)"
+    )
+    if stats.doc_vectors:
+        print(f"rebuilt {stats.doc_vectors} document vectors")
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# python scripts/06_index_snapshot.py export data/artifacts/index_bundle
+# python scripts/06_index_snapshot.py import data/artifacts/index_bundle --reset
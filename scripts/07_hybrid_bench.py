@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import Settings
+from src.llm.openai_client import OpenAIClient
+from src.retrieval.side_store import SideStore, get_side_store
+from src.retrieval.sparse import SparseVocab, load_vocab, tokenize
+from src.retrieval.store_base import VectorStore, get_vector_store
+
+
+def _load_queries(path: Path) -> List[Tuple[str, str]]:
+    out: List[Tuple[str, str]] = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        if line.strip():
+            row = json.loads(line)
+            out.append((row["query"], row["chunk_id"]))
+    return out
+
+
+def _probe_queries(
+    store: VectorStore,
+    side: SideStore,
+    vocab: SparseVocab,
+    n: int,
+    terms: int,
+    seed: int,
+) -> List[Tuple[str, str]]:
+    """Exact-term probes: the rarest words of randomly sampled chunks."""
+    chunks: List[Tuple[str, str]] = []
+    for _, _, payloads in store.iter_points(1024):
+        payloads = side.hydrate_payloads(payloads)
+        chunks.extend((p.get("chunk_id") or "", p.get("text") or "") for p in payloads)
+
+    rng = random.Random(seed)
+    rng.shuffle(chunks)
+
+    out: List[Tuple[str, str]] = []
+    for chunk_id, text in chunks:
+        words = {
+            t
+            for t in tokenize(text)
+            if len(t) > 2 and not t.isdigit() and t in vocab.terms
+        }
+        if len(words) < terms:
+            continue
+        rare = sorted(words, key=lambda t: (vocab.df[vocab.terms[t]], t))[:terms]
+        out.append((" ".join(rare), chunk_id))
+        if len(out) >= n:
+            break
+    return out
+
+
+def _run(
+    store: VectorStore,
+    embeddings: List[List[float]],
+    queries: List[Tuple[str, str]],
+    k: int,
+    vocab: Optional[SparseVocab],
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    hits = 0
+    for emb, (text, chunk_id) in zip(embeddings, queries):
+        sparse = vocab.encode_query(text) if vocab is not None else None
+        if sparse is not None and not sparse[0]:
+            sparse = None
+        t = time.perf_counter()
+        rows = store.search(emb, top_k=k, sparse=sparse)
+        latencies.append((time.perf_counter() - t) * 1000.0)
+        hits += any(p.get("chunk_id") == chunk_id for _, p in rows)
+    return {
+        "recall": hits / float(len(queries)),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare dense-only and hybrid retrieval recall/latency."
+    )
+    parser.add_argument(
+        "--queries", type=Path, default=None, help='JSONL of {"query", "chunk_id"}.'
+    )
+    parser.add_argument(
+        "--probes", type=int, default=100, help="Auto-generated exact-term probes."
+    )
+    parser.add_argument(
+        "--terms", type=int, default=2, help="Rare words per probe query."
+    )
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument(
+        "--dense-k",
+        type=int,
+        nargs="*",
+        default=[64, 256, 1000],
+        help="Larger dense candidate budgets to compare against.",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cfg = Settings.snapshot()
+    vocab = load_vocab(cfg)
+    if vocab is None:
+        raise SystemExit(
+            "No sparse vocabulary found; set retrieval.hybrid and rebuild the index."
+        )
+
+    store = get_vector_store(cfg)
+    if args.queries is not None:
+        queries = _load_queries(args.queries)
+    else:
+        queries = _probe_queries(
+            store, get_side_store(cfg), vocab, args.probes, args.terms, args.seed
+        )
+    if not queries:
+        raise SystemExit("No queries to run.")
+
+    embeddings = OpenAIClient(cfg).embed_texts([q for q, _ in queries])
+
+    print(
+        f"{len(queries)} queries, k={args.top_k}, hybrid_prefetch={cfg.hybrid_prefetch}"
+    )
+    print(f"{'mode':<16} {'recall':>7} {'p50_ms':>8} {'p95_ms':>8}")
+    runs = [(f"dense@{args.top_k}", args.top_k, None)]
+    runs += [(f"dense@{n}", n, None) for n in args.dense_k]
+    runs += [(f"hybrid@{args.top_k}", args.top_k, vocab)]
+    for name, k, v in runs:
+        row = _run(store, embeddings, queries, k, v)
+        print(
+            f"{name:<16} {row['recall']:7.3f} {row['p50_ms']:8.2f} {row['p95_ms']:8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# python scripts/07_hybrid_bench.py
+# python scripts/07_hybrid_bench.py --top-k 5 \
+#     --queries data/artifacts/exact_term_queries.jsonl
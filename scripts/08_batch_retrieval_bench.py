@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from pathlib import Path
+from typing import List
+
+from src.config.settings import Settings
+from src.retrieval.retriever import retrieve, retrieve_many
+from src.retrieval.side_store import get_side_store
+from src.retrieval.store_base import get_vector_store
+
+
+def _sample_questions(cfg: Settings, n: int, seed: int) -> List[str]:
+    """First sentence of randomly chosen chunks, as stand-in questions."""
+    texts: List[str] = []
+    side = get_side_store(cfg)
+    for _, _, payloads in get_vector_store(cfg).iter_points(1024):
+        texts.extend(p.get("text") or "" for p in side.hydrate_payloads(payloads))
+
+    rng = random.Random(seed)
+    rng.shuffle(texts)
+    out: List[str] = []
+    for text in texts:
+        sentence = re.split(r"(?<=[.?!])\s", text.strip(), maxsplit=1)[0][:200]
+        if len(sentence) > 20:
+            out.append(sentence)
+        if len(out) >= n:
+            break
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare looped retrieve() with retrieve_many()."
+    )
+    parser.add_argument(
+        "--questions", type=Path, default=None, help="Text file, one question per line."
+    )
+    parser.add_argument(
+        "-n", type=int, default=200, help="Questions sampled from the index."
+    )
+    parser.add_argument("--top-k", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cfg = Settings.snapshot()
+    if args.questions is not None:
+        lines = args.questions.read_text(encoding="utf-8").splitlines()
+        questions = [q.strip() for q in lines if q.strip()]
+    else:
+        questions = _sample_questions(cfg, args.n, args.seed)
+    if not questions:
+        raise SystemExit("No questions to run.")
+
+    start = time.perf_counter()
+    looped = [retrieve(q, top_k=args.top_k) for q in questions]
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = retrieve_many(questions, top_k=args.top_k, cfg=cfg)
+    batch_s = time.perf_counter() - start
+
+    same = sum(
+        [c.chunk_id for c in a] == [c.chunk_id for c in b]
+        for a, b in zip(looped, batched)
+    )
+    print(f"{len(questions)} questions, top_k={args.top_k or cfg.top_k}")
+    print(f"{'mode':<14} {'seconds':>8} {'q/s':>8}")
+    print(f"{'retrieve loop':<14} {loop_s:8.2f} {len(questions) / loop_s:8.1f}")
+    print(f"{'retrieve_many':<14} {batch_s:8.2f} {len(questions) / batch_s:8.1f}")
+    print(
+        f"speedup x{loop_s / batch_s:.1f}; "
+        f"identical results for {same}/{len(questions)} questions"
+    )
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# python scripts/08_batch_retrieval_bench.py
+# python scripts/08_batch_retrieval_bench.py \
+#     --questions data/artifacts/eval_questions.txt
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.config.settings import Settings
+from src.retrieval.qdrant_store import ensure_collection, new_client
+
+
+def bench_transport(
+    cfg: Settings, grpc: bool, vectors: np.ndarray, queries: np.ndarray, k: int
+) -> Dict:
+    from qdrant_client.models import PointStruct
+
+    client = new_client(cfg, prefer_grpc=grpc)
+    collection = f"{cfg.qdrant_collection}__bench_{'grpc' if grpc else 'rest'}"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    ensure_collection(client, collection, vector_size=vectors.shape[1])
+
+    start = time.perf_counter()
+    for lo in range(0, len(vectors), 256):
+        batch = vectors[lo : lo + 256]
+        client.upsert(
+            collection_name=collection,
+            points=[
+                PointStruct(
+                    id=lo + i,
+                    vector=v.tolist(),
+                    payload={"source": "pdf", "text": "x" * 2000},
+                )
+                for i, v in enumerate(batch)
+            ],
+            wait=True,
+        )
+    upsert_s = time.perf_counter() - start
+
+    latencies: List[float] = []
+    for q in queries:
+        t = time.perf_counter()
+        client.query_points(
+            collection_name=collection, query=q.tolist(), limit=k, with_payload=True
+        )
+        latencies.append((time.perf_counter() - t) * 1000.0)
+
+    client.delete_collection(collection)
+    client.close()
+    return {
+        "transport": "grpc" if grpc else "rest",
+        "upsert_pts_s": len(vectors) / upsert_s,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare Qdrant REST and gRPC transports."
+    )
+    parser.add_argument("--points", type=int, default=3000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cfg = Settings.snapshot()
+    rng = np.random.default_rng(args.seed)
+    vectors = rng.standard_normal((args.points, cfg.embedding_dim)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, cfg.embedding_dim)).astype(np.float32)
+
+    print(
+        f"{args.points} points x {cfg.embedding_dim} dims, "
+        f"{args.queries} queries, k={args.top_k}"
+    )
+    print(f"{'transport':<10} {'upsert/s':>10} {'p50_ms':>8} {'p95_ms':>8}")
+    for grpc in (False, True):
+        row = bench_transport(cfg, grpc, vectors, queries, args.top_k)
+        print(
+            f"{row['transport']:<10} {row['upsert_pts_s']:10.0f} "
+            f"{row['p50_ms']:8.2f} {row['p95_ms']:8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# docker compose up -d
+# python scripts/09_transport_bench.py
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import warnings
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.retrieval.doc_router import build_doc_vectors
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.retrieval.store_base import VectorStore
+from src.utils.ids import make_point_id
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+
+def synthetic_corpus(
+    n_docs: int, chunks_per_doc: int, dim: int, rng: np.random.Generator
+) -> Tuple[List[str], np.ndarray, List[Dict]]:
+    """Chunks around per-document topics, documents grouped into shared subjects."""
+    noise = lambda *shape: rng.standard_normal(shape) / np.sqrt(dim)  # noqa: E731
+    subjects = _unit(noise(max(4, n_docs // 10), dim))
+    docs = _unit(
+        subjects[rng.integers(0, len(subjects), n_docs)] + 0.7 * noise(n_docs, dim)
+    )
+    vectors = _unit(
+        np.repeat(docs, chunks_per_doc, axis=0)
+        + 0.9 * noise(n_docs * chunks_per_doc, dim)
+    )
+
+    ids, payloads = [], []
+    for d in range(n_docs):
+        for c in range(chunks_per_doc):
+            chunk_id = f"pdf::doc{d}::{c}"
+            ids.append(make_point_id(chunk_id))
+            payloads.append(
+                {
+                    "source": "pdf",
+                    "doc_id": f"doc{d}",
+                    "chunk_id": chunk_id,
+                    "title": f"doc{d}",
+                }
+            )
+    return ids, vectors.astype(np.float32), payloads
+
+
+def _open(
+    backend: str, root: Path, name: str, qdrant_url: Optional[str]
+) -> VectorStore:
+    if backend == "numpy":
+        return NumpyVectorStore(root / name)
+
+    from qdrant_client import QdrantClient
+
+    from src.retrieval.qdrant_store import QdrantVectorStore
+
+    client = QdrantClient(url=qdrant_url) if qdrant_url else QdrantClient(":memory:")
+    store = QdrantVectorStore(client, name)
+    store.reset()
+    return store
+
+
+def _p(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q))
+
+
+def bench_size(
+    args: argparse.Namespace, n_docs: int, root: Path, rng: np.random.Generator
+) -> Dict:
+    ids, vectors, payloads = synthetic_corpus(
+        n_docs, args.chunks_per_doc, args.dim, rng
+    )
+    chunks = _open(args.backend, root, f"routing_bench_{n_docs}", args.qdrant_url)
+    docs = _open(args.backend, root, f"routing_bench_{n_docs}__docs", args.qdrant_url)
+    chunks.ensure_collection(args.dim)
+    docs.ensure_collection(args.dim)
+    chunks.upsert_points(ids, vectors, payloads)
+    docs.upsert_points(*build_doc_vectors(chunks))
+
+    picks = rng.integers(0, len(ids), args.queries)
+    queries = _unit(
+        vectors[picks]
+        + 0.5 * rng.standard_normal((args.queries, args.dim)) / np.sqrt(args.dim)
+    )
+
+    flat_ms: List[float] = []
+    routed_ms: List[float] = []
+    overlap = flat_hits = routed_hits = 0
+    for q, pick in zip(queries.tolist(), picks):
+        t = time.perf_counter()
+        flat = chunks.search(q, top_k=args.top_k)
+        flat_ms.append((time.perf_counter() - t) * 1000.0)
+
+        t = time.perf_counter()
+        routed_docs = [p["doc_id"] for _, p in docs.search(q, top_k=args.route_top)]
+        routed = chunks.search(q, top_k=args.top_k, doc_ids=routed_docs)
+        routed_ms.append((time.perf_counter() - t) * 1000.0)
+
+        flat_ids = {p["chunk_id"] for _, p in flat}
+        routed_ids = {p["chunk_id"] for _, p in routed}
+        overlap += len(flat_ids & routed_ids)
+        target = payloads[pick]["chunk_id"]
+        flat_hits += target in flat_ids
+        routed_hits += target in routed_ids
+
+    if args.qdrant_url:
+        chunks.reset()
+        docs.reset()
+    n = args.queries
+    return {
+        "docs": n_docs,
+        "chunks": len(ids),
+        "flat_p50": _p(flat_ms, 50),
+        "flat_p95": _p(flat_ms, 95),
+        "routed_p50": _p(routed_ms, 50),
+        "routed_p95": _p(routed_ms, 95),
+        "recall_vs_flat": overlap / (n * args.top_k),
+        "flat_hit": flat_hits / n,
+        "routed_hit": routed_hits / n,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Compare flat chunk search with doc-routed two-stage search as the "
+            "corpus grows."
+        )
+    )
+    parser.add_argument(
+        "--docs",
+        type=str,
+        default="10,50,200,800",
+        help="Comma-separated corpus sizes.",
+    )
+    parser.add_argument("--chunks-per-doc", type=int, default=60)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=8)
+    parser.add_argument(
+        "--route-top", type=int, default=8, help="Documents kept by the first stage."
+    )
+    parser.add_argument("--backend", choices=["numpy", "qdrant"], default="numpy")
+    parser.add_argument(
+        "--qdrant-url",
+        type=str,
+        default=None,
+        help="Qdrant server; local mode if unset.",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"backend={args.backend} dim={args.dim} chunks/doc={args.chunks_per_doc} "
+        f"k={args.top_k} route_top={args.route_top} queries={args.queries}"
+    )
+    print(
+        f"{'docs':>6} {'chunks':>8} {'flat_p50':>9} {'flat_p95':>9} {'route_p50':>10} "
+        f"{'route_p95':>10} {'recall':>7} {'hit_flat':>9} {'hit_route':>10}"
+    )
+    with tempfile.TemporaryDirectory() as tmp, warnings.catch_warnings():
+        # Qdrant local mode warns that it ignores payload indexes.
+        warnings.simplefilter("ignore")
+        for n_docs in (int(x) for x in args.docs.split(",") if x.strip()):
+            row = bench_size(args, n_docs, Path(tmp), rng)
+            print(
+                f"{row['docs']:>6} {row['chunks']:>8} "
+                f"{row['flat_p50']:9.2f} {row['flat_p95']:9.2f} "
+                f"{row['routed_p50']:10.2f} {row['routed_p95']:10.2f} "
+                f"{row['recall_vs_flat']:7.3f} "
+                f"{row['flat_hit']:9.3f} {row['routed_hit']:10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# python scripts/10_routing_bench.py
+# python scripts/10_routing_bench.py --backend qdrant --dim 3072
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.config.settings import Settings
+from src.retrieval.qdrant_store import (
+    bulk_upload,
+    consistency_barrier,
+    ensure_collection,
+    new_client,
+    upsert_chunks,
+)
+from src.retrieval.store_base import chunk_payload
+from src.schemas import Chunk
+from src.utils.ids import make_point_id
+
+
+def _corpus(n: int, dim: int, text_chars: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    chunks = [
+        Chunk(
+            source="pdf",
+            doc_id=f"doc{i // 100}",
+            chunk_id=f"pdf::doc{i // 100}::{i % 100}",
+            text="x" * text_chars,
+            meta={"title": f"Book {i // 100}.pdf"},
+        )
+        for i in range(n)
+    ]
+    return chunks, vectors
+
+
+def bench_mode(
+    cfg: Settings, name: str, chunks: List[Chunk], vectors: np.ndarray, **bulk
+) -> Dict:
+    client = new_client(cfg)
+    collection = f"{cfg.qdrant_collection}__bench_upload"
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    ensure_collection(client, collection, vector_size=vectors.shape[1])
+    vec_list = vectors.tolist()
+
+    start = time.perf_counter()
+    if not bulk:
+        upsert_chunks(client, collection, chunks, vec_list, slim=cfg.slim_payloads)
+    else:
+        ids = [make_point_id(c.chunk_id) for c in chunks]
+        payloads = [chunk_payload(c, cfg.slim_payloads) for c in chunks]
+        bulk_upload(client, collection, ids, vec_list, payloads, **bulk)
+        if not bulk.get("wait", False):
+            consistency_barrier(client, collection)
+    elapsed = time.perf_counter() - start
+
+    count = client.count(collection_name=collection, exact=True).count
+    client.delete_collection(collection)
+    client.close()
+    return {
+        "mode": name,
+        "pts_s": len(chunks) / elapsed,
+        "seconds": elapsed,
+        "count": count,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare sequential and bulk Qdrant upserts."
+    )
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--text-chars", type=int, default=2000)
+    parser.add_argument("--batch-mb", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    cfg = Settings.snapshot()
+    batch_bytes = int((args.batch_mb or cfg.qdrant_upload_batch_mb) * (1 << 20))
+    chunks, vectors = _corpus(
+        args.points, cfg.embedding_dim, args.text_chars, args.seed
+    )
+
+    modes = [("sequential (64/req, wait)", {})]
+    for parallel in (1, 2, 4, 8):
+        for wait in (True, False):
+            label = f"bulk p={parallel} {'wait' if wait else 'nowait+barrier'}"
+            bulk = {"parallel": parallel, "batch_bytes": batch_bytes, "wait": wait}
+            modes.append((label, bulk))
+
+    print(
+        f"{args.points} points x {cfg.embedding_dim} dims, "
+        f"slim={cfg.slim_payloads}, {cfg.qdrant_url}"
+    )
+    print(f"{'mode':<28} {'points/s':>10} {'seconds':>8} {'count':>7}")
+    for name, bulk in modes:
+        row = bench_mode(cfg, name, chunks, vectors, **bulk)
+        print(
+            f"{row['mode']:<28} {row['pts_s']:10.0f} "
+            f"{row['seconds']:8.2f} {row['count']:7d}"
+        )
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# docker compose up -d
+# python scripts/11_upload_bench.py
+# python scripts/11_upload_bench.py --points 20000 --batch-mb 8
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+
+from src.indexing.reconcile import reconcile
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Delete points of removed PDFs and of chunks past each document's "
+            "chunk count."
+        )
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="report stale points without deleting"
+    )
+    args = parser.parse_args()
+
+    stats = reconcile(dry_run=args.dry_run)
+    print(
+        f"{stats.docs_checked} docs checked: {stats.docs_removed} removed, "
+        f"{stats.docs_trimmed} trimmed, {stats.docs_unverified} not in the catalog"
+    )
+    print(
+        f"{stats.points_stale} stale points, {stats.points_deleted} deleted, "
+        f"{stats.bytes_reclaimed / (1 << 20):.2f} MB reclaimed "
+        f"in {stats.elapsed_s:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed (after scripts/01_index_pdfs.py):
+#python scripts/12_reconcile.py --dry-run
+#python scripts/12_reconcile.py
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+
+from src.config.settings import Settings
+from src.retrieval.courses import course_settings, list_courses
+from src.retrieval.versions import list_versions, prune, rollback, storage_name
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="List, roll back or prune index versions."
+    )
+    parser.add_argument("action", choices=["list", "rollback", "prune"])
+    parser.add_argument(
+        "--to", default=None, help="version to roll back to (default: previous)"
+    )
+    parser.add_argument(
+        "--keep", type=int, default=None, help="default: store.keep_versions"
+    )
+    parser.add_argument(
+        "--course", default=None, help="course shard (with store.course_shards)"
+    )
+    args = parser.parse_args()
+
+    cfg = Settings.snapshot()
+    if cfg.course_shards:
+        courses = [args.course] if args.course else list_courses(cfg)
+        targets = [course_settings(cfg, c) for c in courses]
+    else:
+        targets = [cfg]
+
+    for target in targets:
+        alias = target.qdrant_collection
+        if args.action == "rollback":
+            print(f"{alias} -> {rollback(target, args.to)}")
+        elif args.action == "prune":
+            dropped = prune(target, args.keep or cfg.keep_versions)
+            print(f"{alias}: dropped {', '.join(dropped) or 'nothing'}")
+        else:
+            live = storage_name(target)
+            versions = [
+                f"{v} (live)" if v == live else v for v in list_versions(target)
+            ]
+            print(f"{alias}: {', '.join(versions) or 'unversioned'}")
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+#python scripts/13_versions.py list
+#python scripts/13_versions.py rollback
+#python scripts/13_versions.py rollback --to ai_teaching_assistant_kb__v3
+#python scripts/13_versions.py prune --keep 2
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import argparse
+
+from src.config.settings import Settings
+from src.indexing.distributed import default_worker_id, run_dir, run_worker
+from src.indexing.index_build import format_report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Index PDFs as one of several workers."
+    )
+    parser.add_argument("--run", required=True, help="run id, the same on every worker")
+    parser.add_argument("--worker-id", default=None, help="default: <hostname>-<pid>")
+    parser.add_argument(
+        "--reset", action="store_true", help="rebuild the collections first"
+    )
+    args = parser.parse_args()
+
+    cfg = Settings.snapshot()
+    worker_id = args.worker_id or default_worker_id()
+    print(f"worker {worker_id}, run dir {run_dir(cfg, args.run)}")
+    report = run_worker(args.run, worker_id=worker_id, reset=args.reset, cfg=cfg)
+
+    mine = report.stats
+    print(
+        f"this worker: {mine.docs} docs, {mine.chunks_total} chunks "
+        f"({mine.chunks_missing} new), "
+        f"{report.leases_recovered} expired leases taken over"
+    )
+    total = report.total
+    if total is not None:
+        print(f"run total ({report.workers} workers):")
+        print("\n".join(format_report(total)))
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# Start the same command on every host; all of them must see the same
+# data/raw/books, data/artifacts and Qdrant. Re-running a worker with the same
+# --run resumes the run (and finishes it if the merging worker died).
+#python scripts/14_index_worker.py --run nightly-2026-10-19
+#python scripts/14_index_worker.py --run rebuild-1 --reset
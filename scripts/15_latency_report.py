@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from src.config.settings import Settings
+
+
+def load_spans(path: Path, last: int = 0) -> List[Dict]:
+    spans = [
+        json.loads(line)
+        for line in path.read_text(encoding="utf-8").splitlines()
+        if line
+    ]
+    if last:
+        roots = [s["trace_id"] for s in spans if s.get("parent_id") is None][-last:]
+        keep = set(roots)
+        spans = [s for s in spans if s["trace_id"] in keep]
+    return spans
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Per-span latency percentiles from a trace file."
+    )
+    parser.add_argument(
+        "--file", type=Path, default=None, help="default: tracing.jsonl"
+    )
+    parser.add_argument("--last", type=int, default=0, help="only the last N requests")
+    parser.add_argument(
+        "--slowest", type=int, default=5, help="slowest requests to list"
+    )
+    args = parser.parse_args()
+
+    path = args.file or Settings.snapshot().trace_jsonl
+    if path is None or not Path(path).exists():
+        raise SystemExit(
+            f"no trace file at {path}; set tracing.enabled and tracing.jsonl"
+        )
+    spans = load_spans(Path(path), args.last)
+
+    by_name: Dict[str, List[float]] = defaultdict(list)
+    for s in spans:
+        by_name[s["name"]].append(s["duration_ms"])
+
+    print(f"{len(spans)} spans from {path}")
+    print(
+        f"{'span':<16} {'count':>6} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    )
+    for name, values in sorted(
+        by_name.items(), key=lambda kv: -np.percentile(kv[1], 95)
+    ):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(
+            f"{name:<16} {len(values):6d} "
+            f"{p50:9.1f} {p95:9.1f} {p99:9.1f} {max(values):9.1f}"
+        )
+
+    roots = sorted(
+        (s for s in spans if s.get("parent_id") is None),
+        key=lambda s: -s["duration_ms"],
+    )
+    if roots and args.slowest:
+        print("slowest requests:")
+        children = defaultdict(list)
+        for s in spans:
+            children[s["trace_id"]].append(s)
+        for root in roots[: args.slowest]:
+            steps = sorted(
+                (s for s in children[root["trace_id"]] if s is not root),
+                key=lambda s: -s["duration_ms"],
+            )[:3]
+            top = ", ".join(f"{s['name']} {s['duration_ms']:.0f}ms" for s in steps)
+            ms = root["duration_ms"]
+            print(f"  {root['trace_id']} {root['name']} {ms:.0f}ms: {top}")
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# Set tracing.enabled: true in config.yaml, ask some questions, then:
+#python scripts/15_latency_report.py
+#python scripts/15_latency_report.py --last 100 --slowest 10
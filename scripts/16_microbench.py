@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+from src.bench.microbench import (
+    compare,
+    format_results,
+    load_baseline,
+    run_suite,
+    save_baseline,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Offline micro-benchmarks of the hot paths."
+    )
+    parser.add_argument("--pages", type=int, default=400, help="synthetic book size")
+    parser.add_argument("--dim", type=int, default=256, help="fake embedding dimension")
+    parser.add_argument(
+        "--min-time", type=float, default=0.3, help="seconds per repeat"
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--only", nargs="*", default=None, help="case names to run")
+    parser.add_argument(
+        "--baseline", type=Path, default=Path("data/artifacts/microbench_baseline.json")
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="overwrite the baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="allowed slowdown / memory growth (0.2 = 20%%)",
+    )
+    args = parser.parse_args()
+
+    params = {"pages": args.pages, "dim": args.dim}
+    results = run_suite(
+        pages=args.pages,
+        dim=args.dim,
+        min_time_s=args.min_time,
+        repeats=args.repeats,
+        only=args.only,
+    )
+    baseline = load_baseline(args.baseline) if args.baseline.exists() else None
+    print("\n".join(format_results(results, baseline)))
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, **params)
+        print(f"baseline saved to {args.baseline}")
+        return
+    if baseline is None:
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+
+    regressions = compare(results, baseline, threshold=args.threshold)
+    for r in regressions:
+        print(
+            f"REGRESSION {r.name} {r.metric}: "
+            f"{r.baseline:,.0f} -> {r.current:,.0f} ({r.change:+.0%})"
+        )
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
+
+# Run when needed:
+# Baselines are only comparable on the same machine with the same --pages/--dim.
+#python scripts/16_microbench.py --save-baseline
+#python scripts/16_microbench.py
+#python scripts/16_microbench.py --only chunk_text normalize_text --threshold 0.1
@@ -8,6 +8,7 @@ from src.llm.openai_client import OpenAIClient
 from src.retrieval.retriever import retrieve
 from src.schemas import AnswerResult, Citation
 from src.utils.text import join_nonempty
+from src.utils.tracing import span
 
 
 def _build_context(citations: List[Citation]) -> str:
@@ -25,12 +26,23 @@ def ask(
     top_k: Optional[int] = None,
     source: Optional[str] = "pdf",
 ) -> AnswerResult:
-    cfg = Settings.load()
+    # Loading the settings switches tracing on, so on the first request it
+    # must happen before the root span opens.
+    Settings.snapshot()
+    with span("ask") as root:
+        result = _ask(question, top_k=top_k, source=source)
+        root.set(citations=len(result.citations), warnings=len(result.warnings))
+        return result
+
+
+def _ask(question: str, *, top_k: Optional[int], source: Optional[str]) -> AnswerResult:
+    with span("settings"):
+        cfg = Settings.snapshot().override(top_k=top_k or None)
 
     citations = retrieve(
         question,
-        top_k=top_k or cfg.top_k,
         source=source,
+        cfg=cfg,
     )
 
     if not citations:
@@ -40,7 +52,9 @@ def ask(
             warnings=["No relevant context retrieved."],
         )
 
-    context = _build_context(citations)
+    with span("prompt"):
+        context = _build_context(citations)
+        user_prompt = build_user_prompt(question, context) if context else ""
 
     if not context:
         return AnswerResult(
@@ -50,7 +64,6 @@ def ask(
         )
 
     llm = OpenAIClient(cfg)
-    user_prompt = build_user_prompt(question, context)
     answer = llm.chat(SYSTEM_PROMPT, user_prompt)
 
     return AnswerResult(
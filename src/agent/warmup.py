@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from src.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+    from src.llm.openai_client import OpenAIClient
+    from src.retrieval.store_base import VectorStore
+
+
+class Warmup:
+    """Loads settings, the store, the LLM client and the titles in the background.
+
+    Each step is best effort: a failure is logged and recorded in ``errors`` and
+    callers fall back to creating what they need on demand.
+    """
+
+    def __init__(self, config_path: Path | str = "config.yaml") -> None:
+        self.config_path = Path(config_path)
+        self.cfg: Optional[Settings] = None
+        self.store: Optional[VectorStore] = None
+        self.llm: Optional[OpenAIClient] = None
+        self.titles: Optional[List[str]] = None
+        self.timings: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Warmup":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="ai-ta-warmup", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set()
+
+    def _step(self, name: str, fn) -> None:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            self.errors[name] = f"{type(e).__name__}: {e}"
+            get_logger().warning("warm-up step %s failed: %s", name, self.errors[name])
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def _run(self) -> None:
+        try:
+            self._step("settings", self._load_settings)
+            if self.cfg is None:
+                return
+            self._step("store", self._open_store)
+            self._step("llm", self._connect_llm)
+            if self.store is not None:
+                self._step("titles", self._load_titles)
+        finally:
+            self._done.set()
+
+    def _load_settings(self) -> None:
+        from src.config.settings import Settings
+
+        self.cfg = Settings.snapshot(self.config_path)
+
+    def _open_store(self) -> None:
+        from src.retrieval.store_base import get_vector_store
+
+        assert self.cfg is not None
+        self.store = get_vector_store(self.cfg)
+
+    def _connect_llm(self) -> None:
+        from src.llm.openai_client import OpenAIClient
+
+        self.llm = OpenAIClient(self.cfg)
+
+    def _load_titles(self) -> None:
+        # Also opens the Qdrant connection, or maps the local matrix and id table.
+        from src.retrieval.courses import list_titles
+
+        assert self.store is not None and self.cfg is not None
+        self.titles = list_titles(self.cfg)
+
+
+def start_warmup(config_path: Path | str = "config.yaml") -> Warmup:
+    return Warmup(config_path).start()
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import tempfile
+import time
+import tracemalloc
+import zlib
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.indexing.chunking import ChunkingConfig, chunk_text
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.retrieval.retriever import _to_citations
+from src.retrieval.side_store import SideStore, slim_payload
+from src.retrieval.store_base import chunk_payload
+from src.schemas import Chunk
+from src.utils.ids import make_point_id
+from src.utils.text import normalize_text
+
+# Characters per synthetic textbook page; a 400-page book is about 1.2M characters.
+PAGE_CHARS = 3000
+
+_WORDS = (
+    "regression variance estimator gradient likelihood posterior matrix vector "
+    "eigenvalue kernel margin entropy sample bias hypothesis feature classifier "
+    "boosting bootstrap cluster projection residual convex optimum learning rate "
+    "the of a to and is in that for as with by this we are be on"
+).split()
+
+
+@dataclass(frozen=True)
+class BenchResult:
+    name: str
+    unit: str
+    # Units (characters, chunks, ids, points, queries) per second, best repeat.
+    ops_per_s: float
+    # Peak Python allocations during one call, from tracemalloc.
+    peak_kb: float
+    calls: int
+
+
+@dataclass(frozen=True)
+class Regression:
+    name: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def change(self) -> float:
+        return self.current / self.baseline - 1.0 if self.baseline else 0.0
+
+
+@dataclass
+class _Case:
+    name: str
+    unit: str
+    units: int
+    fn: Callable[[], Any]
+
+
+def synthetic_book(pages: int, seed: int = 0) -> str:
+    """Deterministic textbook-like text, including PDF extraction artifacts."""
+    rng = np.random.default_rng(seed)
+    words = np.array(_WORDS)
+    out: List[str] = []
+    size = 0
+    target = pages * PAGE_CHARS
+    while size < target:
+        n = int(rng.integers(8, 28))
+        sentence = " ".join(words[rng.integers(0, len(words), n)]).capitalize()
+        parts = [sentence, ". "]
+        roll = rng.random()
+        if roll < 0.05:
+            parts.append("\n\n")
+        elif roll < 0.08:
+            parts.append("hyphen-\nated  <br> \f")
+        elif roll < 0.10:
+            parts.append("<b>x</b>­ ")
+        out.extend(parts)
+        size += sum(len(p) for p in parts)
+    return "".join(out)
+
+
+def fake_embeddings(texts: List[str], dim: int) -> np.ndarray:
+    """Unit vectors seeded by each text's CRC, so a text always embeds the same."""
+    out = np.empty((len(texts), dim), dtype=np.float32)
+    for i, t in enumerate(texts):
+        rng = np.random.default_rng(zlib.crc32(t.encode("utf-8")))
+        out[i] = rng.standard_normal(dim)
+    return out / np.linalg.norm(out, axis=1, keepdims=True)
+
+
+class _NullClient:
+    """Accepts upserts and drops them, so only payload and point building is timed."""
+
+    def upsert(self, collection_name: str, points: List[Any]) -> None:
+        pass
+
+
+def _cases(pages: int, dim: int, workdir: Path) -> List[_Case]:
+    raw = synthetic_book(pages)
+    text = normalize_text(raw)
+    chunk_cfg = ChunkingConfig(
+        chunk_chars=2800, overlap=350, max_chunks_per_doc=100_000
+    )
+    meta = {"source": "pdf", "title": "Synthetic.pdf", "course": "general"}
+    chunks = chunk_text(
+        source="pdf", doc_id="synthetic", text=text, cfg=chunk_cfg, meta=meta
+    )
+    vectors = fake_embeddings([c.text for c in chunks], dim)
+    ids = [make_point_id(c.chunk_id) for c in chunks]
+    payloads = [chunk_payload(c) for c in chunks]
+    queries = fake_embeddings([f"question {i}" for i in range(32)], dim)
+    top_k = 8
+
+    numpy_store = NumpyVectorStore(workdir / "numpy", slim_payloads=True)
+    numpy_store.ensure_collection(dim)
+    numpy_store.upsert_points(ids, vectors, payloads)
+    side = SideStore(workdir / "side.sqlite")
+    side.put_payloads(payloads)
+    # One query's worth of slim search hits, for the post-processing case.
+    rows = [(0.9 - i * 0.01, slim_payload(p)) for i, p in enumerate(payloads[:top_k])]
+
+    cases = [
+        _Case("normalize_text", "chars", len(raw), lambda: normalize_text(raw)),
+        _Case(
+            "chunk_text",
+            "chunks",
+            len(chunks),
+            lambda: chunk_text(
+                source="pdf", doc_id="synthetic", text=text, cfg=chunk_cfg, meta=meta
+            ),
+        ),
+        _Case(
+            "make_point_id",
+            "ids",
+            len(chunks),
+            lambda: [make_point_id(c.chunk_id) for c in chunks],
+        ),
+        _Case(
+            "numpy_search",
+            "queries",
+            len(queries),
+            lambda: [
+                numpy_store.search(q.tolist(), top_k=top_k, source="pdf")
+                for q in queries
+            ],
+        ),
+        _Case(
+            "hydrate_citations",
+            "queries",
+            1,
+            lambda: _to_citations(side.hydrate(rows)),
+        ),
+    ]
+    cases.extend(_qdrant_cases(chunks, vectors, queries, top_k))
+    return cases
+
+
+def _qdrant_cases(
+    chunks: List[Chunk], vectors: np.ndarray, queries: np.ndarray, top_k: int
+) -> List[_Case]:
+    try:
+        from qdrant_client import QdrantClient
+    except ImportError:
+        return []
+    import warnings
+
+    from src.retrieval.qdrant_store import ensure_collection, search, upsert_chunks
+    from src.utils.resilience import DependencyGuard, GuardConfig
+
+    emb = vectors.tolist()
+    client = QdrantClient(":memory:")
+    with warnings.catch_warnings():
+        # Local mode accepts but ignores payload indexes.
+        warnings.simplefilter("ignore")
+        ensure_collection(client, "bench", vector_size=vectors.shape[1])
+    upsert_chunks(client, "bench", chunks, emb, slim=True)
+    guard = DependencyGuard("bench", GuardConfig(timeout_s=0, hedge=False))
+    null = _NullClient()
+    return [
+        _Case(
+            "upsert_chunks_payloads",
+            "points",
+            len(chunks),
+            lambda: upsert_chunks(null, "bench", chunks, emb, slim=True),  # type: ignore[arg-type]
+        ),
+        _Case(
+            "qdrant_local_search",
+            "queries",
+            len(queries),
+            lambda: [
+                search(client, "bench", q.tolist(), top_k, source="pdf", guard=guard)
+                for q in queries
+            ],
+        ),
+    ]
+
+
+def _measure(case: _Case, min_time_s: float, repeats: int) -> BenchResult:
+    case.fn()  # warm caches and lazy imports
+    best = 0.0
+    calls = 0
+    for _ in range(max(1, repeats)):
+        n = 0
+        start = time.perf_counter()
+        while True:
+            case.fn()
+            n += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time_s:
+                break
+        calls += n
+        best = max(best, n * case.units / elapsed)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        case.fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return BenchResult(case.name, case.unit, best, peak / 1024, calls)
+
+
+def run_suite(
+    *,
+    pages: int = 400,
+    dim: int = 256,
+    min_time_s: float = 0.3,
+    repeats: int = 3,
+    only: Optional[List[str]] = None,
+) -> List[BenchResult]:
+    """Time every hot path on a synthetic ``pages``-page book; no network needed."""
+    with tempfile.TemporaryDirectory(prefix="microbench-") as tmp:
+        cases = _cases(pages, dim, Path(tmp))
+        return [
+            _measure(case, min_time_s, repeats)
+            for case in cases
+            if not only or case.name in only
+        ]
+
+
+def save_baseline(path: Path, results: List[BenchResult], **params: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "created_at": time.time(),
+        "machine": f"{platform.machine()} {platform.processor()}".strip(),
+        "python": platform.python_version(),
+        "params": params,
+        "results": {r.name: asdict(r) for r in results},
+    }
+    path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+
+def load_baseline(path: Path) -> Dict[str, BenchResult]:
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return {name: BenchResult(**row) for name, row in data["results"].items()}
+
+
+def compare(
+    results: List[BenchResult], baseline: Dict[str, BenchResult], threshold: float = 0.2
+) -> List[Regression]:
+    """Cases more than ``threshold`` slower than the baseline, or using that much
+    more memory."""
+    found: List[Regression] = []
+    for r in results:
+        base = baseline.get(r.name)
+        if base is None:
+            continue
+        if r.ops_per_s < base.ops_per_s * (1.0 - threshold):
+            found.append(Regression(r.name, "ops_per_s", base.ops_per_s, r.ops_per_s))
+        if (
+            r.peak_kb > base.peak_kb * (1.0 + threshold)
+            and r.peak_kb - base.peak_kb > 64
+        ):
+            found.append(Regression(r.name, "peak_kb", base.peak_kb, r.peak_kb))
+    return found
+
+
+def format_results(
+    results: List[BenchResult], baseline: Optional[Dict[str, BenchResult]] = None
+) -> List[str]:
+    lines = [f"{'case':<24}{'ops/s':>14} {'unit':<8}{'peak KB':>10}{'vs base':>9}"]
+    for r in results:
+        base = (baseline or {}).get(r.name)
+        delta = (
+            f"{r.ops_per_s / base.ops_per_s - 1:+8.0%}"
+            if base and base.ops_per_s
+            else ""
+        )
+        lines.append(
+            f"{r.name:<24}{r.ops_per_s:>14,.0f} {r.unit:<8}"
+            f"{r.peak_kb:>10,.0f}{delta:>9}"
+        )
+    return lines
+
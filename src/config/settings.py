@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import threading
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple
 
 import yaml
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -17,11 +18,26 @@ class IndexingCfg(BaseModel):
     chunk_chars: int = 2800
     chunk_overlap: int = 350
     max_chunks_per_doc: int = 400
+    extract_workers: int = 2
+    embed_workers: int = 4
+    upsert_workers: int = 2
+    queue_size: int = 8
+    batch_size: int = 256
+    progress_s: float = 5.0
+    lease_s: float = 120.0
+    poll_s: float = 5.0
 
 
 class RetrievalCfg(BaseModel):
     top_k: int = 8
     min_score: float = 0.15
+    mmr: bool = False
+    mmr_lambda: float = 0.7
+    mmr_oversample: int = 4
+    hybrid: bool = False
+    hybrid_prefetch: int = 64
+    doc_routing: bool = False
+    doc_routing_top: int = 8
 
 
 class ModelsCfg(BaseModel):
@@ -30,15 +46,135 @@ class ModelsCfg(BaseModel):
     embedding_dim: int = 3072
 
 
+class DependencyCfg(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
+    timeout_s: float = 10.0
+    hedge: bool = True
+    hedge_after_ms: float = 250.0
+    hedge_quantile: float = 0.95
+    failure_threshold: int = 5
+    reset_after_s: float = 30.0
+
+
+def _default_embed_resilience() -> DependencyCfg:
+    return DependencyCfg(timeout_s=30.0, hedge_after_ms=1500.0)
+
+
+def _default_chat_resilience() -> DependencyCfg:
+    # A hedged completion is generated, and billed, twice.
+    return DependencyCfg(timeout_s=60.0, hedge=False)
+
+
+class ResilienceCfg(BaseModel):
+    qdrant: DependencyCfg = Field(default_factory=DependencyCfg)
+    embed: DependencyCfg = Field(default_factory=_default_embed_resilience)
+    chat: DependencyCfg = Field(default_factory=_default_chat_resilience)
+
+
+class TuningProfile(BaseModel):
+    """Collection creation options plus the matching query-time search params."""
+
+    model_config = ConfigDict(frozen=True)
+
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_ef: int = 128
+    quantization: Literal["none", "scalar", "binary"] = "none"
+    quantization_always_ram: bool = True
+    on_disk_vectors: bool = False
+    on_disk_payload: bool = False
+    oversampling: float = 2.0
+    rescore: bool = True
+
+
+def _default_profiles() -> Dict[str, TuningProfile]:
+    return {
+        "low-memory": TuningProfile(
+            hnsw_m=8,
+            hnsw_ef_construct=64,
+            search_ef=64,
+            quantization="binary",
+            on_disk_vectors=True,
+            on_disk_payload=True,
+            oversampling=3.0,
+        ),
+        "balanced": TuningProfile(
+            hnsw_ef_construct=128,
+            quantization="scalar",
+            on_disk_vectors=True,
+        ),
+        "max-recall": TuningProfile(hnsw_m=32, hnsw_ef_construct=256, search_ef=256),
+    }
+
+
+class StoreCfg(BaseModel):
+    backend: Literal["qdrant", "numpy"] = "qdrant"
+    local_dir: Path = Path("data/vector_store")
+    local_dtype: Literal["float32", "float16"] = "float32"
+    slim_payloads: bool = False
+    course_shards: bool = False
+    prefer_grpc: bool = False
+    grpc_port: int = 6336
+    pool_size: Optional[int] = None
+    bulk_upload: bool = False
+    upload_parallel: int = 4
+    upload_batch_mb: float = 4.0
+    upload_wait: bool = False
+    blue_green: bool = False
+    keep_versions: int = 2
+    smoke_queries: List[str] = Field(default_factory=list)
+    smoke_min_ratio: float = 0.9
+
+
+class CacheCfg(BaseModel):
+    enabled: bool = True
+    max_entries: int = 2048
+    max_mb: float = 64.0
+    ttl_s: float = 3600.0
+
+
+class TracingCfg(BaseModel):
+    enabled: bool = False
+    jsonl: Optional[Path] = None
+    metrics_file: Optional[Path] = None
+    metrics_port: Optional[int] = None
+    metrics_host: str = "127.0.0.1"
+
+
+class CollectionCfg(BaseModel):
+    profile: str = "balanced"
+    profiles: Dict[str, TuningProfile] = Field(default_factory=_default_profiles)
+
+
 class YamlCfg(BaseModel):
     data: DataCfg = Field(default_factory=DataCfg)
     indexing: IndexingCfg = Field(default_factory=IndexingCfg)
     retrieval: RetrievalCfg = Field(default_factory=RetrievalCfg)
     models: ModelsCfg = Field(default_factory=ModelsCfg)
+    resilience: ResilienceCfg = Field(default_factory=ResilienceCfg)
+    collection: CollectionCfg = Field(default_factory=CollectionCfg)
+    store: StoreCfg = Field(default_factory=StoreCfg)
+    cache: CacheCfg = Field(default_factory=CacheCfg)
+    tracing: TracingCfg = Field(default_factory=TracingCfg)
+
+
+_FileStamp = Optional[Tuple[int, int]]
+
+_SNAPSHOT_LOCK = threading.Lock()
+_SNAPSHOTS: Dict[Path, Tuple[_FileStamp, "Settings"]] = {}
+
+
+def _file_stamp(path: Path) -> _FileStamp:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
 
 class Settings(BaseSettings):
-    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", frozen=True)
 
     openai_api_key: str
     qdrant_url: str
@@ -51,14 +187,68 @@ class Settings(BaseSettings):
     chunk_chars: int = 2800
     chunk_overlap: int = 350
     max_chunks_per_doc: int = 400
+    index_extract_workers: int = 2
+    index_embed_workers: int = 4
+    index_upsert_workers: int = 2
+    index_queue_size: int = 8
+    index_batch_size: int = 256
+    index_progress_s: float = 5.0
+    index_lease_s: float = 120.0
+    index_poll_s: float = 5.0
 
     top_k: int = 8
     min_score: float = 0.15
+    mmr: bool = False
+    mmr_lambda: float = 0.7
+    mmr_oversample: int = 4
+    hybrid: bool = False
+    hybrid_prefetch: int = 64
+    doc_routing: bool = False
+    doc_routing_top: int = 8
 
     embed_model: str = "text-embedding-3-large"
     chat_model: str = "gpt-4.1-mini"
     embedding_dim: int = 3072
 
+    qdrant_resilience: DependencyCfg = Field(default_factory=DependencyCfg)
+    embed_resilience: DependencyCfg = Field(default_factory=_default_embed_resilience)
+    chat_resilience: DependencyCfg = Field(default_factory=_default_chat_resilience)
+
+    collection_profile: str = "balanced"
+    collection_profiles: Dict[str, TuningProfile] = Field(
+        default_factory=_default_profiles
+    )
+
+    vector_backend: Literal["qdrant", "numpy"] = "qdrant"
+    local_store_dir: Path = Path("data/vector_store")
+    local_store_dtype: Literal["float32", "float16"] = "float32"
+    slim_payloads: bool = False
+    course_shards: bool = False
+    # Per-request course selection for sharded stores; None searches every course.
+    course: Optional[str] = None
+    qdrant_prefer_grpc: bool = False
+    qdrant_grpc_port: int = 6336
+    qdrant_pool_size: Optional[int] = None
+    qdrant_bulk_upload: bool = False
+    qdrant_upload_parallel: int = 4
+    qdrant_upload_batch_mb: float = 4.0
+    qdrant_upload_wait: bool = False
+    blue_green: bool = False
+    keep_versions: int = 2
+    smoke_queries: Tuple[str, ...] = ()
+    smoke_min_ratio: float = 0.9
+
+    cache_enabled: bool = True
+    cache_max_entries: int = 2048
+    cache_max_mb: float = 64.0
+    cache_ttl_s: float = 3600.0
+
+    tracing_enabled: bool = False
+    trace_jsonl: Optional[Path] = None
+    metrics_file: Optional[Path] = None
+    metrics_port: Optional[int] = None
+    metrics_host: str = "127.0.0.1"
+
     @classmethod
     def load(cls, config_path: Path | str = "config.yaml") -> "Settings":
         path = Path(config_path)
@@ -84,21 +274,121 @@ class Settings(BaseSettings):
             chunk_chars=cfg.indexing.chunk_chars,
             chunk_overlap=cfg.indexing.chunk_overlap,
             max_chunks_per_doc=cfg.indexing.max_chunks_per_doc,
+            index_extract_workers=cfg.indexing.extract_workers,
+            index_embed_workers=cfg.indexing.embed_workers,
+            index_upsert_workers=cfg.indexing.upsert_workers,
+            index_queue_size=cfg.indexing.queue_size,
+            index_batch_size=cfg.indexing.batch_size,
+            index_progress_s=cfg.indexing.progress_s,
+            index_lease_s=cfg.indexing.lease_s,
+            index_poll_s=cfg.indexing.poll_s,
             top_k=cfg.retrieval.top_k,
             min_score=cfg.retrieval.min_score,
+            mmr=cfg.retrieval.mmr,
+            mmr_lambda=cfg.retrieval.mmr_lambda,
+            mmr_oversample=cfg.retrieval.mmr_oversample,
+            hybrid=cfg.retrieval.hybrid,
+            hybrid_prefetch=cfg.retrieval.hybrid_prefetch,
+            doc_routing=cfg.retrieval.doc_routing,
+            doc_routing_top=cfg.retrieval.doc_routing_top,
             embed_model=cfg.models.embed_model,
             chat_model=cfg.models.chat_model,
             embedding_dim=cfg.models.embedding_dim,
+            qdrant_resilience=cfg.resilience.qdrant,
+            embed_resilience=cfg.resilience.embed,
+            chat_resilience=cfg.resilience.chat,
+            collection_profile=cfg.collection.profile,
+            collection_profiles=cfg.collection.profiles,
+            vector_backend=cfg.store.backend,
+            local_store_dir=cfg.store.local_dir,
+            local_store_dtype=cfg.store.local_dtype,
+            slim_payloads=cfg.store.slim_payloads,
+            course_shards=cfg.store.course_shards,
+            qdrant_prefer_grpc=cfg.store.prefer_grpc,
+            qdrant_grpc_port=cfg.store.grpc_port,
+            qdrant_pool_size=cfg.store.pool_size,
+            qdrant_bulk_upload=cfg.store.bulk_upload,
+            qdrant_upload_parallel=cfg.store.upload_parallel,
+            qdrant_upload_batch_mb=cfg.store.upload_batch_mb,
+            qdrant_upload_wait=cfg.store.upload_wait,
+            blue_green=cfg.store.blue_green,
+            keep_versions=cfg.store.keep_versions,
+            smoke_queries=tuple(cfg.store.smoke_queries),
+            smoke_min_ratio=cfg.store.smoke_min_ratio,
+            cache_enabled=cfg.cache.enabled,
+            cache_max_entries=cfg.cache.max_entries,
+            cache_max_mb=cfg.cache.max_mb,
+            cache_ttl_s=cfg.cache.ttl_s,
+            tracing_enabled=cfg.tracing.enabled,
+            trace_jsonl=cfg.tracing.jsonl,
+            metrics_file=cfg.tracing.metrics_file,
+            metrics_port=cfg.tracing.metrics_port,
+            metrics_host=cfg.tracing.metrics_host,
         )
         return settings.resolve_paths(root)
 
+    @classmethod
+    def snapshot(cls, config_path: Path | str = "config.yaml") -> "Settings":
+        """Process-wide settings, re-parsed only when the config file's mtime changes.
+
+        The returned instance is frozen and shared; use ``override`` for
+        per-request values.
+        """
+        path = Path(config_path).absolute()
+        stamp = _file_stamp(path)
+
+        with _SNAPSHOT_LOCK:
+            cached = _SNAPSHOTS.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        from src.utils.tracing import configure_from, span
+
+        with span("settings.load"):
+            settings = cls.load(path)
+        with _SNAPSHOT_LOCK:
+            _SNAPSHOTS[path] = (stamp, settings)
+        # Tracing follows the config file: switched on or off whenever it is re-read.
+        configure_from(settings)
+        return settings
+
+    def tuning_profile(self, name: Optional[str] = None) -> TuningProfile:
+        key = name or self.collection_profile
+        try:
+            return self.collection_profiles[key]
+        except KeyError:
+            known = ", ".join(sorted(self.collection_profiles))
+            raise ValueError(
+                f"unknown collection profile {key!r}; known: {known}"
+            ) from None
+
+    def override(self, **values: Any) -> "Settings":
+        """Cheap copy with per-request values applied; ``None`` values are ignored."""
+        updates = {k: v for k, v in values.items() if v is not None}
+        if not updates:
+            return self
+
+        unknown = set(updates) - set(type(self).model_fields)
+        if unknown:
+            raise ValueError(f"unknown settings: {sorted(unknown)}")
+        return self.model_copy(update=updates)
+
     def resolve_paths(self, project_root: Optional[Path] = None) -> "Settings":
         root = (project_root or Path.cwd()).resolve()
 
+        updates: Dict[str, Path] = {}
         if not self.pdf_dir.is_absolute():
-            self.pdf_dir = (root / self.pdf_dir).resolve()
+            updates["pdf_dir"] = (root / self.pdf_dir).resolve()
 
         if not self.artifacts_dir.is_absolute():
-            self.artifacts_dir = (root / self.artifacts_dir).resolve()
+            updates["artifacts_dir"] = (root / self.artifacts_dir).resolve()
+
+        if not self.local_store_dir.is_absolute():
+            updates["local_store_dir"] = (root / self.local_store_dir).resolve()
+
+        for name in ("trace_jsonl", "metrics_file"):
+            value = getattr(self, name)
+            if value is not None and not value.is_absolute():
+                updates[name] = (root / value).resolve()
 
-        return self
+        return self.model_copy(update=updates) if updates else self
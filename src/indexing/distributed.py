@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+import os
+import socket
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from src.config.settings import Settings
+from src.indexing.index_build import IndexStats, _index_paths, _sum_stats, write_report
+from src.indexing.ingest_pdfs import list_pdfs
+from src.indexing.leases import LeaseQueue
+from src.retrieval.courses import (
+    course_of,
+    course_settings,
+    group_by_course,
+    save_courses,
+)
+from src.retrieval.doc_router import refresh_doc_vectors
+from src.retrieval.query_cache import bump_index_version, index_version_path
+from src.retrieval.side_store import SideStore, get_side_store, side_store_path
+from src.retrieval.store_base import get_vector_store
+from src.retrieval.versions import live_settings
+from src.utils.logger import get_logger
+
+# Lease keys of the one-off steps before the first and after the last file.
+_SETUP = "_setup"
+_AGGREGATE = "_aggregate"
+
+
+@dataclass(frozen=True)
+class WorkerReport:
+    worker_id: str
+    # What this worker indexed itself.
+    stats: IndexStats
+    leases_recovered: int = 0
+    # The whole run, on the one worker that merged everyone's results.
+    total: Optional[IndexStats] = None
+    workers: int = 0
+
+
+def run_dir(cfg: Settings, run_id: str) -> Path:
+    """Shared directory of one distributed run: plan, leases, per-worker artifacts."""
+    return Path(cfg.artifacts_dir) / f"{cfg.qdrant_collection}.runs" / run_id
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def run_worker(
+    run_id: str,
+    *,
+    worker_id: Optional[str] = None,
+    reset: bool = False,
+    cfg: Optional[Settings] = None,
+) -> WorkerReport:
+    """Index PDFs as one of several workers sharing ``pdf_dir``, Qdrant and artifacts.
+
+    Every worker started with the same ``run_id`` claims PDFs through leases in
+    ``run_dir`` and runs the full extract -> embed -> upsert pipeline on them.
+    Chunk text goes to a side store of its own, since SQLite files must not be
+    written from several hosts. Workers stay until every PDF is done, picking
+    up the PDFs of workers whose leases expired; the first to see the run
+    finished merges the side stores, refreshes document vectors and records
+    the totals. The first worker plans the run, and resets the collections if
+    ``reset``; the others follow its plan.
+    """
+    cfg = cfg or Settings.snapshot()
+    _check_settings(cfg, reset=reset)
+    worker_id = worker_id or default_worker_id()
+    queue = LeaseQueue(run_dir(cfg, run_id), owner=worker_id, lease_s=cfg.index_lease_s)
+
+    stats: List[IndexStats] = []
+    with queue.heartbeat():
+        plan = _plan(queue, cfg, reset=reset)
+        while True:
+            for course, rel_paths in plan["courses"].items():
+                done = _work_pass(queue, cfg, course, rel_paths)
+                if done is not None:
+                    stats.append(done)
+            if all(
+                queue.is_done(_task_key(c, r))
+                for c, rs in plan["courses"].items()
+                for r in rs
+            ):
+                break
+            # Files still leased elsewhere; come back for any whose owner dies.
+            time.sleep(cfg.index_poll_s)
+        total = _aggregate(queue, cfg, plan)
+
+    return WorkerReport(
+        worker_id=worker_id,
+        stats=_sum_stats(stats),
+        leases_recovered=queue.recovered,
+        total=total,
+        workers=len(_worker_dirs(queue)),
+    )
+
+
+def _check_settings(cfg: Settings, *, reset: bool) -> None:
+    if cfg.vector_backend != "qdrant":
+        raise ValueError(
+            "worker mode needs a shared Qdrant store; the numpy backend is per process"
+        )
+    if cfg.hybrid:
+        raise ValueError(
+            "hybrid indexing builds its BM25 vocabulary over the whole corpus "
+            "first; use index_pdfs"
+        )
+    if reset and cfg.blue_green:
+        raise ValueError(
+            "blue/green rebuilds run through index_pdfs; worker mode rebuilds in place"
+        )
+
+
+def _task_key(course: str, rel_path: str) -> str:
+    return hashlib.sha1(f"{course}/{rel_path}".encode("utf-8")).hexdigest()[:24]
+
+
+def _course_cfg(cfg: Settings, course: str) -> Settings:
+    return course_settings(cfg, course) if course else cfg
+
+
+def _worker_dirs(queue: LeaseQueue) -> List[Path]:
+    root = queue.root / "workers"
+    return sorted(p for p in root.iterdir() if p.is_dir()) if root.exists() else []
+
+
+def _plan(queue: LeaseQueue, cfg: Settings, *, reset: bool) -> Dict:
+    """The run's file list, written once by whichever worker gets there first."""
+    path = queue.root / "plan.json"
+    while not path.exists():
+        if queue.claim(_SETUP):
+            plan = _make_plan(cfg, reset=reset)
+            tmp = path.with_name(f"plan.json.{queue.owner}.tmp")
+            tmp.write_text(json.dumps(plan, indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+            queue.complete(_SETUP)
+            break
+        time.sleep(cfg.index_poll_s)
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _make_plan(cfg: Settings, *, reset: bool) -> Dict:
+    pdf_dir = Path(cfg.pdf_dir)
+    paths = list_pdfs(pdf_dir)
+    if cfg.course_shards:
+        by_course = group_by_course(paths, lambda p: course_of(p.relative_to(pdf_dir)))
+        save_courses(cfg, by_course, replace=reset)
+    else:
+        by_course = {"": paths}
+
+    for course in by_course:
+        target = live_settings(_course_cfg(cfg, course))
+        store = get_vector_store(target)
+        if reset:
+            store.reset()
+            get_side_store(target).reset()
+        # Created here, so workers never race to create the same collection.
+        store.ensure_collection(cfg.embedding_dim)
+
+    return {
+        "reset": reset,
+        "created_at": time.time(),
+        "courses": {
+            course: [p.relative_to(pdf_dir).as_posix() for p in course_paths]
+            for course, course_paths in sorted(by_course.items())
+        },
+    }
+
+
+def _work_pass(
+    queue: LeaseQueue, cfg: Settings, course: str, rel_paths: List[str]
+) -> Optional[IndexStats]:
+    """Index every file of ``course`` this worker can claim right now."""
+    pdf_dir = Path(cfg.pdf_dir)
+    todo = [(k, r) for r in rel_paths if not queue.is_done(k := _task_key(course, r))]
+    claimed: List[str] = []
+
+    def claims() -> Iterator[Path]:
+        # Claimed as extraction pulls them, so fast workers take more files.
+        for key, rel in todo:
+            if queue.claim(key):
+                claimed.append(key)
+                yield pdf_dir / rel
+
+    source = claims()
+    first = next(source, None)
+    if first is None:
+        return None
+
+    # Side store and journal are this worker's own; the live collection is shared.
+    target = live_settings(_course_cfg(cfg, course))
+    own = target.override(
+        artifacts_dir=queue.root / "workers" / queue.owner,
+        doc_routing=False,
+    )
+    try:
+        stats = _index_paths(
+            own,
+            pdf_dir,
+            itertools.chain([first], source),
+            reset=False,
+            n_files=len(todo),
+        )
+    except BaseException:
+        for key in claimed:
+            queue.release(key)
+        raise
+
+    # The report goes first: files are only done once their work is counted.
+    reports = queue.root / "reports"
+    reports.mkdir(exist_ok=True)
+    name = f"{queue.owner}.{time.time_ns()}.json"
+    (reports / name).write_text(json.dumps(stats.to_dict()), encoding="utf-8")
+    for key in claimed:
+        queue.complete(key)
+    return stats
+
+
+def _aggregate(queue: LeaseQueue, cfg: Settings, plan: Dict) -> Optional[IndexStats]:
+    """Merge worker results into the shared artifacts; None unless this worker did.
+
+    Workers that lose the claim wait for the merge to finish, and take it over
+    if the lease of the worker doing it expires.
+    """
+    while not queue.is_done(_AGGREGATE):
+        if queue.claim(_AGGREGATE):
+            return _merge(queue, cfg, plan)
+        time.sleep(cfg.index_poll_s)
+    return None
+
+
+def _merge(queue: LeaseQueue, cfg: Settings, plan: Dict) -> IndexStats:
+    workers = _worker_dirs(queue)
+    doc_vectors = 0
+    for course in plan["courses"]:
+        alias = _course_cfg(cfg, course)
+        target = live_settings(alias)
+        side = get_side_store(target)
+        name = side_store_path(target).name
+        doc_ids: List[str] = []
+        for worker in workers:
+            side.merge_from(worker / name)
+            doc_ids.extend(e.doc_id for e in SideStore(worker / name).catalog())
+        if cfg.doc_routing:
+            doc_vectors += refresh_doc_vectors(
+                target,
+                get_vector_store(target),
+                doc_ids,
+                changed=doc_ids,
+                reset=plan["reset"],
+            )
+        # Workers may only have bumped the version files in their own directories.
+        bump_index_version(index_version_path(target))
+        if alias is not target:
+            bump_index_version(index_version_path(alias))
+
+    reports = sorted((queue.root / "reports").glob("*.json"))
+    total = _sum_stats(
+        [
+            IndexStats.from_dict(json.loads(p.read_text(encoding="utf-8")))
+            for p in reports
+        ]
+    )
+    total = replace(
+        total,
+        doc_vectors_upserted=doc_vectors,
+        elapsed_s=time.time() - plan["created_at"],
+    )
+    # Stage times are summed over workers; elapsed is the run's wall time.
+    write_report(
+        cfg, total, run=queue.root.name, workers=len(workers), reset=plan["reset"]
+    )
+    queue.complete(_AGGREGATE, {"stats": total.to_dict(), "workers": len(workers)})
+    get_logger().info(
+        "distributed run %s finished by %s: %d workers, %d docs, %d chunks "
+        "(%d new) in %.1fs",
+        queue.root.name,
+        queue.owner,
+        len(workers),
+        total.docs,
+        total.chunks_total,
+        total.chunks_missing,
+        total.elapsed_s,
+    )
+    return total
@@ -1,15 +1,43 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import heapq
+import json
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from src.config.settings import Settings
 from src.indexing.chunking import ChunkingConfig, chunk_text
-from src.indexing.ingest_pdfs import ingest_pdf_dir
+from src.indexing.ingest_pdfs import PDFDoc, ingest_pdf, list_pdfs
+from src.indexing.journal import Progress, open_journal
+from src.indexing.pipeline import Stage, StageStats, run_pipeline
+from src.indexing.smoke import smoke_check
 from src.llm.openai_client import OpenAIClient
-from src.retrieval.qdrant_store import ensure_collection, get_client, points_exist, upsert_chunks
+from src.retrieval.courses import (
+    course_of,
+    course_settings,
+    group_by_course,
+    save_courses,
+)
+from src.retrieval.doc_router import refresh_doc_vectors
+from src.retrieval.query_cache import bump_index_version, index_version_path
+from src.retrieval.sparse import SparseVocab, vocab_path
+from src.retrieval.side_store import CatalogEntry, get_side_store
+from src.retrieval.store_base import chunk_payload, get_vector_store
+from src.retrieval.versions import live_settings, next_version, promote, prune
+from src.schemas import Chunk
 from src.utils.ids import make_point_id
+from src.utils.logger import get_logger, write_artifact
+from src.utils.metrics import peak_rss_mb
+
+
+# How many of the slowest files a report lists.
+SLOWEST_FILES = 5
 
 
 @dataclass(frozen=True)
@@ -19,6 +47,70 @@ class IndexStats:
     chunks_missing: int
     embeddings_computed: int
     points_upserted: int
+    doc_vectors_upserted: int = 0
+    # Work an interrupted earlier run had already committed to the journal.
+    chunks_resumed: int = 0
+    embeddings_reused: int = 0
+    elapsed_s: float = 0.0
+    # Input read: PDF pages and file bytes, and the text extracted from them.
+    pages: int = 0
+    pdf_bytes: int = 0
+    text_bytes: int = 0
+    # High-water mark of the whole process, not just of this run.
+    peak_rss_mb: float = 0.0
+    stages: Tuple[StageStats, ...] = ()
+    # (path under pdf_dir, extraction seconds, pages), slowest first.
+    slowest_files: Tuple[Tuple[str, float, int], ...] = ()
+
+    def _rate(self, n: float) -> float:
+        return n / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    @property
+    def chunks_per_s(self) -> float:
+        return self._rate(self.chunks_total)
+
+    @property
+    def pages_per_s(self) -> float:
+        return self._rate(self.pages)
+
+    @property
+    def embeddings_per_s(self) -> float:
+        return self._rate(self.embeddings_computed)
+
+    @property
+    def points_per_s(self) -> float:
+        return self._rate(self.points_upserted)
+
+    @property
+    def pdf_mb_per_s(self) -> float:
+        return self._rate(self.pdf_bytes / (1 << 20))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain JSON-ready fields plus the derived rates."""
+        data = asdict(self)
+        for st, row in zip(self.stages, data["stages"]):
+            row["items_per_s"] = st.items_per_s
+        data["rates"] = {
+            "pages_per_s": self.pages_per_s,
+            "chunks_per_s": self.chunks_per_s,
+            "embeddings_per_s": self.embeddings_per_s,
+            "points_per_s": self.points_per_s,
+            "pdf_mb_per_s": self.pdf_mb_per_s,
+        }
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndexStats":
+        names = {f.name for f in fields(cls)} - {"stages", "slowest_files"}
+        rows = [
+            {k: v for k, v in r.items() if k != "items_per_s"}
+            for r in data.get("stages", ())
+        ]
+        return cls(
+            **{k: v for k, v in data.items() if k in names},
+            stages=tuple(StageStats(**r) for r in rows),
+            slowest_files=tuple(tuple(f) for f in data.get("slowest_files", ())),
+        )
 
 
 def _chunk_documents(
@@ -49,66 +141,449 @@ def _chunk_documents(
     return chunks
 
 
-def index_pdfs(*, reset: bool = False) -> IndexStats:
-    cfg = Settings.load()
+def index_pdfs(*, reset: bool = False, cfg: Optional[Settings] = None) -> IndexStats:
+    cfg = cfg or Settings.snapshot()
 
-    pdf_docs = ingest_pdf_dir(Path(cfg.pdf_dir))
-    if not pdf_docs:
-        return IndexStats(
-            docs=0,
-            chunks_total=0,
-            chunks_missing=0,
-            embeddings_computed=0,
-            points_upserted=0,
+    pdf_dir = Path(cfg.pdf_dir)
+    paths = list_pdfs(pdf_dir)
+    if not cfg.course_shards:
+        stats = _index_collection(cfg, pdf_dir, paths, reset=reset)
+    else:
+        # One collection per course directory; each is indexed like a whole store.
+        by_course = group_by_course(paths, lambda p: course_of(p.relative_to(pdf_dir)))
+        save_courses(cfg, by_course, replace=reset)
+        stats = _sum_stats(
+            [
+                _index_collection(
+                    course_settings(cfg, course), pdf_dir, course_paths, reset=reset
+                )
+                for course, course_paths in sorted(by_course.items())
+            ]
+        )
+    report = write_report(cfg, stats, reset=reset, course_shards=cfg.course_shards)
+    get_logger().info("index report written to %s", report)
+    return stats
+
+
+def _index_collection(
+    cfg: Settings, pdf_dir: Path, paths: List[Path], *, reset: bool
+) -> IndexStats:
+    """Index into ``cfg.qdrant_collection``, or rebuild it blue/green.
+
+    A blue/green rebuild fills a new ``<collection>__v<N>`` while the live
+    version keeps serving, and only repoints the alias once the new version
+    passes ``smoke_check``. Incremental runs write into the live version.
+    """
+    if not (reset and cfg.blue_green):
+        live = live_settings(cfg)
+        stats = _index_paths(live, pdf_dir, paths, reset=reset)
+        if live is not cfg:
+            # Queries key their cache on the alias, not on the version written to.
+            bump_index_version(index_version_path(cfg))
+        return stats
+
+    min_points = int(get_vector_store(cfg).count() * cfg.smoke_min_ratio)
+    version = next_version(cfg)
+    stats = _index_paths(
+        cfg.override(qdrant_collection=version), pdf_dir, paths, reset=True
+    )
+    problems = smoke_check(
+        cfg.override(qdrant_collection=version), min_points=min_points
+    )
+    if problems:
+        raise RuntimeError(
+            f"{version} failed smoke checks; "
+            f"{cfg.qdrant_collection} was left unchanged: " + "; ".join(problems)
+        )
+    previous = promote(cfg, version)
+    dropped = prune(cfg, cfg.keep_versions)
+    get_logger().info(
+        "%s now serves %s (was %s); pruned %s",
+        cfg.qdrant_collection,
+        version,
+        previous or "unversioned",
+        ", ".join(dropped) or "nothing",
+    )
+    return stats
+
+
+def _catalog_entry(doc: PDFDoc, chunks: int) -> CatalogEntry:
+    return CatalogEntry(
+        doc_id=doc.doc_id,
+        title=doc.title,
+        chunks=chunks,
+        indexed_at=time.time(),
+        content_hash=hashlib.sha1(doc.text.encode("utf-8")).hexdigest(),
+    )
+
+
+def _sum_stats(stats: List[IndexStats]) -> IndexStats:
+    """Totals of runs that happened one after another (course shards, worker passes)."""
+    special = {"stages", "slowest_files", "peak_rss_mb"}
+    totals = {
+        f.name: sum(getattr(s, f.name) for s in stats)
+        for f in fields(IndexStats)
+        if f.name not in special
+    }
+    stages: Dict[str, StageStats] = {}
+    for st in (st for s in stats for st in s.stages):
+        acc = stages.setdefault(st.name, StageStats(st.name, st.workers))
+        acc.workers = max(acc.workers, st.workers)
+        acc.items_in += st.items_in
+        acc.items_out += st.items_out
+        acc.busy_s += st.busy_s
+        acc.blocked_s += st.blocked_s
+        acc.wall_s += st.wall_s
+    slowest = sorted((f for s in stats for f in s.slowest_files), key=lambda f: -f[1])
+    return IndexStats(
+        **totals,
+        peak_rss_mb=max((s.peak_rss_mb for s in stats), default=0.0),
+        stages=tuple(stages.values()),
+        slowest_files=tuple(slowest[:SLOWEST_FILES]),
+    )
+
+
+def format_report(stats: IndexStats) -> List[str]:
+    """Human-readable summary: volume, throughput, stages and the slowest files."""
+    lines = [
+        f"{stats.docs} docs, {stats.pages} pages, {stats.chunks_total} chunks "
+        f"({stats.chunks_missing} new, {stats.points_upserted} upserted) "
+        f"in {stats.elapsed_s:.1f}s",
+        f"throughput: {stats.pages_per_s:.1f} pages/s, "
+        f"{stats.chunks_per_s:.1f} chunks/s, "
+        f"{stats.embeddings_per_s:.1f} embeddings/s, "
+        f"{stats.points_per_s:.1f} points/s, "
+        f"{stats.pdf_mb_per_s:.2f} MB/s of PDF",
+        f"read {stats.pdf_bytes / (1 << 20):.1f} MB of PDF, extracted "
+        f"{stats.text_bytes / (1 << 20):.1f} MB of text; "
+        f"peak RSS {stats.peak_rss_mb:.0f} MB",
+    ]
+    if stats.stages:
+        lines.append(
+            f"  {'stage':<8}{'workers':>8}{'in':>8}{'out':>8}{'wall s':>9}"
+            f"{'busy s':>9}{'blocked s':>10}{'items/s':>9}"
+        )
+        lines.extend(
+            f"  {st.name:<8}{st.workers:>8}{st.items_in:>8}{st.items_out:>8}"
+            f"{st.wall_s:>9.1f}{st.busy_s:>9.1f}"
+            f"{st.blocked_s:>10.1f}{st.items_per_s:>9.1f}"
+            for st in stats.stages
         )
+    if stats.slowest_files:
+        lines.append("slowest files to extract:")
+        lines.extend(
+            f"  {secs:7.2f}s {pages:5d} pages  {path}"
+            for path, secs, pages in stats.slowest_files
+        )
+    return lines
 
-    docs_for_chunking: List[Tuple[str, str, Dict]] = [(d.doc_id, d.text, d.meta) for d in pdf_docs]
 
-    chunks = _chunk_documents(
-        docs_for_chunking,
-        source="pdf",
-        chunk_chars=cfg.chunk_chars,
-        overlap=cfg.chunk_overlap,
-        max_chunks_per_doc=cfg.max_chunks_per_doc,
+def write_report(cfg: Settings, stats: IndexStats, **context: Any) -> Path:
+    """Persist ``stats`` under ``artifacts_dir/index_reports`` for comparing runs."""
+    return write_artifact(
+        Path(cfg.artifacts_dir) / "index_reports",
+        f"{cfg.qdrant_collection}.json",
+        {
+            "collection": cfg.qdrant_collection,
+            "finished_at": time.time(),
+            "settings": {
+                "vector_backend": cfg.vector_backend,
+                "embed_model": cfg.embed_model,
+                "chunk_chars": cfg.chunk_chars,
+                "extract_workers": cfg.index_extract_workers,
+                "embed_workers": cfg.index_embed_workers,
+                "upsert_workers": cfg.index_upsert_workers,
+                "queue_size": cfg.index_queue_size,
+                "batch_size": cfg.index_batch_size,
+                "bulk_upload": cfg.qdrant_bulk_upload,
+            },
+            **context,
+            "stats": stats.to_dict(),
+        },
     )
 
-    client = get_client(cfg)
 
-    if reset:
+class _IndexRun:
+    """Stage functions and counters for one collection's indexing pipeline.
+
+    extract (PDF path -> document) -> chunk (document -> chunk batches) ->
+    dedupe (drop chunks already stored) -> embed -> upsert. Stage functions
+    run on several threads, so shared counters are updated under a lock.
+    Embedded and upserted batches are committed to an ``IndexJournal`` as they
+    finish, so a run that is interrupted loses at most the batches in flight.
+    """
+
+    def __init__(
+        self, cfg: Settings, pdf_dir: Path, n_files: int, *, reset: bool
+    ) -> None:
+        self.cfg = cfg
+        self.pdf_dir = pdf_dir
+        self.store = get_vector_store(cfg)
+        self.side = get_side_store(cfg)
+        self.journal = open_journal(cfg)
+        self.progress = Progress(
+            cfg.qdrant_collection,
+            n_files,
+            interval_s=cfg.index_progress_s,
+            sink=get_logger().info,
+        )
+        self._llm: Optional[OpenAIClient] = None
+        self.vocab: Optional[SparseVocab] = None
+        self.batch_size = max(1, int(cfg.index_batch_size))
+
+        if reset:
+            try:
+                self.store.reset()
+            except Exception:
+                pass
+            self.side.reset()
+        self.store.ensure_collection(cfg.embedding_dim)
+        left = self.journal.start(reset=reset)
+        if left["resumed"]:
+            get_logger().info(
+                "resuming interrupted index run of %s: %d chunks written, %d embedded",
+                cfg.qdrant_collection,
+                left["written"],
+                left["embedded"],
+            )
+
+        self.doc_ids: List[str] = []
+        self.changed_docs: Set[str] = set()
+        self.chunks_total = 0
+        self.chunks_missing = 0
+        self.chunks_resumed = 0
+        self.embeddings = 0
+        self.embeddings_reused = 0
+        self.catalog: List[CatalogEntry] = []
+        # (path under pdf_dir, extraction seconds, pages) of every file read.
+        self.files: List[Tuple[str, float, int]] = []
+        self.pages = 0
+        self.pdf_bytes = 0
+        self.text_bytes = 0
+        self._lock = threading.Lock()
+
+    def read_stages(self) -> List[Stage]:
+        return [
+            Stage("extract", self.extract, self.cfg.index_extract_workers),
+            Stage("chunk", self.chunk, 1),
+        ]
+
+    def write_stages(self) -> List[Stage]:
+        return [
+            Stage("dedupe", self.dedupe, 1),
+            Stage("embed", self.embed, self.cfg.index_embed_workers),
+            Stage("upsert", self.upsert, self.cfg.index_upsert_workers),
+        ]
+
+    def extract(self, path: Path) -> Iterator[PDFDoc]:
+        start = time.perf_counter()
+        doc = ingest_pdf(path, self.pdf_dir)
+        seconds = time.perf_counter() - start
         try:
-            client.delete_collection(collection_name=cfg.qdrant_collection)
-        except Exception:
-            pass
+            size = path.stat().st_size
+        except OSError:
+            size = 0
+        inside = path.is_relative_to(self.pdf_dir)
+        rel = path.relative_to(self.pdf_dir).as_posix() if inside else str(path)
+        pages = doc.pages if doc is not None else 0
+        with self._lock:
+            self.files.append((rel, seconds, pages))
+            self.pdf_bytes += size
+            self.pages += pages
+            if doc is not None:
+                self.text_bytes += len(doc.text.encode("utf-8"))
+        if doc is not None:
+            yield doc
+
+    def chunk(self, doc: PDFDoc) -> Iterator[List]:
+        chunks = _chunk_documents(
+            [(doc.doc_id, doc.text, doc.meta)],
+            source="pdf",
+            chunk_chars=self.cfg.chunk_chars,
+            overlap=self.cfg.chunk_overlap,
+            max_chunks_per_doc=self.cfg.max_chunks_per_doc,
+        )
+        if self.cfg.slim_payloads:
+            # Text and doc metadata live in the side store; rewriting every chunk
+            # is cheap and repairs a side store that was removed or is stale.
+            self.side.put_payloads(chunk_payload(c) for c in chunks)
+        with self._lock:
+            self.doc_ids.append(doc.doc_id)
+            self.chunks_total += len(chunks)
+            self.catalog.append(_catalog_entry(doc, len(chunks)))
+            if self.vocab is not None:
+                self.vocab.add_document(doc.doc_id, (c.text for c in chunks))
+        self.progress.chunked(len(chunks))
+        for start in range(0, len(chunks), self.batch_size):
+            yield chunks[start : start + self.batch_size]
+
+    def dedupe(self, chunks: List) -> Iterator[Tuple[List, List[str]]]:
+        # Chunks the journal saw written need no round trip to the store.
+        written = self.journal.written([c.chunk_id for c in chunks])
+        todo = [c for c in chunks if c.chunk_id not in written]
+        todo_ids = [make_point_id(c.chunk_id) for c in todo]
+        exists = self.store.points_exist(todo_ids)
+        missing = [(c, pid) for c, pid, ok in zip(todo, todo_ids, exists) if not ok]
+        with self._lock:
+            self.chunks_missing += len(missing)
+            self.chunks_resumed += len(written)
+            self.changed_docs.update(c.doc_id for c, _ in missing)
+            self.changed_docs.update(c.doc_id for c in chunks if c.chunk_id in written)
+        self.progress.advance(len(chunks) - len(missing))
+        if missing:
+            # Point ids travel with the batch so the store does not rebuild them.
+            yield [c for c, _ in missing], [pid for _, pid in missing]
+
+    def embed(
+        self, item: Tuple[List, List[str]]
+    ) -> Iterator[Tuple[List, List[str], List]]:
+        chunks, ids = item
+        cached = self.journal.embeddings(chunks)
+        todo = [c for c in chunks if c.chunk_id not in cached]
+        if todo:
+            with self._lock:
+                # Created on first use: a run with nothing new never needs the API.
+                if self._llm is None:
+                    self._llm = OpenAIClient(self.cfg)
+            fresh = self._llm.embed_texts([c.text for c in todo], bulk=True)
+            self.journal.put_embeddings(todo, fresh)
+            cached.update((c.chunk_id, v) for c, v in zip(todo, fresh))
+        with self._lock:
+            self.embeddings += len(todo)
+            self.embeddings_reused += len(chunks) - len(todo)
+        yield chunks, ids, [cached[c.chunk_id] for c in chunks]
+
+    def upsert(self, item: Tuple[List, List[str], List]) -> Iterator[int]:
+        chunks, ids, embeddings = item
+        sparse = None
+        if self.vocab is not None:
+            sparse = [self.vocab.encode_document(c.text) for c in chunks]
+        n = self.store.upsert(chunks, embeddings, sparse=sparse, ids=ids)
+        self.journal.mark_written([c.chunk_id for c in chunks])
+        self.progress.advance(len(chunks))
+        yield n
+
+    def start_vocab(self, *, reset: bool) -> None:
+        """Count terms from here on, on top of the saved vocabulary unless ``reset``.
+
+        Each chunked document replaces its own earlier counts, and term ids are
+        kept so vectors already stored stay valid.
+        """
+        path = vocab_path(self.cfg)
+        if reset or not path.exists():
+            self.vocab = SparseVocab()
+        else:
+            self.vocab = SparseVocab.load(path, with_docs=True)
+
+    def save_vocab(self) -> None:
+        assert self.vocab is not None
+        self.vocab.save(vocab_path(self.cfg))
+        # Query weights changed even if no point did; the stores bump on writes.
+        bump_index_version(index_version_path(self.cfg))
+
 
-    ensure_collection(client, cfg.qdrant_collection, vector_size=cfg.embedding_dim)
+def _spill(fh: IO[bytes]) -> Stage:
+    """A stage writing chunk batches to ``fh``, one JSON line each."""
 
-    point_ids = [make_point_id(c.chunk_id) for c in chunks]
-    exists_flags = points_exist(client, cfg.qdrant_collection, point_ids)
-    missing_chunks = [c for c, exists in zip(chunks, exists_flags) if not exists]
+    def write(chunks: List[Chunk]) -> Iterator[None]:
+        fh.write(json.dumps([c.model_dump() for c in chunks]).encode("utf-8") + b"\n")
+        return iter(())
 
-    if not missing_chunks:
+    return Stage("spill", write, 1)
+
+
+def _unspill(fh: IO[bytes]) -> Iterator[List[Chunk]]:
+    fh.seek(0)
+    for line in fh:
+        yield [Chunk.model_validate(c) for c in json.loads(line)]
+
+
+def _index_paths(
+    cfg: Settings,
+    pdf_dir: Path,
+    paths: Iterable[Path],
+    *,
+    reset: bool,
+    n_files: Optional[int] = None,
+) -> IndexStats:
+    """Run the pipeline over ``paths``; lazy iterables need ``n_files`` for progress."""
+    n_files = len(paths) if n_files is None else n_files
+    if not n_files:
         return IndexStats(
-            docs=len(pdf_docs),
-            chunks_total=len(chunks),
+            docs=0,
+            chunks_total=0,
             chunks_missing=0,
             embeddings_computed=0,
             points_upserted=0,
         )
 
-    llm = OpenAIClient(cfg)
-    embeddings = llm.embed_texts([c.text for c in missing_chunks])
+    start = time.perf_counter()
+    run = _IndexRun(cfg, pdf_dir, n_files, reset=reset)
+    stage_stats: List[StageStats] = []
 
-    upserted = upsert_chunks(
-        client,
-        cfg.qdrant_collection,
-        missing_chunks,
-        embeddings,
-    )
+    with ExitStack() as stack:
+        source: Iterable = paths
+        stages = run.read_stages() + run.write_stages()
+        if cfg.hybrid:
+            # BM25 weights need corpus-wide statistics before the first sparse
+            # vector is written. The chunk stage counts terms while batches go
+            # to a temporary file, which the write stages then read back.
+            spilled = stack.enter_context(
+                tempfile.TemporaryFile(dir=cfg.artifacts_dir)
+            )
+            run.start_vocab(reset=reset)
+            _, stage_stats = run_pipeline(
+                paths,
+                run.read_stages() + [_spill(spilled)],
+                queue_size=cfg.index_queue_size,
+            )
+            run.save_vocab()
+            source, stages = _unspill(spilled), run.write_stages()
 
-    return IndexStats(
-        docs=len(pdf_docs),
-        chunks_total=len(chunks),
-        chunks_missing=len(missing_chunks),
-        embeddings_computed=len(embeddings),
-        points_upserted=upserted,
+        upserted, write_stats = run_pipeline(
+            source, stages, queue_size=cfg.index_queue_size
+        )
+    stage_stats += write_stats
+    # Unacknowledged bulk writes must land before routing reads them back.
+    run.store.flush()
+    run.side.put_catalog(run.catalog)
+    run.journal.finish()
+
+    doc_vectors = 0
+    if cfg.doc_routing:
+        # Centroids of documents that gained chunks, plus any that have none yet.
+        doc_vectors = refresh_doc_vectors(
+            cfg, run.store, run.doc_ids, changed=run.changed_docs, reset=reset
+        )
+        if doc_vectors:
+            bump_index_version(index_version_path(cfg))
+
+    stats = IndexStats(
+        docs=len(run.doc_ids),
+        chunks_total=run.chunks_total,
+        chunks_missing=run.chunks_missing,
+        embeddings_computed=run.embeddings,
+        points_upserted=sum(upserted),
+        doc_vectors_upserted=doc_vectors,
+        chunks_resumed=run.chunks_resumed,
+        embeddings_reused=run.embeddings_reused,
+        elapsed_s=time.perf_counter() - start,
+        pages=run.pages,
+        pdf_bytes=run.pdf_bytes,
+        text_bytes=run.text_bytes,
+        peak_rss_mb=peak_rss_mb(),
+        stages=tuple(stage_stats),
+        slowest_files=tuple(
+            heapq.nlargest(SLOWEST_FILES, run.files, key=lambda f: f[1])
+        ),
     )
+    _log_run(cfg, stats)
+    return stats
+
+
+def _log_run(cfg: Settings, stats: IndexStats) -> None:
+    log = get_logger()
+    first, *rest = format_report(stats)
+    log.info("indexed %s: %s", cfg.qdrant_collection, first)
+    for line in rest:
+        log.info("  %s", line)
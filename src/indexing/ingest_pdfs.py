@@ -4,8 +4,9 @@ import hashlib
 import re
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
+from src.retrieval.courses import course_of
 from src.utils.text import normalize_text
 
 
@@ -15,6 +16,7 @@ class PDFDoc:
     title: str
     text: str
     meta: Dict[str, Any]
+    pages: int = 0
 
 
 _SAFE_ID_RE = re.compile(r"[^a-zA-Z0-9_]+")
@@ -28,70 +30,93 @@ def _safe_doc_id_from_path(pdf_path: Path) -> str:
     return f"{stem}__{h}"
 
 
-def _extract_with_pymupdf4llm(pdf_path: Path) -> str:
+def _extract_with_pymupdf4llm(doc: Any) -> str:
     # Preferred extractor
     from pymupdf4llm import to_markdown  # type: ignore
 
-    return to_markdown(str(pdf_path)) or ""
+    return to_markdown(doc) or ""
 
 
-def _extract_with_pymupdf(pdf_path: Path) -> str:
+def _extract_with_pymupdf(doc: Any) -> str:
     # Fallback extractor
-    import fitz  # type: ignore
-
     pages: List[str] = []
-    with fitz.open(str(pdf_path)) as doc:
-        for page in doc:
-            pages.append(page.get_text("text") or "")
+    for page in doc:
+        pages.append(page.get_text("text") or "")
     return "\n\n".join(pages)
 
 
-def _pdf_to_text(pdf_path: Path) -> str:
-    raw = ""
+def _pdf_to_text(pdf_path: Path) -> Tuple[str, int]:
+    """Normalised text and page count; both extractors share one open document."""
     try:
-        raw = _extract_with_pymupdf4llm(pdf_path)
+        import fitz  # type: ignore
+
+        doc = fitz.open(str(pdf_path))
     except Exception:
-        pass
+        return "", 0
 
-    if not raw.strip():
+    raw = ""
+    with doc:
+        pages = doc.page_count
         try:
-            raw = _extract_with_pymupdf(pdf_path)
+            raw = _extract_with_pymupdf4llm(doc)
         except Exception:
             pass
 
-    return normalize_text(raw)
+        if not raw.strip():
+            try:
+                raw = _extract_with_pymupdf(doc)
+            except Exception:
+                pass
 
+    return normalize_text(raw), pages
 
-def ingest_pdf_dir(pdf_dir: Path) -> List[PDFDoc]:
-    # Recursively ingest PDFs; safe to rerun as files are added
+
+def list_pdfs(pdf_dir: Path) -> List[Path]:
     pdf_dir = Path(pdf_dir)
     if not pdf_dir.exists():
         return []
+    return sorted(pdf_dir.rglob("*.pdf"))
 
-    docs: List[PDFDoc] = []
-    for p in sorted(pdf_dir.rglob("*.pdf")):
-        try:
-            text = _pdf_to_text(p)
-            if not text.strip():
-                continue
-
-            docs.append(
-                PDFDoc(
-                    doc_id=_safe_doc_id_from_path(p),
-                    title=p.name,
-                    text=text,
-                    meta={
-                        "source": "pdf",
-                        "title": p.name,
-                        "path": str(p),
-                        "filename": p.name,
-                        "relative_path": str(p.relative_to(pdf_dir))
-                        if p.is_relative_to(pdf_dir)
-                        else str(p),
-                    },
-                )
-            )
-        except Exception:
-            continue
 
+def doc_id_for(p: Path) -> str:
+    """The doc_id ``ingest_pdf`` gives this file, without reading it."""
+    return _safe_doc_id_from_path(p)
+
+
+def ingest_pdf(p: Path, pdf_dir: Path) -> Optional[PDFDoc]:
+    """Extract one PDF; ``None`` if it has no text or cannot be read."""
+    pdf_dir = Path(pdf_dir)
+    try:
+        text, pages = _pdf_to_text(p)
+        if not text.strip():
+            return None
+
+        relative_path = (
+            str(p.relative_to(pdf_dir)) if p.is_relative_to(pdf_dir) else str(p)
+        )
+        return PDFDoc(
+            doc_id=_safe_doc_id_from_path(p),
+            title=p.name,
+            text=text,
+            meta={
+                "source": "pdf",
+                "title": p.name,
+                "path": str(p),
+                "filename": p.name,
+                "relative_path": relative_path,
+                "course": course_of(relative_path),
+            },
+            pages=pages,
+        )
+    except Exception:
+        return None
+
+
+def ingest_pdf_dir(pdf_dir: Path) -> List[PDFDoc]:
+    # Recursively ingest PDFs; safe to rerun as files are added
+    docs: List[PDFDoc] = []
+    for p in list_pdfs(pdf_dir):
+        doc = ingest_pdf(p, pdf_dir)
+        if doc is not None:
+            docs.append(doc)
     return docs
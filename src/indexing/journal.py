@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+    from src.schemas import Chunk
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS state (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS embedded (
+    chunk_id  TEXT PRIMARY KEY,
+    text_hash TEXT NOT NULL,
+    vector    BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS written (
+    chunk_id TEXT PRIMARY KEY
+);
+"""
+
+_MAX_PARAMS = 500
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class IndexJournal:
+    """Durable progress of an index run, so an interrupted run can resume.
+
+    Every embedded batch is committed with its vectors before it is upserted,
+    and every upserted batch is recorded once the store acknowledges it. A
+    run that dies part way is resumed by the next one: written chunks are
+    skipped without asking the store, and journaled vectors are reused instead
+    of calling the embedding API again. ``finish`` clears the journal.
+    """
+
+    def __init__(self, path: Path, *, embed_model: str, dim: int) -> None:
+        self.path = Path(path)
+        self.fingerprint = f"{embed_model}:{int(dim)}"
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def start(self, *, reset: bool = False) -> Dict[str, int]:
+        """Open a run. Returns what an interrupted earlier run left behind.
+
+        ``reset`` (the store was just emptied) forgets written chunks but keeps
+        journaled vectors: they depend only on the text and the model.
+        """
+        with self._lock:
+            db = self._db()
+            with db:
+                state = dict(db.execute("SELECT key, value FROM state").fetchall())
+                if state.get("fingerprint") != self.fingerprint:
+                    db.execute("DELETE FROM embedded")
+                if reset:
+                    db.execute("DELETE FROM written")
+                db.executemany(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                    [
+                        ("fingerprint", self.fingerprint),
+                        ("status", "running"),
+                        ("started_at", repr(time.time())),
+                    ],
+                )
+                (embedded,) = db.execute("SELECT COUNT(*) FROM embedded").fetchone()
+                (written,) = db.execute("SELECT COUNT(*) FROM written").fetchone()
+        return {
+            "resumed": int(state.get("status") == "running"),
+            "embedded": embedded,
+            "written": written,
+        }
+
+    def embeddings(self, chunks: Sequence[Chunk]) -> Dict[str, List[float]]:
+        """Journaled vectors of ``chunks`` whose text has not changed since."""
+        hashes = {c.chunk_id: text_hash(c.text) for c in chunks}
+        rows = self._fetch(
+            "SELECT chunk_id, text_hash, vector FROM embedded", list(hashes)
+        )
+        return {
+            cid: np.frombuffer(blob, dtype=np.float32).tolist()
+            for cid, h, blob in rows
+            if hashes.get(cid) == h
+        }
+
+    def put_embeddings(
+        self, chunks: Sequence[Chunk], vectors: Sequence[Sequence[float]]
+    ) -> None:
+        rows = [
+            (c.chunk_id, text_hash(c.text), np.asarray(v, dtype=np.float32).tobytes())
+            for c, v in zip(chunks, vectors)
+        ]
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO embedded (chunk_id, text_hash, vector) "
+                    "VALUES (?, ?, ?)",
+                    rows,
+                )
+
+    def mark_written(self, chunk_ids: Sequence[str]) -> None:
+        """Record an acknowledged upsert; its journaled vectors are no longer needed."""
+        rows = [(cid,) for cid in chunk_ids]
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO written (chunk_id) VALUES (?)", rows
+                )
+                db.executemany("DELETE FROM embedded WHERE chunk_id = ?", rows)
+
+    def written(self, chunk_ids: Sequence[str]) -> Set[str]:
+        return {
+            cid for (cid,) in self._fetch("SELECT chunk_id FROM written", chunk_ids)
+        }
+
+    def finish(self) -> None:
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM embedded")
+                db.execute("DELETE FROM written")
+                db.execute(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                    ("status", "done"),
+                )
+
+    def _fetch(self, sql: str, keys: Sequence[str]) -> List[tuple]:
+        keys = list(dict.fromkeys(keys))
+        out: List[tuple] = []
+        with self._lock:
+            db = self._db()
+            for lo in range(0, len(keys), _MAX_PARAMS):
+                part = keys[lo : lo + _MAX_PARAMS]
+                where = f" WHERE chunk_id IN ({','.join('?' * len(part))})"
+                out.extend(db.execute(sql + where, part).fetchall())
+        return out
+
+
+def journal_path(cfg: Settings) -> Path:
+    return Path(cfg.artifacts_dir) / f"{cfg.qdrant_collection}.journal.sqlite"
+
+
+def open_journal(cfg: Settings) -> IndexJournal:
+    return IndexJournal(
+        journal_path(cfg), embed_model=cfg.embed_model, dim=cfg.embedding_dim
+    )
+
+
+class Progress:
+    """Throttled progress lines with throughput and ETA.
+
+    The total is extrapolated from the files chunked so far until every file
+    has been chunked, since the pipeline streams and the exact count is only
+    known at the end.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        files_total: int,
+        *,
+        interval_s: float = 5.0,
+        sink=None,
+        clock=time.monotonic,
+    ) -> None:
+        self.label = label
+        self.files_total = max(0, int(files_total))
+        self.interval_s = float(interval_s)
+        self.sink = sink
+        self.clock = clock
+        self.files_done = 0
+        self.chunks_seen = 0
+        self.done = 0
+        self._start = clock()
+        self._last = self._start
+        self._lock = threading.Lock()
+
+    def chunked(self, n_chunks: int) -> None:
+        with self._lock:
+            self.files_done += 1
+            self.chunks_seen += n_chunks
+
+    def advance(self, n_chunks: int) -> None:
+        """Count chunks that are finished: upserted, or already in the store."""
+        with self._lock:
+            self.done += n_chunks
+            now = self.clock()
+            if self.sink is None or now - self._last < self.interval_s:
+                return
+            self._last = now
+        self.sink(self.line())
+
+    def total(self) -> int:
+        if self.files_done >= self.files_total or self.files_done == 0:
+            return self.chunks_seen
+        return max(
+            self.chunks_seen,
+            round(self.chunks_seen * self.files_total / self.files_done),
+        )
+
+    def rate(self) -> float:
+        elapsed = self.clock() - self._start
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta_s(self) -> Optional[float]:
+        rate = self.rate()
+        return max(0.0, self.total() - self.done) / rate if rate > 0 else None
+
+    def line(self) -> str:
+        total = self.total()
+        pct = 100.0 * self.done / total if total else 0.0
+        eta = self.eta_s()
+        eta_txt = f"{eta:.0f}s" if eta is not None else "?"
+        return (
+            f"{self.label}: {self.done}/{total} chunks ({pct:.0f}%), "
+            f"files {self.files_done}/{self.files_total}, "
+            f"{self.rate():.1f} chunks/s, ETA {eta_txt}"
+        )
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+
+class LeaseQueue:
+    """Work items claimed through lock files in a directory shared by all workers.
+
+    A claim is an exclusive create of ``leases/<key>.lease`` holding the owner
+    and an expiry time; a finished item gets ``done/<key>.json``. Owners renew
+    their leases while they work (``heartbeat``), so a lease only expires when
+    its owner died or lost the shared directory. An expired lease is moved
+    aside with a rename, which exactly one of several competing workers wins,
+    and the item is claimed again. An owner holds its lease by the inode it
+    created and rewrites only that file, and never renews a lease that has
+    already expired, so a renewal cannot overwrite a lease taken over in the
+    meantime. Work must be idempotent: an item whose owner died part way is
+    redone from the start.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        owner: str,
+        lease_s: float = 120.0,
+        clock=time.time,
+    ) -> None:
+        self.root = Path(root)
+        self.owner = owner
+        self.lease_s = float(lease_s)
+        self.clock = clock
+        self.recovered = 0
+        # key -> (device, inode) of the lease file this worker created, expiry.
+        self._held: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        self._lock = threading.Lock()
+        (self.root / "leases").mkdir(parents=True, exist_ok=True)
+        (self.root / "done").mkdir(parents=True, exist_ok=True)
+
+    def _lease_path(self, key: str) -> Path:
+        return self.root / "leases" / f"{key}.lease"
+
+    def _done_path(self, key: str) -> Path:
+        return self.root / "done" / f"{key}.json"
+
+    def _lease_body(self, expires: float) -> bytes:
+        return json.dumps({"owner": self.owner, "expires": expires}).encode("utf-8")
+
+    def _read_lease(self, path: Path) -> Optional[Dict[str, Any]]:
+        """Lease content; a file that is still being written counts as fresh."""
+        try:
+            raw = path.read_bytes()
+            mtime = path.stat().st_mtime
+        except OSError:
+            return None
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return {"owner": "", "expires": mtime + self.lease_s}
+
+    def is_done(self, key: str) -> bool:
+        return self._done_path(key).exists()
+
+    def held(self) -> Set[str]:
+        with self._lock:
+            return set(self._held)
+
+    def _drop(self, key: str) -> None:
+        with self._lock:
+            self._held.pop(key, None)
+
+    def claim(self, key: str) -> bool:
+        """Take ``key`` unless it is done or leased by a live owner."""
+        if self.is_done(key):
+            return False
+        if self._create(key):
+            return True
+        path = self._lease_path(key)
+        lease = self._read_lease(path)
+        if lease is None or lease["expires"] > self.clock():
+            return False
+        # Expired: move it aside. Only one rename of the same file succeeds.
+        grave = path.with_name(f"{path.name}.{self.owner}.expired")
+        try:
+            os.rename(path, grave)
+        except FileNotFoundError:
+            return False
+        if self._read_lease(grave) != lease:
+            # Another worker replaced the lease in between; put theirs back.
+            try:
+                os.link(grave, path)
+            except FileExistsError:
+                pass
+            grave.unlink(missing_ok=True)
+            return False
+        grave.unlink(missing_ok=True)
+        if not self._create(key):
+            return False
+        self.recovered += 1
+        return True
+
+    def _create(self, key: str) -> bool:
+        try:
+            fd = os.open(
+                self._lease_path(key), os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644
+            )
+        except FileExistsError:
+            return False
+        expires = self.clock() + self.lease_s
+        try:
+            os.write(fd, self._lease_body(expires))
+            st = os.fstat(fd)
+        finally:
+            os.close(fd)
+        with self._lock:
+            self._held[key] = ((st.st_dev, st.st_ino), expires)
+        return True
+
+    def renew(self) -> None:
+        """Push back the expiry of every lease this worker still owns."""
+        with self._lock:
+            held = dict(self._held)
+        for key, (inode, expires) in held.items():
+            now = self.clock()
+            if expires <= now:
+                # Others may have taken it over already; they redo the item.
+                self._drop(key)
+                continue
+            try:
+                fd = os.open(self._lease_path(key), os.O_WRONLY)
+            except FileNotFoundError:
+                self._drop(key)
+                continue
+            try:
+                st = os.fstat(fd)
+                if (st.st_dev, st.st_ino) != inode:
+                    self._drop(key)
+                    continue
+                # In place, so a claimer that moved the file aside meanwhile
+                # sees the change and puts it back.
+                body = self._lease_body(now + self.lease_s)
+                os.write(fd, body)
+                os.ftruncate(fd, len(body))
+            finally:
+                os.close(fd)
+            with self._lock:
+                if key in self._held:
+                    self._held[key] = (inode, now + self.lease_s)
+
+    def complete(self, key: str, result: Optional[Dict[str, Any]] = None) -> None:
+        path = self._done_path(key)
+        tmp = path.with_name(f"{path.name}.{self.owner}.tmp")
+        tmp.write_text(
+            json.dumps({"owner": self.owner, **(result or {})}), encoding="utf-8"
+        )
+        os.replace(tmp, path)
+        self.release(key)
+
+    def release(self, key: str) -> None:
+        """Give up a lease without finishing the item."""
+        with self._lock:
+            held = self._held.pop(key, None)
+        if held is None:
+            return
+        path = self._lease_path(key)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return
+        if (st.st_dev, st.st_ino) == held[0]:
+            path.unlink(missing_ok=True)
+
+    def result(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._done_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    @contextmanager
+    def heartbeat(self, interval_s: Optional[float] = None) -> Iterator[None]:
+        """Renew held leases in the background, by default three times per lease."""
+        interval = interval_s if interval_s is not None else self.lease_s / 3
+        stop = threading.Event()
+
+        def beat() -> None:
+            while not stop.wait(interval):
+                self.renew()
+
+        thread = threading.Thread(target=beat, name=f"lease-{self.owner}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
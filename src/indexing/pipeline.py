@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
+
+# Poll interval for blocked queue operations, so workers notice an abort.
+_POLL_S = 0.1
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step: ``fn`` maps an input item to zero or more output items."""
+
+    name: str
+    fn: Callable[[Any], Iterable[Any]]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    # Summed over workers: time inside ``fn``, and time blocked on a full
+    # downstream queue.
+    busy_s: float = 0.0
+    blocked_s: float = 0.0
+    # From the first item taken to the last one finished, across workers.
+    wall_s: float = 0.0
+
+    @property
+    def items_per_s(self) -> float:
+        return self.items_in / self.wall_s if self.wall_s > 0 else 0.0
+
+
+class _Aborted(Exception):
+    pass
+
+
+_DONE = object()
+
+
+class _Run:
+    def __init__(self, stages: Sequence[Stage], queue_size: int) -> None:
+        self.stages = list(stages)
+        self.queues: List[queue.Queue] = [
+            queue.Queue(maxsize=max(1, queue_size)) for _ in range(len(self.stages))
+        ]
+        self.stats = [StageStats(s.name, max(1, s.workers)) for s in self.stages]
+        self.outputs: List[Any] = []
+        self.abort = threading.Event()
+        self.error: Optional[BaseException] = None
+        self._lock = threading.Lock()
+        self._remaining = [max(1, s.workers) for s in self.stages]
+        self._first: List[Optional[float]] = [None] * len(self.stages)
+
+    def fail(self, exc: BaseException) -> None:
+        with self._lock:
+            if self.error is None:
+                self.error = exc
+        self.abort.set()
+
+    def put(self, i: int, item: Any) -> None:
+        """Send ``item`` to stage ``i``, or to the output list past the last stage."""
+        if i == len(self.stages):
+            with self._lock:
+                self.outputs.append(item)
+            return
+        while True:
+            try:
+                self.queues[i].put(item, timeout=_POLL_S)
+                return
+            except queue.Full:
+                if self.abort.is_set():
+                    raise _Aborted() from None
+
+    def get(self, i: int) -> Any:
+        while True:
+            try:
+                return self.queues[i].get(timeout=_POLL_S)
+            except queue.Empty:
+                if self.abort.is_set():
+                    raise _Aborted() from None
+
+    def feed(self, source: Iterable[Any]) -> None:
+        try:
+            for item in source:
+                self.put(0, item)
+            for _ in range(self._remaining[0]):
+                self.put(0, _DONE)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            self.fail(e)
+
+    def work(self, i: int) -> None:
+        stage, stats = self.stages[i], self.stats[i]
+        try:
+            while True:
+                item = self.get(i)
+                if item is _DONE:
+                    break
+                start = time.perf_counter()
+                busy, blocked, produced = self._process(i, stage, item)
+                with self._lock:
+                    first = self._first[i]
+                    if first is None or start < first:
+                        self._first[i] = first = start
+                    stats.wall_s = time.perf_counter() - first
+                    stats.items_in += 1
+                    stats.items_out += produced
+                    stats.busy_s += busy
+                    stats.blocked_s += blocked
+            self._finish(i)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            self.fail(e)
+
+    def _process(self, i: int, stage: Stage, item: Any) -> Tuple[float, float, int]:
+        busy = blocked = 0.0
+        produced = 0
+        t = time.perf_counter()
+        for out in stage.fn(item):
+            now = time.perf_counter()
+            busy += now - t
+            self.put(i + 1, out)
+            t = time.perf_counter()
+            blocked += t - now
+            produced += 1
+        busy += time.perf_counter() - t
+        return busy, blocked, produced
+
+    def _finish(self, i: int) -> None:
+        # The last worker of a stage to finish tells every downstream worker.
+        with self._lock:
+            self._remaining[i] -= 1
+            last = self._remaining[i] == 0
+        if last and i + 1 < len(self.stages):
+            for _ in range(self._remaining[i + 1]):
+                self.put(i + 1, _DONE)
+
+
+def run_pipeline(
+    source: Iterable[Any],
+    stages: Sequence[Stage],
+    *,
+    queue_size: int = 8,
+) -> Tuple[List[Any], List[StageStats]]:
+    """Stream ``source`` through ``stages`` on worker threads.
+
+    Stages are connected by queues of at most ``queue_size`` items, so a slow
+    stage holds back the ones before it instead of letting work pile up in
+    memory. Returns the last stage's outputs (in completion order) and
+    per-stage counters. The first exception in any stage stops the pipeline
+    and is re-raised here.
+    """
+    if not stages:
+        return list(source), []
+
+    run = _Run(stages, queue_size)
+    threads = [
+        threading.Thread(
+            target=run.feed, args=(source,), name="pipeline-feed", daemon=True
+        )
+    ]
+    for i, stage in enumerate(run.stages):
+        threads.extend(
+            threading.Thread(
+                target=run.work,
+                args=(i,),
+                name=f"pipeline-{stage.name}-{w}",
+                daemon=True,
+            )
+            for w in range(run.stats[i].workers)
+        )
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    if run.error is not None:
+        raise run.error
+    return run.outputs, run.stats
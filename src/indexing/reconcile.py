@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from src.config.settings import Settings
+from src.indexing.ingest_pdfs import doc_id_for, list_pdfs
+from src.retrieval.courses import (
+    course_of,
+    course_settings,
+    group_by_course,
+    list_courses,
+)
+from src.retrieval.doc_router import doc_point_id, get_doc_store, refresh_doc_vectors
+from src.retrieval.side_store import SideStore, get_side_store
+from src.retrieval.store_base import get_vector_store
+from src.utils.ids import make_chunk_id, make_point_id
+from src.utils.logger import get_logger
+
+
+@dataclass(frozen=True)
+class ReconcileStats:
+    docs_checked: int
+    # Documents whose PDF is gone, and documents that kept points past their
+    # current chunk count (re-chunked or edited since they were first indexed).
+    docs_removed: int
+    docs_trimmed: int
+    # Stored documents with no catalog entry; their expected chunks are unknown.
+    docs_unverified: int
+    points_stale: int
+    points_deleted: int
+    bytes_reclaimed: int
+    elapsed_s: float = 0.0
+
+
+def reconcile(
+    *, dry_run: bool = False, cfg: Optional[Settings] = None
+) -> ReconcileStats:
+    """Delete points that no current PDF chunk accounts for.
+
+    The expected chunks of a document are ``0 .. n-1`` for the chunk count the
+    last index run recorded in the catalog, so run ``index_pdfs`` first. A PDF
+    that is no longer under ``pdf_dir`` loses all of its points.
+    """
+    cfg = cfg or Settings.snapshot()
+    pdf_dir = Path(cfg.pdf_dir)
+    present = {doc_id_for(p): p for p in list_pdfs(pdf_dir)}
+    if not cfg.course_shards:
+        return _reconcile_collection(cfg, set(present), dry_run=dry_run)
+
+    by_course = group_by_course(
+        present, lambda d: course_of(present[d].relative_to(pdf_dir))
+    )
+    stats = [
+        _reconcile_collection(
+            course_settings(cfg, course),
+            set(by_course.get(course, ())),
+            dry_run=dry_run,
+        )
+        for course in list_courses(cfg)
+    ]
+    return ReconcileStats(
+        **{
+            f.name: sum(getattr(s, f.name) for s in stats)
+            for f in fields(ReconcileStats)
+        }
+    )
+
+
+def _expected_point_ids(doc_id: str, chunks: int) -> Set[str]:
+    return {make_point_id(make_chunk_id("pdf", doc_id, i)) for i in range(chunks)}
+
+
+def _reconcile_collection(
+    cfg: Settings, present: Set[str], *, dry_run: bool
+) -> ReconcileStats:
+    start = time.perf_counter()
+    store = get_vector_store(cfg)
+    side = get_side_store(cfg)
+    catalog = {e.doc_id: e for e in side.catalog()}
+    stored = store.doc_point_ids()
+
+    stale: List[str] = []
+    removed: List[str] = []
+    trimmed: Dict[str, int] = {}
+    unverified = 0
+    for doc_id, point_ids in stored.items():
+        if doc_id not in present:
+            removed.append(doc_id)
+            stale.extend(point_ids)
+            continue
+        entry = catalog.get(doc_id)
+        if entry is None:
+            unverified += 1
+            continue
+        expected = _expected_point_ids(doc_id, entry.chunks)
+        extra = [pid for pid in point_ids if pid not in expected]
+        if extra:
+            trimmed[doc_id] = entry.chunks
+            stale.extend(extra)
+
+    deleted = freed = 0
+    if not dry_run:
+        deleted, freed = store.delete_points(stale)
+        _prune_side_store(
+            side, trimmed, removed + [d for d in catalog if d not in present]
+        )
+        if cfg.doc_routing and (removed or trimmed):
+            get_doc_store(cfg).delete_points([doc_point_id(d) for d in removed])
+            refresh_doc_vectors(cfg, store, [], changed=trimmed)
+
+    stats = ReconcileStats(
+        docs_checked=len(stored),
+        docs_removed=len(removed),
+        docs_trimmed=len(trimmed),
+        docs_unverified=unverified,
+        points_stale=len(stale),
+        points_deleted=deleted,
+        bytes_reclaimed=freed,
+        elapsed_s=time.perf_counter() - start,
+    )
+    get_logger().info(
+        "reconciled %s%s: %d docs, %d removed, %d trimmed, %d stale points, "
+        "%d deleted (%d bytes)",
+        cfg.qdrant_collection,
+        " (dry run)" if dry_run else "",
+        stats.docs_checked,
+        stats.docs_removed,
+        stats.docs_trimmed,
+        stats.points_stale,
+        stats.points_deleted,
+        stats.bytes_reclaimed,
+    )
+    return stats
+
+
+def _prune_side_store(
+    side: SideStore, trimmed: Dict[str, int], removed: List[str]
+) -> None:
+    keep = {make_chunk_id("pdf", d, i) for d, n in trimmed.items() for i in range(n)}
+    stale_chunks = [cid for _, cid in side.chunk_ids(list(trimmed)) if cid not in keep]
+    side.delete(chunk_ids=stale_chunks, doc_ids=removed)
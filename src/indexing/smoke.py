@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from typing import List
+
+from src.config.settings import Settings
+from src.retrieval.store_base import get_vector_store
+from src.utils.ids import make_point_id
+
+# Cosine score at which a hit is taken to be the query vector itself.
+_SAME_VECTOR = 0.999
+
+
+def smoke_check(cfg: Settings, *, min_points: int = 0, sample: int = 20) -> List[str]:
+    """Problems that should keep a freshly built collection from going live.
+
+    Checks that it holds at least ``min_points``, that sampled stored vectors
+    find their own point (or an identical vector) among the top 3, and that
+    every configured smoke query returns at least one hit above ``min_score``.
+    Empty means healthy.
+    """
+    store = get_vector_store(cfg)
+    problems: List[str] = []
+
+    count = store.count()
+    if count == 0 or count < min_points:
+        problems.append(f"{count} points, expected at least {max(1, min_points)}")
+        return problems
+
+    ids, vectors, _ = next(iter(store.iter_points(batch_size=sample)))
+    lost = 0
+    for pid, vec in zip(ids, vectors):
+        hits = store.search(vec.tolist(), top_k=3)
+        found = {make_point_id(p.get("chunk_id", "")) for _, p in hits}
+        # Duplicate chunks share a vector, so an exact match also counts.
+        lost += pid not in found and not (hits and (hits[0][0] or 0.0) >= _SAME_VECTOR)
+    if lost:
+        problems.append(f"{lost}/{len(ids)} sampled points do not find themselves")
+
+    if cfg.smoke_queries:
+        from src.llm.openai_client import OpenAIClient
+
+        embeddings = OpenAIClient(cfg).embed_texts(list(cfg.smoke_queries))
+        for query, emb in zip(cfg.smoke_queries, embeddings):
+            if not store.search(emb, top_k=cfg.top_k, min_score=cfg.min_score):
+                problems.append(f"no hits for smoke query {query!r}")
+    return problems
+
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import json
+import shutil
+import time
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional
+
+import numpy as np
+
+from src.config.settings import Settings
+from src.retrieval.doc_router import refresh_doc_vectors
+from src.retrieval.side_store import CatalogEntry, get_side_store, slim_payload
+from src.retrieval.sparse import SparseVocab, docs_path, load_vocab, vocab_path
+from src.retrieval.store_base import VectorStore
+
+BUNDLE_FORMAT = "ai-ta-index-bundle"
+BUNDLE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class BundleStats:
+    points: int
+    dim: int
+    seconds: float
+    bytes_on_disk: int
+    doc_vectors: int = 0
+
+
+def _bundle_header(
+    cfg: Settings, count: int, dim: int, dtype: str, columns: List[str]
+) -> Dict[str, Any]:
+    return {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "collection": cfg.qdrant_collection,
+        "count": count,
+        "dim": dim,
+        "dtype": dtype,
+        "embed_model": cfg.embed_model,
+        "chunking": {
+            "chunk_chars": cfg.chunk_chars,
+            "chunk_overlap": cfg.chunk_overlap,
+            "max_chunks_per_doc": cfg.max_chunks_per_doc,
+        },
+        "columns": columns,
+    }
+
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _copy_if_exists(src: Path, dest: Path) -> None:
+    if src.exists():
+        shutil.copyfile(src, dest)
+
+
+def export_bundle(
+    store: VectorStore,
+    out_dir: Path,
+    cfg: Settings,
+    *,
+    dtype: str = "float32",
+    batch_size: int = 1024,
+) -> BundleStats:
+    """Write every point of ``store`` to a bundle directory.
+
+    Layout: ``header.json`` (format version, embed model, dimension, chunking
+    config), ``ids.npy``, ``vectors.npy`` (one contiguous (n, dim) array) and
+    ``columns/<field>.jsonl`` with one JSON value per point, in id order.
+    Payloads are full even when the store's are slim, and ``catalog.jsonl``
+    carries the document catalog. The sparse vocabulary, if one has been
+    built, is copied alongside; sparse vectors themselves are re-encoded from
+    ``text`` on import. Raises RuntimeError if slim points cannot be hydrated
+    because this host lacks their side store.
+    """
+    start = time.perf_counter()
+    out_dir = Path(out_dir)
+    tmp_dir = out_dir.with_name(out_dir.name + ".partial")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    (tmp_dir / "columns").mkdir(parents=True)
+
+    ids: List[str] = []
+    dim: Optional[int] = None
+    raw_path = tmp_dir / "vectors.raw"
+    columns: Dict[str, IO[str]] = {}
+
+    # Bundles are self-contained: slim payloads get their text and doc fields back.
+    side = get_side_store(cfg)
+    with ExitStack() as stack, raw_path.open("wb") as raw:
+        for batch_ids, vectors, stored in store.iter_points(batch_size):
+            payloads = side.hydrate_payloads(stored)
+            if dim is None:
+                dim = int(vectors.shape[1])
+            raw.write(np.ascontiguousarray(vectors, dtype=dtype).tobytes())
+            _write_columns(stack, tmp_dir / "columns", columns, payloads, len(ids))
+            ids.extend(batch_ids)
+
+    dim = dim or cfg.embedding_dim
+    count = len(ids)
+
+    # Wrap the raw rows in an .npy header so import can memory-map them directly.
+    vectors_out = np.lib.format.open_memmap(
+        tmp_dir / "vectors.npy", mode="w+", dtype=dtype, shape=(count, dim)
+    )
+    if count:
+        vectors_out[:] = np.memmap(raw_path, dtype=dtype, mode="r", shape=(count, dim))
+    vectors_out.flush()
+    del vectors_out
+    raw_path.unlink()
+
+    np.save(tmp_dir / "ids.npy", np.asarray(ids, dtype=str))
+    with (tmp_dir / "catalog.jsonl").open("w", encoding="utf-8") as fh:
+        for entry in side.catalog():
+            fh.write(json.dumps(asdict(entry), ensure_ascii=False) + "\n")
+    bundled = tmp_dir / "sparse_vocab.json"
+    _copy_if_exists(docs_path(vocab_path(cfg)), docs_path(bundled))
+    _copy_if_exists(vocab_path(cfg), bundled)
+    header = _bundle_header(cfg, count, dim, dtype, sorted(columns))
+    (tmp_dir / "header.json").write_text(json.dumps(header, indent=2), encoding="utf-8")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    tmp_dir.rename(out_dir)
+
+    return BundleStats(
+        points=count,
+        dim=dim,
+        seconds=time.perf_counter() - start,
+        bytes_on_disk=_dir_size(out_dir),
+    )
+
+
+def _write_columns(
+    stack: ExitStack,
+    columns_dir: Path,
+    columns: Dict[str, IO[str]],
+    payloads: List[Dict[str, Any]],
+    written: int,
+) -> None:
+    for j, payload in enumerate(payloads):
+        for key in payload:
+            if key not in columns:
+                path = columns_dir / f"{key}.jsonl"
+                fh = stack.enter_context(path.open("w", encoding="utf-8"))
+                # Columns first seen mid-stream are back-filled with nulls.
+                fh.write("null\n" * (written + j))
+                columns[key] = fh
+        for key, fh in columns.items():
+            fh.write(json.dumps(payload.get(key), ensure_ascii=False) + "\n")
+
+
+def read_header(bundle_dir: Path) -> Dict[str, Any]:
+    header = json.loads((Path(bundle_dir) / "header.json").read_text(encoding="utf-8"))
+    if header.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"{bundle_dir} is not an index bundle")
+    if header.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"unsupported bundle version {header.get('version')!r}")
+    return header
+
+
+def check_compatible(header: Dict[str, Any], cfg: Settings) -> List[str]:
+    """Differences between the bundle and the current settings, empty if none."""
+    problems: List[str] = []
+    if header["dim"] != cfg.embedding_dim:
+        problems.append(f"dim {header['dim']} != embedding_dim {cfg.embedding_dim}")
+    if header["embed_model"] != cfg.embed_model:
+        problems.append(f"embed_model {header['embed_model']!r} != {cfg.embed_model!r}")
+    chunking = header.get("chunking", {})
+    current = {
+        "chunk_chars": cfg.chunk_chars,
+        "chunk_overlap": cfg.chunk_overlap,
+        "max_chunks_per_doc": cfg.max_chunks_per_doc,
+    }
+    for key, value in current.items():
+        if chunking.get(key) != value:
+            problems.append(f"{key} {chunking.get(key)!r} != {value!r}")
+    return problems
+
+
+def _read_catalog(bundle_dir: Path) -> List[CatalogEntry]:
+    path = bundle_dir / "catalog.jsonl"
+    if not path.exists():
+        raise ValueError(f"bundle {bundle_dir} has no catalog.jsonl; re-export it")
+    with path.open(encoding="utf-8") as fh:
+        return [CatalogEntry(**json.loads(line)) for line in fh if line.strip()]
+
+
+def _bundle_vocab(bundle_dir: Path, cfg: Settings) -> Optional[SparseVocab]:
+    """The bundle's sparse vocabulary, installed for ``cfg``; else the local one."""
+    bundled = bundle_dir / "sparse_vocab.json"
+    if not bundled.exists():
+        return load_vocab(cfg)
+    vocab_path(cfg).parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(docs_path(bundled), docs_path(vocab_path(cfg)))
+    shutil.copyfile(bundled, vocab_path(cfg))
+    return SparseVocab.load(bundled)
+
+
+def _read_payloads(readers: Dict[str, IO[str]], n: int) -> List[Dict[str, Any]]:
+    payloads: List[Dict[str, Any]] = [{} for _ in range(n)]
+    for name, fh in readers.items():
+        for payload in payloads:
+            value = json.loads(fh.readline())
+            if value is not None:
+                payload[name] = value
+    return payloads
+
+
+def _load_batch(
+    store: VectorStore,
+    cfg: Settings,
+    ids: List[str],
+    vectors: np.ndarray,
+    payloads: List[Dict[str, Any]],
+    vocab: Optional[SparseVocab],
+) -> None:
+    sparse = None
+    if vocab is not None:
+        sparse = [vocab.encode_document(p.get("text") or "") for p in payloads]
+    if cfg.slim_payloads:
+        get_side_store(cfg).put_payloads(payloads)
+        payloads = [slim_payload(p) for p in payloads]
+    store.upsert_points(
+        ids, np.asarray(vectors, dtype=np.float32), payloads, sparse=sparse
+    )
+
+
+def import_bundle(
+    bundle_dir: Path,
+    store: VectorStore,
+    cfg: Settings,
+    *,
+    batch_size: int = 4096,
+    force: bool = False,
+    reset: bool = False,
+) -> BundleStats:
+    """Bulk-load a bundle into ``store``; refuses mismatched settings unless ``force``.
+
+    The side store gets the bundle's document catalog and, with slim
+    payloads, the chunk text. Document vectors are rebuilt when ``doc_routing`` is on.
+    ``reset`` empties the store, side store and document vectors first.
+    """
+    start = time.perf_counter()
+    bundle_dir = Path(bundle_dir)
+    header = read_header(bundle_dir)
+
+    problems = check_compatible(header, cfg)
+    if problems and not force:
+        raise ValueError(
+            "bundle does not match current settings: " + "; ".join(problems)
+        )
+
+    ids = np.load(bundle_dir / "ids.npy")
+    vectors = np.load(bundle_dir / "vectors.npy", mmap_mode="r")
+    count = int(header["count"])
+    if len(ids) != count or vectors.shape != (count, header["dim"]):
+        raise ValueError(f"bundle {bundle_dir} is truncated or corrupt")
+    if count and "text" not in header["columns"] and not force:
+        raise ValueError(f"bundle {bundle_dir} has no chunk text; re-export it")
+
+    catalog = _read_catalog(bundle_dir)
+    vocab = _bundle_vocab(bundle_dir, cfg) if cfg.hybrid else None
+    side = get_side_store(cfg)
+    if reset:
+        store.reset()
+        side.reset()
+    store.ensure_collection(int(header["dim"]))
+
+    with ExitStack() as stack:
+        readers = {
+            name: stack.enter_context(
+                (bundle_dir / "columns" / f"{name}.jsonl").open(encoding="utf-8")
+            )
+            for name in header["columns"]
+        }
+        for lo in range(0, count, batch_size):
+            hi = min(count, lo + batch_size)
+            payloads = _read_payloads(readers, hi - lo)
+            batch_ids = [str(i) for i in ids[lo:hi]]
+            _load_batch(store, cfg, batch_ids, vectors[lo:hi], payloads, vocab)
+
+    side.put_catalog(catalog)
+    doc_vectors = 0
+    if cfg.doc_routing:
+        doc_ids = sorted(entry.doc_id for entry in catalog)
+        doc_vectors = refresh_doc_vectors(
+            cfg, store, doc_ids, changed=doc_ids, reset=reset
+        )
+
+    return BundleStats(
+        points=count,
+        dim=int(header["dim"]),
+        seconds=time.perf_counter() - start,
+        bytes_on_disk=_dir_size(bundle_dir),
+        doc_vectors=doc_vectors,
+    )
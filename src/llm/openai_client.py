@@ -1,48 +1,107 @@
 from __future__ import annotations
 
-import math
-from typing import List, Optional
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional
 
-from openai import OpenAI
+from src.utils.resilience import GuardConfig, get_guard
+from src.utils.tracing import span
 
-from src.config.settings import Settings
+if TYPE_CHECKING:
+    from src.config.settings import Settings
 
 
 class OpenAIClient:
     """Thin wrapper around OpenAI embeddings and chat APIs."""
 
     def __init__(self, cfg: Optional[Settings] = None) -> None:
-        self.cfg = cfg or Settings.load()
+        # Imported here so importing this module does not pull in the openai SDK.
+        from openai import OpenAI
+
+        from src.config.settings import Settings
+
+        self.cfg = cfg or Settings.snapshot()
         self.client = OpenAI(api_key=self.cfg.openai_api_key)
+        # Separate guards: embedding and completion latencies are far apart, so
+        # they would skew each other's hedge delay.
+        embed_cfg = GuardConfig(**self.cfg.embed_resilience.model_dump())
+        self.embed_guard = get_guard("openai-embed", embed_cfg)
+        # Indexing batches are far larger than query embeddings and a hedge
+        # bills them twice, so bulk calls get their own unhedged guard.
+        self.bulk_guard = get_guard(
+            "openai-embed-bulk", replace(embed_cfg, hedge=False)
+        )
+        self.chat_guard = get_guard(
+            "openai-chat", GuardConfig(**self.cfg.chat_resilience.model_dump())
+        )
+        self._embeddings = _sdk(self.client, self.embed_guard.cfg).embeddings
+        self._completions = _sdk(self.client, self.chat_guard.cfg).chat.completions
 
-    def embed_texts(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
-        """Embed texts in batches to stay within request limits."""
+    def embed_texts(
+        self,
+        texts: List[str],
+        batch_size: int = 64,
+        max_batch_chars: int = 400_000,
+        bulk: bool = False,
+    ) -> List[List[float]]:
+        """Embed texts in batches to stay within request limits.
+
+        A batch closes at ``batch_size`` inputs or ``max_batch_chars`` characters
+        (roughly 100k tokens), so many short queries pack into few requests.
+        ``bulk`` marks indexing work, which goes through the unhedged guard.
+        """
         if not texts:
             return []
 
+        guard = self.bulk_guard if bulk else self.embed_guard
         embeddings: List[List[float]] = []
-        total = len(texts)
-        batches = math.ceil(total / batch_size)
-
-        for i in range(batches):
-            start = i * batch_size
-            batch = texts[start : start + batch_size]
-
-            resp = self.client.embeddings.create(
-                model=self.cfg.embed_model,
-                input=batch,
-            )
-            embeddings.extend([d.embedding for d in resp.data])
+        with span("openai.embed", texts=len(texts), bulk=bulk):
+            for batch in _pack(texts, batch_size, max_batch_chars):
+                resp = guard.call(
+                    self._embeddings.create,
+                    model=self.cfg.embed_model,
+                    input=batch,
+                )
+                embeddings.extend([d.embedding for d in resp.data])
 
         return embeddings
 
     def chat(self, system_prompt: str, user_prompt: str) -> str:
         """Single-turn chat completion."""
-        resp = self.client.chat.completions.create(
-            model=self.cfg.chat_model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt},
-            ],
-        )
+        with span("openai.chat", model=self.cfg.chat_model) as sp:
+            resp = self.chat_guard.call(
+                self._completions.create,
+                model=self.cfg.chat_model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+            )
+            usage = getattr(resp, "usage", None)
+            if usage is not None:
+                sp.set(
+                    prompt_tokens=usage.prompt_tokens,
+                    completion_tokens=usage.completion_tokens,
+                )
         return resp.choices[0].message.content or ""
+
+
+def _sdk(client: Any, guard: GuardConfig) -> Any:
+    """The SDK client with the guard's timeout per attempt.
+
+    The SDK keeps its own retries, which back off on 429 and 5xx responses;
+    the guard only hedges attempts that are slow, not ones that fail.
+    """
+    return client.with_options(timeout=guard.timeout_s or None)
+
+
+def _pack(texts: List[str], batch_size: int, max_chars: int) -> Iterator[List[str]]:
+    batch: List[str] = []
+    chars = 0
+    for text in texts:
+        if batch and (len(batch) >= batch_size or chars + len(text) > max_chars):
+            yield batch
+            batch, chars = [], 0
+        batch.append(text)
+        chars += len(text)
+    if batch:
+        yield batch
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+# PDFs directly under pdf_dir, outside any course directory.
+DEFAULT_COURSE = "general"
+
+_SLUG_RE = re.compile(r"[^a-z0-9_]+")
+
+T = TypeVar("T")
+
+
+def course_of(relative_path: str | Path) -> str:
+    """Course of a PDF: its first directory under ``pdf_dir``."""
+    parts = Path(relative_path).parts
+    return parts[0] if len(parts) > 1 else DEFAULT_COURSE
+
+
+def course_slug(course: str) -> str:
+    return _SLUG_RE.sub("_", course.strip().lower()).strip("_") or DEFAULT_COURSE
+
+
+def course_settings(cfg: Settings, course: str) -> Settings:
+    """Settings for one course shard: its own collection (and with it its own
+    side store, sparse vocabulary, index version and document vectors)."""
+    return cfg.override(
+        qdrant_collection=f"{cfg.qdrant_collection}__{course_slug(course)}",
+        course=course,
+        course_shards=False,
+    )
+
+
+def check_slugs(courses: Iterable[str]) -> None:
+    """Refuse course names that would share one shard collection (e.g. "ML 101"
+    and "ml-101")."""
+    by_slug: Dict[str, List[str]] = {}
+    for course in courses:
+        by_slug.setdefault(course_slug(course), []).append(course)
+    clashes = sorted(sorted(names) for names in by_slug.values() if len(names) > 1)
+    if clashes:
+        listed = "; ".join(" / ".join(repr(n) for n in names) for names in clashes)
+        raise ValueError(
+            f"courses that would share one shard collection: {listed}. Rename the "
+            "directories apart (or rebuild with --reset after renaming one)."
+        )
+
+
+def courses_path(cfg: Settings) -> Path:
+    return Path(cfg.artifacts_dir) / f"{cfg.qdrant_collection}.courses.json"
+
+
+def save_courses(
+    cfg: Settings, courses: Iterable[str], *, replace: bool = False
+) -> List[str]:
+    """Record the course list; raises ValueError if two courses share a shard."""
+    names = set(courses) if replace else set(courses) | set(list_courses(cfg))
+    check_slugs(names)
+    path = courses_path(cfg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(sorted(names), indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return sorted(names)
+
+
+def list_courses(cfg: Settings) -> List[str]:
+    """Courses written by the last sharded index run; empty before the first one."""
+    try:
+        return list(json.loads(courses_path(cfg).read_text(encoding="utf-8")))
+    except (OSError, ValueError):
+        return []
+
+
+def shard_settings(cfg: Settings) -> List[Settings]:
+    """The shards a query touches: the selected course, or every course."""
+    courses = [cfg.course] if cfg.course else list_courses(cfg)
+    return [course_settings(cfg, c) for c in courses]
+
+
+_POOL: Optional[ThreadPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def fan_out(shards: List[Settings], fn: Callable[[Settings], T]) -> List[T]:
+    """``fn`` over every shard, concurrently when there is more than one."""
+    global _POOL
+    if len(shards) <= 1:
+        return [fn(s) for s in shards]
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix="course-fanout"
+            )
+    # Each task runs in a copy of the caller's context, so trace spans nest.
+    futures = [_POOL.submit(contextvars.copy_context().run, fn, s) for s in shards]
+    return [f.result() for f in futures]
+
+
+def merge_rows(
+    results: Iterable[List[Tuple[float, dict]]], top_k: int
+) -> List[Tuple[float, dict]]:
+    """Best ``top_k`` rows over all shards by score."""
+    rows = [row for shard_rows in results for row in shard_rows]
+    rows.sort(key=lambda r: r[0] if r[0] is not None else float("-inf"), reverse=True)
+    return rows[: int(top_k)]
+
+
+def list_titles(cfg: Settings) -> List[str]:
+    """Titles in the configured store, or across the shards a query would touch.
+
+    Read from the document catalog; stores indexed before the catalog existed
+    fall back to asking the vector store.
+    """
+    if not cfg.course_shards:
+        return _titles(cfg)
+    per_shard = fan_out(shard_settings(cfg), _titles)
+    return sorted({t for titles in per_shard for t in titles})
+
+
+def _titles(cfg: Settings) -> List[str]:
+    from src.retrieval.side_store import get_side_store
+    from src.retrieval.store_base import get_vector_store
+
+    return get_side_store(cfg).titles() or get_vector_store(cfg).list_titles()
+
+
+def group_by_course(
+    docs: Iterable[T], course: Callable[[T], str]
+) -> Dict[str, List[T]]:
+    out: Dict[str, List[T]] = {}
+    for doc in docs:
+        out.setdefault(course(doc), []).append(doc)
+    return out
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from src.retrieval.store_base import VectorStore, get_vector_store
+from src.retrieval.versions import storage_name
+from src.utils.ids import make_point_id
+from src.utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+DOC_COLLECTION_SUFFIX = "__docs"
+
+
+def doc_settings(cfg: Settings) -> Settings:
+    """Settings for the document-vector collection that sits next to the chunk one."""
+    return cfg.override(
+        qdrant_collection=f"{storage_name(cfg)}{DOC_COLLECTION_SUFFIX}",
+        hybrid=False,
+        slim_payloads=False,
+    )
+
+
+def get_doc_store(cfg: Settings) -> VectorStore:
+    return get_vector_store(doc_settings(cfg))
+
+
+def doc_point_id(doc_id: str) -> str:
+    return make_point_id(f"doc::{doc_id}")
+
+
+def build_doc_vectors(
+    store: VectorStore,
+    doc_ids: Optional[Set[str]] = None,
+    batch_size: int = 1024,
+) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
+    """One centroid per document: the normalised mean of its chunk vectors.
+
+    Scans every point in ``store`` once; ``doc_ids`` limits which documents
+    get a vector.
+    """
+    sums: Dict[str, np.ndarray] = {}
+    counts: Dict[str, int] = {}
+    meta: Dict[str, Dict[str, Any]] = {}
+
+    for _, vectors, payloads in store.iter_points(batch_size):
+        vectors = vectors / np.maximum(
+            np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12
+        )
+        for vector, payload in zip(vectors, payloads):
+            doc_id = payload.get("doc_id")
+            if not doc_id or (doc_ids is not None and doc_id not in doc_ids):
+                continue
+            if doc_id not in sums:
+                sums[doc_id] = np.zeros_like(vector, dtype=np.float32)
+                counts[doc_id] = 0
+                meta[doc_id] = {
+                    "source": payload.get("source"),
+                    "doc_id": doc_id,
+                    "title": payload.get("title"),
+                }
+            sums[doc_id] += vector
+            counts[doc_id] += 1
+
+    order = sorted(sums)
+    if not order:
+        return [], np.zeros((0, 0), dtype=np.float32), []
+    matrix = np.stack([sums[d] / counts[d] for d in order]).astype(np.float32)
+    payloads = [{**meta[d], "chunks": counts[d]} for d in order]
+    return [doc_point_id(d) for d in order], matrix, payloads
+
+
+def refresh_doc_vectors(
+    cfg: Settings,
+    store: VectorStore,
+    doc_ids: Iterable[str],
+    changed: Iterable[str] = (),
+    *,
+    reset: bool = False,
+) -> int:
+    """(Re)build vectors for ``changed`` documents and any ``doc_ids`` without one."""
+    docs = get_doc_store(cfg)
+    if reset:
+        docs.reset()
+    docs.ensure_collection(cfg.embedding_dim)
+
+    order = sorted(set(doc_ids))
+    exists = docs.points_exist([doc_point_id(d) for d in order])
+    stale = {d for d, ok in zip(order, exists) if not ok} | set(changed)
+    if not stale:
+        return 0
+
+    ids, vectors, payloads = build_doc_vectors(store, stale)
+    return docs.upsert_points(ids, vectors, payloads) if ids else 0
+
+
+def route_docs(
+    cfg: Settings,
+    query_embedding: Sequence[float],
+    *,
+    source: Optional[str] = None,
+    titles: Optional[Sequence[str]] = None,
+) -> Optional[List[str]]:
+    """doc_ids of the ``doc_routing_top`` documents closest to the query.
+
+    ``None`` means "search every chunk": routing is off, or there are no
+    document vectors to route with yet.
+    """
+    if not cfg.doc_routing:
+        return None
+    try:
+        rows = get_doc_store(cfg).search(
+            list(query_embedding),
+            top_k=int(cfg.doc_routing_top),
+            source=source,
+            titles=titles,
+        )
+    except Exception as exc:
+        get_logger().warning("doc routing unavailable, searching all chunks: %s", exc)
+        return None
+    return [p["doc_id"] for _, p in rows if p.get("doc_id")] or None
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.retrieval.sparse import SparseVec
+from src.retrieval.store_base import VectorStore
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+
+def mmr_select(
+    query: Sequence[float],
+    candidates: np.ndarray,
+    k: int,
+    lambda_: float = 0.7,
+) -> List[int]:
+    """Indices of ``k`` candidates chosen by maximal marginal relevance.
+
+    ``lambda_`` = 1 is pure relevance; lower values penalise candidates that
+    are similar to ones already picked. Similarities are cosine, computed once
+    as a candidate x candidate matrix.
+    """
+    n = len(candidates)
+    k = min(int(k), n)
+    if k <= 0:
+        return []
+
+    cand = _normalize(np.asarray(candidates, dtype=np.float32))
+    relevance = cand @ _normalize(np.asarray(query, dtype=np.float32))
+    pairwise = cand @ cand.T
+
+    selected: List[int] = []
+    available = np.ones(n, dtype=bool)
+    redundancy = np.zeros(n, dtype=np.float32)
+
+    for step in range(k):
+        scores = lambda_ * relevance - (1.0 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        pick = int(np.argmax(scores))
+        selected.append(pick)
+        available[pick] = False
+        if step == 0:
+            redundancy = pairwise[pick].copy()
+        else:
+            redundancy = np.maximum(redundancy, pairwise[pick])
+
+    return selected
+
+
+def mmr_search(
+    store: VectorStore,
+    query_embedding: List[float],
+    *,
+    top_k: int,
+    lambda_: float = 0.7,
+    oversample: int = 4,
+    source: Optional[str] = None,
+    titles: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    sparse: Optional[SparseVec] = None,
+    doc_ids: Optional[Sequence[str]] = None,
+) -> List[Tuple[float, dict]]:
+    """Fetch ``top_k * oversample`` candidates with vectors and re-select by MMR."""
+    rows, vectors = store.search_with_vectors(
+        query_embedding,
+        top_k=max(top_k, top_k * max(1, oversample)),
+        source=source,
+        titles=titles,
+        min_score=min_score,
+        sparse=sparse,
+        doc_ids=doc_ids,
+    )
+    if len(rows) <= top_k:
+        return rows
+    return [rows[i] for i in mmr_select(query_embedding, vectors, top_k, lambda_)]
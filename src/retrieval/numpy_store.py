@@ -0,0 +1,828 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.retrieval.query_cache import bump_index_version
+from src.retrieval.sparse import SparseVec
+from src.retrieval.store_base import chunk_payload
+from src.schemas import Chunk
+from src.utils.ids import make_point_id
+
+# One row per point: payload byte offset, payload byte length, source code,
+# title code, the span of its sparse entries (0 length when it has none) and
+# doc_id code.
+_ROW_DTYPE = np.dtype(
+    [
+        ("offset", "<i8"),
+        ("length", "<i8"),
+        ("source", "<i4"),
+        ("title", "<i4"),
+        ("sparse_offset", "<i8"),
+        ("sparse_length", "<i4"),
+        ("doc", "<i4"),
+    ]
+)
+
+# Reciprocal rank fusion: each ranked list adds 1 / (_RRF_K + rank).
+_RRF_K = 60
+
+# Filters keeping at most this share of rows are scored on those rows only.
+_SUBSET_FRACTION = 0.25
+
+
+@dataclass
+class _State:
+    dim: int
+    # Rows in the matrix, including retired ones.
+    count: int
+    # Point id per row; None where a later write of the same id retired the row.
+    ids: List[Optional[str]]
+    id_to_row: Dict[str, int]
+    # The first ``count`` entries of ``row_buffer``.
+    rows: np.ndarray
+    source_values: List[str]
+    title_values: List[str]
+    matrix: Optional[np.ndarray] = None
+    stamp: Tuple[int, int] = (0, 0)
+    codes: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    doc_values: List[str] = field(default_factory=list)
+    # (row, term id, weight) per stored sparse entry, built on first hybrid query.
+    sparse: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+    # Rows still holding a point; None when none are retired.
+    live: Optional[np.ndarray] = None
+    # Spare capacity past ``count``, so a write appends without copying the rows.
+    row_buffer: np.ndarray = field(default_factory=lambda: _grow(None, 0, _ROW_DTYPE))
+    live_buffer: np.ndarray = field(default_factory=lambda: _grow(None, 0, bool))
+    # Byte length of the complete lines in ids.jsonl and codes.jsonl; a torn
+    # tail past these is overwritten by the next write.
+    ids_end: int = 0
+    codes_end: int = 0
+
+
+class NumpyVectorStore:
+    """In-process vector store over a memory-mapped, L2-normalised matrix.
+
+    Layout under ``root``: ``meta.json`` (dimension and dtype), ``vectors.bin``
+    (raw float32/float16 rows), ``payloads.jsonl`` (one JSON payload per
+    write), ``rows.bin`` (payload span plus categorical source/title/doc codes
+    per row), ``codes.jsonl`` (one ``[column, value]`` line per new code) and
+    ``ids.jsonl`` (one point id per row). Writes only append, so a batch costs
+    its own size and not the store's: an id written again gets a new row and
+    its old row is retired. ``ids.jsonl`` is appended last and its line count
+    is the row count, so a reader never sees rows that are not fully written;
+    ``delete_points`` compacts retired rows away.
+    Search is exact cosine top-k over the whole matrix with filters applied as
+    masks, so only the final top-k payloads are read from disk; a selective
+    filter (e.g. routed ``doc_ids``) scores only the rows it keeps. Optional BM25
+    sparse vectors live in ``sparse_indices.bin``/``sparse_values.bin``; a
+    hybrid query fuses the dense and sparse top ``prefetch_k`` by reciprocal rank.
+    """
+
+    def __init__(
+        self,
+        root: Path | str,
+        dtype: str = "float32",
+        block_rows: int = 65536,
+        prefetch_k: int = 64,
+        version_path: Optional[Path] = None,
+        slim_payloads: bool = False,
+    ) -> None:
+        if dtype not in ("float32", "float16"):
+            raise ValueError("dtype must be 'float32' or 'float16'")
+        self.root = Path(root)
+        self.dtype = np.dtype(dtype)
+        self.block_rows = max(1, int(block_rows))
+        self.prefetch_k = max(1, int(prefetch_k))
+        self.version_path = version_path
+        self.slim_payloads = slim_payloads
+        self._state: Optional[_State] = None
+        self._lock = threading.RLock()
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.root / "meta.json"
+
+    @property
+    def _ids_path(self) -> Path:
+        return self.root / "ids.jsonl"
+
+    @property
+    def _codes_path(self) -> Path:
+        return self.root / "codes.jsonl"
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.root / "vectors.bin"
+
+    @property
+    def _payloads_path(self) -> Path:
+        return self.root / "payloads.jsonl"
+
+    @property
+    def _rows_path(self) -> Path:
+        return self.root / "rows.bin"
+
+    @property
+    def _sparse_indices_path(self) -> Path:
+        return self.root / "sparse_indices.bin"
+
+    @property
+    def _sparse_values_path(self) -> Path:
+        return self.root / "sparse_values.bin"
+
+    def ensure_collection(self, vector_size: int) -> None:
+        with self._lock:
+            if self._meta_path.exists():
+                state = self._load()
+                if state.dim != vector_size:
+                    raise ValueError(
+                        f"store at {self.root} has dim {state.dim}, "
+                        f"expected {vector_size}"
+                    )
+                return
+
+            self.root.mkdir(parents=True, exist_ok=True)
+            for path in (
+                self._vectors_path,
+                self._payloads_path,
+                self._rows_path,
+                self._codes_path,
+                self._ids_path,
+                self._sparse_indices_path,
+                self._sparse_values_path,
+            ):
+                path.touch()
+            # Written last: the store exists once meta.json does.
+            meta = {"dim": int(vector_size), "dtype": self.dtype.name}
+            tmp = self._meta_path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp, self._meta_path)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = None
+            if self.root.exists():
+                shutil.rmtree(self.root)
+        bump_index_version(self.version_path)
+
+    def points_exist(self, point_ids: List[str]) -> List[bool]:
+        state = self._load_if_exists()
+        if state is None:
+            return [False] * len(point_ids)
+        return [pid in state.id_to_row for pid in point_ids]
+
+    def count(self) -> int:
+        state = self._load_if_exists()
+        return len(state.id_to_row) if state is not None else 0
+
+    def upsert(
+        self,
+        chunks: Iterable[Chunk],
+        embeddings: Iterable[List[float]],
+        sparse: Optional[Sequence[SparseVec]] = None,
+        ids: Optional[Sequence[str]] = None,
+    ) -> int:
+        chunks_list = list(chunks)
+        vectors = np.asarray(list(embeddings), dtype=np.float32)
+        if len(chunks_list) != len(vectors):
+            raise ValueError("chunks and embeddings must have the same length")
+        if not chunks_list:
+            return 0
+
+        payloads = [chunk_payload(ch, self.slim_payloads) for ch in chunks_list]
+        if ids is None:
+            ids = [make_point_id(ch.chunk_id) for ch in chunks_list]
+        return self.upsert_points(list(ids), vectors, payloads, sparse=sparse)
+
+    def flush(self) -> None:
+        # Writes are applied before upsert returns.
+        pass
+
+    def doc_point_ids(self) -> Dict[str, List[str]]:
+        state = self._load_if_exists()
+        out: Dict[str, List[str]] = {}
+        if state is None:
+            return out
+        for pid, code in zip(state.ids, state.rows["doc"]):
+            if pid is not None and code >= 0:
+                out.setdefault(state.doc_values[code], []).append(pid)
+        return out
+
+    def delete_points(self, point_ids: Sequence[str]) -> Tuple[int, int]:
+        """Drop points and compact every file; returns (points deleted, bytes freed).
+
+        Files are rewritten in place of the old ones, so run this while no
+        other process is reading the store.
+        """
+        with self._lock:
+            state = self._load_if_exists()
+            if state is None:
+                return 0, 0
+            drop = {state.id_to_row[p] for p in point_ids if p in state.id_to_row}
+            if not drop and state.live is None:
+                return 0, 0
+            before = self._disk_bytes()
+            # Retired rows go too, so this also reclaims space of rewritten points.
+            keep = _live_rows(state)
+            keep = keep[~np.isin(keep, list(drop))]
+            try:
+                self._compact(state, keep)
+            finally:
+                self._state = None
+        bump_index_version(self.version_path)
+        return len(drop), before - self._disk_bytes()
+
+    def _disk_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.root.iterdir() if p.is_file())
+
+    def _compact(self, state: _State, keep: np.ndarray) -> None:
+        rows = state.rows[keep].copy()
+        assert state.matrix is not None
+
+        tmp = self._vectors_path.with_name("vectors.bin.tmp")
+        with tmp.open("wb") as fh:
+            for lo in range(0, len(keep), self.block_rows):
+                fh.write(
+                    np.asarray(state.matrix[keep[lo : lo + self.block_rows]]).tobytes()
+                )
+        os.replace(tmp, self._vectors_path)
+
+        tmp = self._payloads_path.with_name("payloads.jsonl.tmp")
+        with self._payloads_path.open("rb") as src, tmp.open("wb") as dst:
+            for i, r in enumerate(keep):
+                src.seek(int(state.rows["offset"][r]))
+                rows["offset"][i] = dst.tell()
+                dst.write(src.read(int(state.rows["length"][r])) + b"\n")
+        os.replace(tmp, self._payloads_path)
+
+        if self._sparse_indices_path.exists():
+            self._compact_sparse(rows)
+
+        tmp = self._rows_path.with_name("rows.bin.tmp")
+        rows.tofile(tmp)
+        os.replace(tmp, self._rows_path)
+        # Replaced last, as it sets the row count.
+        tmp = self._ids_path.with_name("ids.jsonl.tmp")
+        with tmp.open("wb") as fh:
+            fh.writelines(_line(state.ids[r]) for r in keep)
+        os.replace(tmp, self._ids_path)
+
+    def _compact_sparse(self, rows: np.ndarray) -> None:
+        indices = np.fromfile(self._sparse_indices_path, dtype="<i4")
+        values = np.fromfile(self._sparse_values_path, dtype="<f4")
+        spans = [
+            np.arange(
+                int(r["sparse_offset"]),
+                int(r["sparse_offset"]) + int(r["sparse_length"]),
+            )
+            for r in rows
+        ]
+        take = np.concatenate(spans) if spans else np.zeros(0, dtype=np.int64)
+        lengths = rows["sparse_length"].astype(np.int64)
+        rows["sparse_offset"] = (
+            np.concatenate([[0], np.cumsum(lengths)[:-1]]) if len(rows) else 0
+        )
+        for path, data in (
+            (self._sparse_indices_path, indices),
+            (self._sparse_values_path, values),
+        ):
+            tmp = path.with_name(path.name + ".tmp")
+            data[take].tofile(tmp)
+            os.replace(tmp, path)
+
+    def upsert_points(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict[str, Any]],
+        sparse: Optional[Sequence[SparseVec]] = None,
+    ) -> int:
+        """Write pre-built points; rewritten ids get new rows, old ones are retired."""
+        if sparse is not None and len(sparse) != len(ids):
+            raise ValueError("ids and sparse vectors must have the same length")
+        last = {pid: i for i, pid in enumerate(ids)}
+        if len(last) != len(ids):
+            keep = sorted(last.values())
+            ids = [ids[i] for i in keep]
+            vectors = np.asarray(vectors)[keep]
+            payloads = [payloads[i] for i in keep]
+            if sparse is not None:
+                sparse = [sparse[i] for i in keep]
+
+        with self._lock:
+            state = self._load()
+            try:
+                written = self._write(state, ids, vectors, payloads, sparse)
+            except BaseException:
+                # The cached state may be half-updated; reload from disk next time.
+                self._state = None
+                raise
+        bump_index_version(self.version_path)
+        return written
+
+    def _write(
+        self,
+        state: _State,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict[str, Any]],
+        sparse: Optional[Sequence[SparseVec]],
+    ) -> int:
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32)).astype(self.dtype)
+        if vectors.ndim != 2 or vectors.shape[1] != state.dim:
+            raise ValueError(f"expected vectors of dim {state.dim}")
+
+        known = {
+            "source": len(state.source_values),
+            "title": len(state.title_values),
+            "doc": len(state.doc_values),
+        }
+        new_rows = np.zeros(len(ids), dtype=_ROW_DTYPE)
+        with self._payloads_path.open("ab") as fh:
+            offset = fh.tell()
+            for i, payload in enumerate(payloads):
+                blob = json.dumps(payload, ensure_ascii=False).encode("utf-8") + b"\n"
+                fh.write(blob)
+                new_rows[i] = (
+                    offset,
+                    len(blob) - 1,
+                    _code(state, "source", payload.get("source")),
+                    _code(state, "title", payload.get("title")),
+                    0,
+                    0,
+                    _code(state, "doc", payload.get("doc_id")),
+                )
+                offset += len(blob)
+
+        if sparse is not None:
+            self._append_sparse(new_rows, sparse)
+
+        # Each file is written past its committed end, which readers never read;
+        # ids.jsonl goes last and commits the batch.
+        base, count = state.count, state.count + len(ids)
+        _write_at(
+            self._vectors_path,
+            base * state.dim * self.dtype.itemsize,
+            vectors.tobytes(),
+        )
+        new_codes = [
+            _line([column, value])
+            for column, values in _code_columns(state)
+            for value in values[known[column] :]
+        ]
+        codes_end = _write_at(self._codes_path, state.codes_end, b"".join(new_codes))
+        _write_at(self._rows_path, base * _ROW_DTYPE.itemsize, new_rows.tobytes())
+        ids_end = _write_at(self._ids_path, state.ids_end, b"".join(map(_line, ids)))
+
+        # Readers holding ``state`` only look at its first ``base`` rows, so the
+        # lists and buffers grow in place and a new state object is published.
+        row_buffer = _grow(state.row_buffer, count, _ROW_DTYPE)
+        row_buffer[base:count] = new_rows
+        live_buffer = _grow(state.live_buffer, count, bool)
+        live_buffer[base:count] = True
+        for i, pid in enumerate(ids):
+            old = state.id_to_row.get(pid)
+            if old is not None:
+                state.ids[old] = None
+                live_buffer[old] = False
+            state.id_to_row[pid] = base + i
+            state.ids.append(pid)
+
+        new = replace(
+            state,
+            count=count,
+            rows=row_buffer[:count],
+            row_buffer=row_buffer,
+            live_buffer=live_buffer,
+            live=live_buffer[:count] if len(state.id_to_row) < count else None,
+            sparse=None,
+            stamp=_stamp(self._ids_path),
+            ids_end=ids_end,
+            codes_end=codes_end,
+        )
+        new.matrix = self._open_matrix(new)
+        self._state = new
+        return len(ids)
+
+    def _append_sparse(self, new_rows: np.ndarray, sparse: Sequence[SparseVec]) -> None:
+        indices_path, values_path = self._sparse_indices_path, self._sparse_values_path
+        with indices_path.open("ab") as fi, values_path.open("ab") as fv:
+            entry = fi.tell() // 4
+            for i, (indices, values) in enumerate(sparse):
+                fi.write(np.asarray(indices, dtype="<i4").tobytes())
+                fv.write(np.asarray(values, dtype="<f4").tobytes())
+                new_rows[i]["sparse_offset"] = entry
+                new_rows[i]["sparse_length"] = len(indices)
+                entry += len(indices)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[SparseVec] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[float, dict]]:
+        mask_args = (source, titles, doc_ids)
+        rows, _ = self._search(
+            query_embedding, top_k, mask_args, min_score, sparse, with_vectors=False
+        )
+        return rows
+
+    def search_with_vectors(
+        self,
+        query_embedding: List[float],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[SparseVec] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Tuple[float, dict]], np.ndarray]:
+        mask_args = (source, titles, doc_ids)
+        rows, vectors = self._search(
+            query_embedding, top_k, mask_args, min_score, sparse, with_vectors=True
+        )
+        assert vectors is not None
+        return rows, vectors
+
+    def _search(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        mask_args: Tuple[
+            Optional[str], Optional[Sequence[str]], Optional[Sequence[str]]
+        ],
+        min_score: Optional[float],
+        sparse: Optional[SparseVec],
+        with_vectors: bool,
+    ) -> Tuple[List[Tuple[float, dict]], Optional[np.ndarray]]:
+        state = self._load_if_exists()
+        if state is None or state.count == 0 or top_k <= 0:
+            dim = state.dim if state is not None else len(query_embedding)
+            return [], np.zeros((0, dim), dtype=np.float32) if with_vectors else None
+
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, -1)
+        mask = self._filter_mask(state, *mask_args)
+        dense = self._scores(state, query, mask)[:, 0]
+        top, scores = self._select(state, dense, top_k, mask, min_score, sparse)
+
+        payloads = self._read_payloads(state, top)
+        rows = [(float(scores[i]), p) for i, p in zip(top, payloads)]
+        if not with_vectors:
+            return rows, None
+        assert state.matrix is not None
+        return rows, np.asarray(state.matrix[top], dtype=np.float32)
+
+    def search_many(
+        self,
+        query_embeddings: Sequence[List[float]],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[Sequence[Optional[SparseVec]]] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> List[List[Tuple[float, dict]]]:
+        """Score all queries in one pass over the matrix; results in input order."""
+        if sparse is not None and len(sparse) != len(query_embeddings):
+            raise ValueError(
+                "query_embeddings and sparse vectors must have the same length"
+            )
+        state = self._load_if_exists()
+        if (
+            state is None
+            or state.count == 0
+            or top_k <= 0
+            or len(query_embeddings) == 0
+        ):
+            return [[] for _ in query_embeddings]
+
+        mask = self._filter_mask(state, source, titles, doc_ids)
+        dense = self._scores(
+            state, np.asarray(query_embeddings, dtype=np.float32), mask
+        )
+
+        out: List[List[Tuple[float, dict]]] = []
+        for j in range(dense.shape[1]):
+            sp = sparse[j] if sparse is not None else None
+            top, scores = self._select(state, dense[:, j], top_k, mask, min_score, sp)
+            payloads = self._read_payloads(state, top)
+            out.append([(float(scores[i]), p) for i, p in zip(top, payloads)])
+        return out
+
+    def _select(
+        self,
+        state: _State,
+        scores: np.ndarray,
+        top_k: int,
+        mask: Optional[np.ndarray],
+        min_score: Optional[float],
+        sparse: Optional[SparseVec],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices of the top-k after filters, and the scores that ranked them."""
+        if mask is not None:
+            scores = np.where(mask, scores, -np.inf)
+        if min_score is not None:
+            scores = np.where(scores >= min_score, scores, -np.inf)
+
+        if sparse is not None and len(sparse[0]):
+            # The cosine cut-off applies to the dense list only, as in Qdrant.
+            lexical = self._sparse_scores(state, sparse)
+            lexical = np.where(lexical > 0, lexical, -np.inf)
+            if mask is not None:
+                lexical = np.where(mask, lexical, -np.inf)
+            scores = _rrf([scores, lexical], self.prefetch_k)
+
+        k = min(int(top_k), state.count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return top[np.isfinite(scores[top])], scores
+
+    def list_titles(self) -> List[str]:
+        state = self._load_if_exists()
+        if state is None or state.count == 0:
+            return []
+        used = np.unique(state.rows["title"][_live_rows(state)])
+        return sorted(state.title_values[c] for c in used if c >= 0)
+
+    def iter_points(
+        self, batch_size: int = 1024
+    ) -> Iterator[Tuple[List[str], np.ndarray, List[Dict[str, Any]]]]:
+        state = self._load_if_exists()
+        if state is None:
+            return
+        assert state.matrix is not None
+        live = _live_rows(state)
+        for start in range(0, len(live), batch_size):
+            rows = live[start : start + batch_size]
+            yield (
+                [state.ids[r] for r in rows],
+                np.asarray(state.matrix[rows], dtype=np.float32),
+                self._read_payloads(state, rows),
+            )
+
+    def _scores(
+        self, state: _State, queries: np.ndarray, mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Cosine scores as a (count, n_queries) array; -inf for rows ``mask`` drops
+        when only those rows were scored."""
+        queries = _normalize(queries).T
+        matrix = state.matrix
+        assert matrix is not None
+        if mask is not None:
+            rows = np.flatnonzero(mask)
+            if len(rows) <= _SUBSET_FRACTION * state.count:
+                out = np.full(
+                    (state.count, queries.shape[1]), -np.inf, dtype=np.float32
+                )
+                if len(rows):
+                    out[rows] = np.asarray(matrix[rows], dtype=np.float32) @ queries
+                return out
+
+        if self.dtype == np.float32 and state.count <= self.block_rows:
+            return matrix @ queries
+
+        # Blocked so float16 rows are upcast a slice at a time, not all at once.
+        out = np.empty((state.count, queries.shape[1]), dtype=np.float32)
+        for start in range(0, state.count, self.block_rows):
+            block = matrix[start : start + self.block_rows]
+            out[start : start + len(block)] = (
+                block.astype(np.float32, copy=False) @ queries
+            )
+        return out
+
+    def _sparse_scores(self, state: _State, sparse: SparseVec) -> np.ndarray:
+        rows, terms, weights = self._sparse_entries(state)
+        q_terms = np.asarray(sparse[0], dtype=np.int32)
+        q_weights = np.asarray(sparse[1], dtype=np.float32)
+        order = np.argsort(q_terms)
+        q_terms, q_weights = q_terms[order], q_weights[order]
+
+        pos = np.minimum(np.searchsorted(q_terms, terms), len(q_terms) - 1)
+        hit = q_terms[pos] == terms
+        out = np.bincount(
+            rows[hit], weights=weights[hit] * q_weights[pos[hit]], minlength=state.count
+        )
+        return out.astype(np.float32)
+
+    def _sparse_entries(
+        self, state: _State
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if state.sparse is not None:
+            return state.sparse
+
+        lengths = state.rows["sparse_length"].astype(np.int64)
+        total = int(lengths.sum())
+        if total == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            state.sparse = (empty, empty.astype(np.int32), empty.astype(np.float32))
+            return state.sparse
+
+        # Each row's own span; retired rows are masked out by _filter_mask.
+        rows = np.repeat(np.arange(state.count), lengths)
+        first = np.cumsum(lengths) - lengths
+        pos = np.repeat(state.rows["sparse_offset"], lengths) + (
+            np.arange(total) - np.repeat(first, lengths)
+        )
+        terms = np.fromfile(self._sparse_indices_path, dtype="<i4")[pos]
+        weights = np.fromfile(self._sparse_values_path, dtype="<f4")[pos]
+        state.sparse = (rows, terms, weights)
+        return state.sparse
+
+    def _filter_mask(
+        self,
+        state: _State,
+        source: Optional[str],
+        titles: Optional[Sequence[str]],
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> Optional[np.ndarray]:
+        mask: Optional[np.ndarray] = state.live
+
+        src = (source or "").strip().lower()
+        if src:
+            code = state.codes["source"].get(src, -2)
+            source_mask = state.rows["source"] == code
+            mask = source_mask if mask is None else mask & source_mask
+
+        wanted = {t.strip() for t in (titles or []) if t and t.strip()}
+        if wanted:
+            codes = [
+                state.codes["title"][t] for t in wanted if t in state.codes["title"]
+            ]
+            title_mask = np.isin(state.rows["title"], codes)
+            mask = title_mask if mask is None else mask & title_mask
+
+        docs = {d for d in (doc_ids or []) if d}
+        if docs:
+            codes = [state.codes["doc"][d] for d in docs if d in state.codes["doc"]]
+            doc_mask = np.isin(state.rows["doc"], codes)
+            mask = doc_mask if mask is None else mask & doc_mask
+
+        return mask
+
+    def _read_payloads(self, state: _State, rows: np.ndarray) -> List[Dict[str, Any]]:
+        out: List[Dict[str, Any]] = []
+        with self._payloads_path.open("rb") as fh:
+            for r in rows:
+                fh.seek(int(state.rows["offset"][r]))
+                out.append(json.loads(fh.read(int(state.rows["length"][r]))))
+        return out
+
+    def _load_if_exists(self) -> Optional[_State]:
+        if not self._meta_path.exists():
+            return None
+        return self._load()
+
+    def _load(self) -> _State:
+        with self._lock:
+            stamp = _stamp(self._ids_path)
+            if self._state is not None and self._state.stamp == stamp:
+                return self._state
+
+            meta = json.loads(self._meta_path.read_text(encoding="utf-8"))
+            if meta["dtype"] != self.dtype.name:
+                raise ValueError(
+                    f"store at {self.root} is {meta['dtype']}, not {self.dtype.name}"
+                )
+
+            written, ids_end = _read_lines(self._ids_path)
+            count = len(written)
+            state = _State(
+                dim=int(meta["dim"]),
+                count=count,
+                ids=[],
+                id_to_row={},
+                rows=np.zeros(0, dtype=_ROW_DTYPE),
+                source_values=[],
+                title_values=[],
+                stamp=stamp,
+                ids_end=ids_end,
+            )
+            entries, state.codes_end = _read_lines(self._codes_path)
+            for column, value in entries:
+                _code(state, column, value)
+
+            state.live_buffer = _grow(None, count, bool)
+            state.live_buffer[:count] = True
+            for i, pid in enumerate(written):
+                old = state.id_to_row.get(pid)
+                if old is not None:
+                    state.ids[old] = None
+                    state.live_buffer[old] = False
+                state.id_to_row[pid] = i
+                state.ids.append(pid)
+            if len(state.id_to_row) < count:
+                state.live = state.live_buffer[:count]
+
+            state.row_buffer = _grow(None, count, _ROW_DTYPE)
+            state.row_buffer[:count] = np.fromfile(
+                self._rows_path, dtype=_ROW_DTYPE, count=count
+            )
+            state.rows = state.row_buffer[:count]
+            state.matrix = self._open_matrix(state)
+            self._state = state
+            return state
+
+    def _open_matrix(self, state: _State) -> np.ndarray:
+        if state.count == 0:
+            return np.zeros((0, state.dim), dtype=self.dtype)
+        return np.memmap(
+            self._vectors_path,
+            dtype=self.dtype,
+            mode="r",
+            shape=(state.count, state.dim),
+        )
+
+
+
+def _code(state: _State, column: str, value: Any) -> int:
+    if not isinstance(value, str) or not value:
+        return -1
+    key = value.strip().lower() if column == "source" else value.strip()
+    table = state.codes.setdefault(column, {})
+    values = dict(_code_columns(state))[column]
+    if key not in table:
+        table[key] = len(values)
+        values.append(key)
+    return table[key]
+
+
+def _code_columns(state: _State) -> List[Tuple[str, List[str]]]:
+    return [
+        ("source", state.source_values),
+        ("title", state.title_values),
+        ("doc", state.doc_values),
+    ]
+
+
+def _live_rows(state: _State) -> np.ndarray:
+    if state.live is None:
+        return np.arange(state.count)
+    return np.flatnonzero(state.live)
+
+
+def _grow(buffer: Optional[np.ndarray], size: int, dtype: Any) -> np.ndarray:
+    """``buffer`` if it holds ``size`` entries, else a copy with doubled capacity."""
+    if buffer is not None and len(buffer) >= size:
+        return buffer
+    old = 0 if buffer is None else len(buffer)
+    out = np.zeros(max(size, 2 * old, 1024), dtype=dtype)
+    if buffer is not None:
+        out[:old] = buffer
+    return out
+
+
+def _line(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _read_lines(path: Path) -> Tuple[List[Any], int]:
+    """Parsed complete lines of a JSON-lines file and the byte length they span."""
+    data = path.read_bytes()
+    end = data.rfind(b"\n") + 1
+    return [json.loads(line) for line in data[:end].splitlines()], end
+
+
+def _write_at(path: Path, offset: int, data: bytes) -> int:
+    """Write ``data`` at ``offset``, dropping anything past it; returns the end."""
+    with path.open("r+b") as fh:
+        fh.seek(offset)
+        fh.write(data)
+        fh.truncate()
+        return fh.tell()
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def _rrf(rankings: List[np.ndarray], prefetch_k: int) -> np.ndarray:
+    """Fuse the top ``prefetch_k`` of each score array; -inf marks non-candidates."""
+    fused = np.zeros(len(rankings[0]), dtype=np.float32)
+    for scores in rankings:
+        k = min(prefetch_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[np.isfinite(scores[top])]
+        fused[top] += 1.0 / (_RRF_K + np.arange(1, len(top) + 1))
+    return np.where(fused > 0, fused, -np.inf)
+
+
+def _normalize(x: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return x / np.maximum(norms, 1e-12)
@@ -1,31 +1,247 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
+import math
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
-from qdrant_client import QdrantClient
-from qdrant_client.http.exceptions import UnexpectedResponse
-from qdrant_client.models import Distance, Filter, PointStruct, VectorParams
-
-from src.config.settings import Settings
+from src.retrieval.query_cache import bump_index_version, index_version_path
+from src.retrieval.sparse import SPARSE_VECTOR_NAME, SparseVec
+from src.retrieval.store_base import chunk_payload
 from src.schemas import Chunk
 from src.utils.ids import make_point_id
+from src.utils.logger import get_logger
+from src.utils.resilience import DependencyGuard, GuardConfig, get_guard
+
+# qdrant_client and pydantic-settings are imported lazily so that importing this
+# module (and the Streamlit app) stays cheap until a client is actually needed.
+if TYPE_CHECKING:
+    import numpy as np
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Filter, SearchParams
+
+    from src.config.settings import Settings, TuningProfile
+
+
+_CLIENTS: Dict[Tuple[Any, ...], QdrantClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# Points whose payloads are read to estimate the bytes a delete frees.
+_PAYLOAD_SAMPLE = 32
 
 
 def get_client(cfg: Optional[Settings] = None) -> QdrantClient:
-    cfg = cfg or Settings.load()
-    return QdrantClient(url=cfg.qdrant_url, api_key=cfg.qdrant_api_key)
+    """Process-wide Qdrant client for these connection settings.
+
+    The client keeps its HTTP connection pool or gRPC channel open, so every
+    caller (indexing, queries, title listing) reuses the same connections.
+    """
+    from src.config.settings import Settings
+
+    cfg = cfg or Settings.snapshot()
+    key = (
+        cfg.qdrant_url,
+        cfg.qdrant_api_key,
+        cfg.qdrant_prefer_grpc,
+        cfg.qdrant_grpc_port,
+        cfg.qdrant_pool_size,
+        cfg.qdrant_resilience.timeout_s,
+    )
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = new_client(cfg)
+            _CLIENTS[key] = client
+        return client
+
+
+def new_client(cfg: Settings, prefer_grpc: Optional[bool] = None) -> QdrantClient:
+    """A fresh, unshared client; ``prefer_grpc`` overrides the configured transport."""
+    from qdrant_client import QdrantClient
+
+    grpc = cfg.qdrant_prefer_grpc if prefer_grpc is None else prefer_grpc
+    kwargs: Dict[str, Any] = {}
+    if cfg.qdrant_pool_size is not None:
+        kwargs["pool_size"] = cfg.qdrant_pool_size
+    if grpc:
+        # Keepalive pings stop idle proxies and NATs from silently dropping the channel.
+        kwargs["grpc_options"] = {"grpc.keepalive_time_ms": 30_000}
+    return QdrantClient(
+        url=cfg.qdrant_url,
+        api_key=cfg.qdrant_api_key,
+        timeout=max(1, math.ceil(cfg.qdrant_resilience.timeout_s)),
+        prefer_grpc=grpc,
+        grpc_port=cfg.qdrant_grpc_port,
+        **kwargs,
+    )
+
+
+def qdrant_guard(cfg: Optional[Settings] = None) -> DependencyGuard:
+    if cfg is None:
+        return get_guard("qdrant")
+    return get_guard("qdrant", GuardConfig(**cfg.qdrant_resilience.model_dump()))
 
 
-def ensure_collection(client: QdrantClient, collection: str, vector_size: int) -> None:
+# Payload fields used in query filters; each gets a keyword index.
+INDEXED_FIELDS = ("source", "doc_id", "title")
+
+
+def ensure_collection(
+    client: QdrantClient,
+    collection: str,
+    vector_size: int,
+    profile: Optional[TuningProfile] = None,
+    sparse: bool = False,
+) -> None:
+    from qdrant_client.models import Distance, SparseVectorParams, VectorParams
+
     existing = {c.name for c in client.get_collections().collections}
-    if collection in existing:
-        return
+    if collection not in existing:
+        # Profile options and the sparse vector only take effect at creation;
+        # rebuild to change them.
+        on_disk = profile.on_disk_vectors if profile is not None else None
+        sparse_config = {SPARSE_VECTOR_NAME: SparseVectorParams()} if sparse else None
+        client.create_collection(
+            collection_name=collection,
+            vectors_config=VectorParams(
+                size=vector_size, distance=Distance.COSINE, on_disk=on_disk
+            ),
+            sparse_vectors_config=sparse_config,
+            **_creation_params(profile),
+        )
 
-    client.create_collection(
-        collection_name=collection,
-        vectors_config=VectorParams(size=vector_size, distance=Distance.COSINE),
+    ensure_payload_indexes(client, collection)
+
+
+def _creation_params(profile: Optional[TuningProfile]) -> Dict[str, Any]:
+    from qdrant_client.models import (
+        BinaryQuantization,
+        BinaryQuantizationConfig,
+        HnswConfigDiff,
+        ScalarQuantization,
+        ScalarQuantizationConfig,
+        ScalarType,
     )
 
+    if profile is None:
+        return {}
+
+    params: Dict[str, Any] = {
+        "hnsw_config": HnswConfigDiff(
+            m=profile.hnsw_m, ef_construct=profile.hnsw_ef_construct
+        ),
+        "on_disk_payload": profile.on_disk_payload,
+    }
+    if profile.quantization == "scalar":
+        params["quantization_config"] = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=profile.quantization_always_ram,
+            )
+        )
+    elif profile.quantization == "binary":
+        params["quantization_config"] = BinaryQuantization(
+            binary=BinaryQuantizationConfig(always_ram=profile.quantization_always_ram)
+        )
+    return params
+
+
+def search_params(profile: Optional[TuningProfile]) -> Optional[SearchParams]:
+    from qdrant_client.models import QuantizationSearchParams, SearchParams
+
+    if profile is None:
+        return None
+
+    quantization = None
+    if profile.quantization != "none":
+        # Quantized candidates are over-fetched, then rescored with the originals.
+        quantization = QuantizationSearchParams(
+            rescore=profile.rescore,
+            oversampling=profile.oversampling,
+        )
+    return SearchParams(hnsw_ef=profile.search_ef, quantization=quantization)
+
+
+def estimate_ram_bytes(
+    profile: TuningProfile, n_points: int, vector_size: int
+) -> Dict[str, int]:
+    """Rough steady-state RAM for vectors and the HNSW graph, excluding payloads."""
+    original = n_points * vector_size * 4
+    if profile.quantization == "scalar":
+        quantized = n_points * vector_size
+    elif profile.quantization == "binary":
+        quantized = n_points * math.ceil(vector_size / 8)
+    else:
+        quantized = 0
+
+    vectors_ram = 0 if profile.on_disk_vectors else original
+    quantized_ram = quantized if profile.quantization_always_ram else 0
+    # Layer 0 keeps 2*m links per point; upper layers add a few percent on top.
+    graph = int(n_points * profile.hnsw_m * 2 * 4 * 1.1)
+
+    return {
+        "vectors": vectors_ram,
+        "quantized": quantized_ram,
+        "hnsw_graph": graph,
+        "total": vectors_ram + quantized_ram + graph,
+    }
+
+
+def point_alias(client: QdrantClient, alias: str, collection: str) -> None:
+    """Point ``alias`` at ``collection`` in one atomic alias update.
+
+    A real collection still named ``alias`` (from before blue/green indexing)
+    is deleted first, since an alias cannot shadow it; that one switch is
+    not gap-free.
+    """
+    from qdrant_client.models import (
+        CreateAlias,
+        CreateAliasOperation,
+        DeleteAlias,
+        DeleteAliasOperation,
+    )
+
+    aliases = {a.alias_name for a in client.get_aliases().aliases}
+    ops: List[Any] = []
+    if alias in aliases:
+        ops.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+    elif alias in {c.name for c in client.get_collections().collections}:
+        client.delete_collection(collection_name=alias)
+    ops.append(
+        CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=collection, alias_name=alias)
+        )
+    )
+    client.update_collection_aliases(change_aliases_operations=ops)
+
+
+def ensure_payload_indexes(client: QdrantClient, collection: str) -> None:
+    from qdrant_client.models import PayloadSchemaType
+
+    schema = client.get_collection(collection).payload_schema or {}
+    for field in INDEXED_FIELDS:
+        if field in schema:
+            continue
+        client.create_payload_index(
+            collection_name=collection,
+            field_name=field,
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+
 
 def points_exist(
     client: QdrantClient,
@@ -51,18 +267,152 @@ def points_exist(
     return flags
 
 
+def doc_point_ids(
+    client: QdrantClient, collection: str, batch_size: int = 1024
+) -> Dict[str, List[str]]:
+    """Point ids grouped by ``doc_id``, without vectors or payloads.
+
+    Documents come from a facet on the indexed ``doc_id`` field and each one
+    is scrolled through that index. Servers without the facet API are
+    scrolled once in full, reading only ``doc_id``.
+    """
+    from qdrant_client.models import FieldCondition, Filter, MatchValue
+
+    try:
+        hits = client.facet(
+            collection_name=collection, key="doc_id", limit=1_000_000, exact=True
+        ).hits
+        doc_ids = [str(h.value) for h in hits]
+    except Exception as e:
+        get_logger().debug(
+            "doc_id facet unavailable on %s, scrolling: %s", collection, e
+        )
+        return _scroll_doc_point_ids(client, collection, batch_size)
+
+    out: Dict[str, List[str]] = {}
+    for doc_id in doc_ids:
+        flt = Filter(
+            must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]
+        )
+        out[doc_id] = [
+            str(p.id) for p in _scroll(client, collection, flt, False, batch_size)
+        ]
+    return out
+
+
+def _scroll_doc_point_ids(
+    client: QdrantClient, collection: str, batch_size: int
+) -> Dict[str, List[str]]:
+    out: Dict[str, List[str]] = {}
+    for p in _scroll(client, collection, None, ["doc_id"], batch_size):
+        doc_id = (p.payload or {}).get("doc_id")
+        if doc_id:
+            out.setdefault(str(doc_id), []).append(str(p.id))
+    return out
+
+
+def _scroll(
+    client: QdrantClient,
+    collection: str,
+    flt: Optional[Filter],
+    with_payload: Any,
+    batch_size: int,
+) -> Iterator[Any]:
+    offset: Optional[Any] = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            scroll_filter=flt,
+            limit=batch_size,
+            offset=offset,
+            with_payload=with_payload,
+            with_vectors=False,
+        )
+        yield from points
+        if offset is None or not points:
+            return
+
+
+def delete_points(
+    client: QdrantClient,
+    collection: str,
+    point_ids: Sequence[str],
+    batch_size: int = 1024,
+) -> Tuple[int, int]:
+    """Delete ``point_ids`` in batches; returns (points deleted, estimated bytes freed).
+
+    Bytes are the float32 dense vectors plus a JSON payload per point that
+    existed. Only ids are read back before deleting; the payload size is the
+    mean over a sample of the first points found.
+    """
+    from qdrant_client.models import PointIdsList
+
+    if not point_ids:
+        return 0, 0
+    dim = _dense_dim(client.get_collection(collection).config.params.vectors)
+
+    deleted = 0
+    payload_bytes: Optional[float] = None
+    ids = list(point_ids)
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start : start + batch_size]
+        found = [
+            p.id
+            for p in client.retrieve(
+                collection_name=collection,
+                ids=batch,
+                with_payload=False,
+                with_vectors=False,
+            )
+        ]
+        if not found:
+            continue
+        if payload_bytes is None:
+            sample = client.retrieve(
+                collection_name=collection,
+                ids=found[:_PAYLOAD_SAMPLE],
+                with_payload=True,
+                with_vectors=False,
+            )
+            sizes = [len(json.dumps(p.payload or {}, default=str)) for p in sample]
+            payload_bytes = sum(sizes) / len(sizes) if sizes else 0.0
+        client.delete(
+            collection_name=collection,
+            points_selector=PointIdsList(points=found),
+            wait=True,
+        )
+        deleted += len(found)
+    return deleted, int(deleted * (4 * dim + (payload_bytes or 0.0)))
+
+
+def _dense_dim(vectors: Any) -> int:
+    """Floats per point over the dense vectors, unnamed or named."""
+    if isinstance(vectors, dict):
+        return sum(int(getattr(v, "size", 0) or 0) for v in vectors.values())
+    return int(getattr(vectors, "size", 0) or 0)
+
+
 def upsert_chunks(
     client: QdrantClient,
     collection: str,
     chunks: Iterable[Chunk],
     embeddings: Iterable[List[float]],
     batch_size: int = 64,
+    sparse: Optional[Sequence[SparseVec]] = None,
+    slim: bool = False,
+    ids: Optional[Sequence[str]] = None,
 ) -> int:
+    from qdrant_client.models import PointStruct
+
     chunks_list = list(chunks)
     emb_list = list(embeddings)
 
     if len(chunks_list) != len(emb_list):
         raise ValueError("chunks and embeddings must have the same length")
+    if sparse is not None and len(sparse) != len(chunks_list):
+        raise ValueError("chunks and sparse vectors must have the same length")
+    if ids is not None and len(ids) != len(chunks_list):
+        raise ValueError("chunks and ids must have the same length")
 
     total = 0
     for start in range(0, len(chunks_list), batch_size):
@@ -70,16 +420,13 @@ def upsert_chunks(
         batch_embs = emb_list[start : start + batch_size]
 
         points: List[PointStruct] = []
-        for ch, emb in zip(batch_chunks, batch_embs):
-            pid = make_point_id(ch.chunk_id)
-            payload = {
-                "source": ch.source,
-                "doc_id": ch.doc_id,
-                "chunk_id": ch.chunk_id,
-                "text": ch.text,
-                **(ch.meta or {}),
-            }
-            points.append(PointStruct(id=pid, vector=emb, payload=payload))
+        for i, (ch, emb) in enumerate(zip(batch_chunks, batch_embs)):
+            pid = ids[start + i] if ids is not None else make_point_id(ch.chunk_id)
+            payload = chunk_payload(ch, slim)
+            vector = _point_vector(
+                emb, sparse[start + i] if sparse is not None else None
+            )
+            points.append(PointStruct(id=pid, vector=vector, payload=payload))
 
         if points:
             client.upsert(collection_name=collection, points=points)
@@ -88,78 +435,396 @@ def upsert_chunks(
     return total
 
 
-def _extract_source_from_filter(query_filter: Optional[Filter]) -> Optional[str]:
-    if query_filter is None:
-        return None
+def point_bytes(
+    dense: Any, payload: Dict[str, Any], sparse: Optional[SparseVec] = None
+) -> int:
+    """Rough request size of one point: float32 vector, sparse pairs, JSON payload."""
+    size = 4 * len(dense) + len(json.dumps(payload, ensure_ascii=False, default=str))
+    if sparse is not None:
+        size += 8 * len(sparse[0])
+    return size
 
-    must = getattr(query_filter, "must", None)
-    if not must:
-        return None
 
-    for cond in must:
-        key = getattr(cond, "key", None)
-        if key != "source":
-            continue
+def bulk_upload(
+    client: QdrantClient,
+    collection: str,
+    ids: Sequence[str],
+    vectors: Sequence[Any],
+    payloads: Sequence[Dict[str, Any]],
+    *,
+    sparse: Optional[Sequence[SparseVec]] = None,
+    parallel: int = 4,
+    batch_bytes: int = 4 << 20,
+    wait: bool = False,
+) -> int:
+    """Upload points through ``upload_points`` with ``parallel`` workers.
 
-        match = getattr(cond, "match", None)
-        if match is None:
-            continue
+    Requests are sized by bytes: the batch size is ``batch_bytes`` over the
+    average point size of this call, so 3072-dim points with full payloads and
+    small slim points both land near the same request size. With
+    ``wait=False`` Qdrant acknowledges once the points are in its write-ahead
+    log; call ``consistency_barrier`` before relying on them in queries.
+    """
+    from qdrant_client.models import PointStruct
 
-        value = getattr(match, "value", None)
-        if isinstance(value, str) and value:
-            return value.lower().strip()
+    n = len(ids)
+    if n == 0:
+        return 0
+    sparse_ok = sparse is None or len(sparse) == n
+    if not (len(vectors) == len(payloads) == n) or not sparse_ok:
+        raise ValueError(
+            "ids, vectors, payloads and sparse vectors must have the same length"
+        )
 
-    return None
+    sample = range(0, n, max(1, n // 32))
+    avg = sum(
+        point_bytes(vectors[i], payloads[i], sparse[i] if sparse else None)
+        for i in sample
+    )
+    avg = max(1, avg // len(sample))
+    points = (
+        PointStruct(
+            id=ids[i],
+            vector=_point_vector(vectors[i], sparse[i] if sparse is not None else None),
+            payload=payloads[i],
+        )
+        for i in range(n)
+    )
+    client.upload_points(
+        collection_name=collection,
+        points=points,
+        batch_size=max(1, min(n, int(batch_bytes) // avg)),
+        parallel=max(1, int(parallel)),
+        wait=wait,
+    )
+    return n
 
 
-def _local_filter_by_source(
-    rows: List[Tuple[float, Dict[str, Any]]],
-    source: str,
-) -> List[Tuple[float, Dict[str, Any]]]:
-    s = source.lower().strip()
-    return [(score, payload) for score, payload in rows if (payload.get("source") or "").lower() == s]
+# uuid5 point ids never produce the nil UUID, so this selector matches nothing.
+_NO_POINT = "00000000-0000-0000-0000-000000000000"
+
+
+def consistency_barrier(client: QdrantClient, collection: str) -> None:
+    """Return once every update sent to ``collection`` so far has been applied.
+
+    Qdrant applies the updates of a shard in order, so a filtered no-op
+    delete with ``wait=True`` (sent to every shard) completes only after all
+    earlier ``wait=False`` uploads have.
+    """
+    from qdrant_client.models import Filter, FilterSelector, HasIdCondition
+
+    nothing = Filter(must=[HasIdCondition(has_id=[_NO_POINT])])
+    client.delete(
+        collection_name=collection,
+        points_selector=FilterSelector(filter=nothing),
+        wait=True,
+    )
+
+
+def _point_vector(dense: Any, sparse: Optional[SparseVec]) -> Any:
+    from qdrant_client.models import SparseVector
+
+    if sparse is None:
+        return dense
+    dense = dense.tolist() if hasattr(dense, "tolist") else list(dense)
+    indices, values = sparse
+    return {
+        "": dense,
+        SPARSE_VECTOR_NAME: SparseVector(indices=list(indices), values=list(values)),
+    }
+
+
+def _dense_vector(vector: Any) -> Any:
+    # Points that also carry a sparse vector come back as {"": dense, "bm25": ...}.
+    return vector.get("") if isinstance(vector, dict) else vector
+
+
+def list_titles(
+    client: QdrantClient, collection: str, limit: int = 10_000
+) -> List[str]:
+    """Distinct titles via a facet on the indexed ``title`` field.
+
+    Servers without the facet API are scrolled instead, reading only the
+    title fields of each point.
+    """
+    try:
+        hits = client.facet(collection_name=collection, key="title", limit=limit).hits
+        return sorted({str(h.value).strip() for h in hits if str(h.value).strip()})
+    except Exception as e:
+        get_logger().debug(
+            "title facet unavailable on %s, scrolling: %s", collection, e
+        )
+
+    titles: set[str] = set()
+    offset: Optional[Any] = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection,
+            limit=1024,
+            offset=offset,
+            with_payload=["title", "filename", "doc_id"],
+            with_vectors=False,
+        )
+        for p in points:
+            payload = p.payload or {}
+            title = (
+                payload.get("title") or payload.get("filename") or payload.get("doc_id")
+            )
+            if isinstance(title, str) and title.strip():
+                titles.add(title.strip())
+        if offset is None or not points:
+            return sorted(titles)
+
+
+@dataclass(frozen=True)
+class SearchStats:
+    hits: int
+    limit: int
+    filtered: bool
+    payload_bytes: int
+    latency_ms: float
 
 
-def _unfiltered_vector_search(
+def build_filter(
+    query_filter: Optional[Filter] = None,
+    *,
+    source: Optional[str] = None,
+    titles: Optional[Sequence[str]] = None,
+    doc_ids: Optional[Sequence[str]] = None,
+) -> Optional[Filter]:
+    from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
+
+    must: List[Any] = list(
+        (query_filter.must or []) if query_filter is not None else []
+    )
+
+    src = (source or "").strip().lower()
+    if src:
+        must.append(FieldCondition(key="source", match=MatchValue(value=src)))
+
+    wanted = sorted({t.strip() for t in (titles or []) if t and t.strip()})
+    if wanted:
+        must.append(FieldCondition(key="title", match=MatchAny(any=wanted)))
+
+    docs = sorted({d for d in (doc_ids or []) if d})
+    if docs:
+        must.append(FieldCondition(key="doc_id", match=MatchAny(any=docs)))
+
+    if query_filter is None and not must:
+        return None
+
+    return Filter(
+        must=must or None,
+        should=query_filter.should if query_filter is not None else None,
+        must_not=query_filter.must_not if query_filter is not None else None,
+    )
+
+
+def _query_points(
     client: QdrantClient,
     collection: str,
     query_embedding: List[float],
     limit: int,
-) -> List[Tuple[float, Dict[str, Any]]]:
+    query_filter: Optional[Filter],
+    score_threshold: Optional[float],
+    params: Optional[SearchParams] = None,
+    with_vectors: bool = False,
+    sparse: Optional[SparseVec] = None,
+    prefetch_k: int = 64,
+) -> List[Any]:
+    if sparse is not None and hasattr(client, "query_points"):
+        return _hybrid_query(
+            client,
+            collection,
+            query_embedding,
+            sparse,
+            limit,
+            query_filter,
+            score_threshold,
+            params,
+            with_vectors,
+            prefetch_k,
+        )
+
     if hasattr(client, "query_points"):
         res = client.query_points(
             collection_name=collection,
             query=query_embedding,
+            query_filter=query_filter,
+            search_params=params,
+            score_threshold=score_threshold,
             limit=limit,
             with_payload=True,
-            with_vectors=False,
-        )
-        points = getattr(res, "points", res)
-        return [(p.score, p.payload or {}) for p in points]
-
-    if hasattr(client, "search_points"):
-        hits = client.search_points(
-            collection_name=collection,
-            query_vector=query_embedding,
-            limit=limit,
-            with_payload=True,
-            with_vectors=False,
+            with_vectors=with_vectors,
         )
-        return [(h.score, h.payload or {}) for h in hits]
+        return list(getattr(res, "points", res))
 
     if hasattr(client, "search"):
-        hits = client.search(
-            collection_name=collection,
-            query_vector=query_embedding,
-            limit=limit,
-            with_payload=True,
-            with_vectors=False,
+        return list(
+            client.search(
+                collection_name=collection,
+                query_vector=query_embedding,
+                query_filter=query_filter,
+                search_params=params,
+                score_threshold=score_threshold,
+                limit=limit,
+                with_payload=True,
+                with_vectors=with_vectors,
+            )
         )
-        return [(h.score, h.payload or {}) for h in hits]
 
     raise AttributeError("No supported search method found on QdrantClient.")
 
 
+def _hybrid_query(
+    client: QdrantClient,
+    collection: str,
+    query_embedding: List[float],
+    sparse: SparseVec,
+    limit: int,
+    query_filter: Optional[Filter],
+    score_threshold: Optional[float],
+    params: Optional[SearchParams],
+    with_vectors: bool,
+    prefetch_k: int,
+) -> List[Any]:
+    from qdrant_client.models import Fusion, FusionQuery
+
+    # One request: dense and sparse candidates are gathered server-side under
+    # the same filter and fused by reciprocal rank.
+    res = client.query_points(
+        collection_name=collection,
+        prefetch=_hybrid_prefetch(
+            query_embedding,
+            sparse,
+            limit,
+            query_filter,
+            score_threshold,
+            params,
+            prefetch_k,
+        ),
+        query=FusionQuery(fusion=Fusion.RRF),
+        limit=limit,
+        with_payload=True,
+        with_vectors=with_vectors,
+    )
+    return list(res.points)
+
+
+def _hybrid_prefetch(
+    query_embedding: List[float],
+    sparse: SparseVec,
+    limit: int,
+    query_filter: Optional[Filter],
+    score_threshold: Optional[float],
+    params: Optional[SearchParams],
+    prefetch_k: int,
+) -> List[Any]:
+    from qdrant_client.models import Prefetch, SparseVector
+
+    # The score cut-off is a cosine threshold, so it applies to the dense branch only.
+    prefetch_k = max(int(prefetch_k), int(limit))
+    indices, values = sparse
+    return [
+        Prefetch(
+            query=query_embedding,
+            filter=query_filter,
+            params=params,
+            score_threshold=score_threshold,
+            limit=prefetch_k,
+        ),
+        Prefetch(
+            query=SparseVector(indices=list(indices), values=list(values)),
+            using=SPARSE_VECTOR_NAME,
+            filter=query_filter,
+            limit=prefetch_k,
+        ),
+    ]
+
+
+def _vector_search(
+    client: QdrantClient,
+    collection: str,
+    query_embedding: List[float],
+    limit: int,
+    query_filter: Optional[Filter],
+    score_threshold: Optional[float],
+    params: Optional[SearchParams] = None,
+    sparse: Optional[SparseVec] = None,
+    prefetch_k: int = 64,
+) -> List[Tuple[float, Dict[str, Any]]]:
+    points = _query_points(
+        client,
+        collection,
+        query_embedding,
+        limit,
+        query_filter,
+        score_threshold,
+        params,
+        sparse=sparse,
+        prefetch_k=prefetch_k,
+    )
+    return [(p.score, p.payload or {}) for p in points]
+
+
+def _payload_bytes(rows: List[Tuple[float, Dict[str, Any]]]) -> int:
+    return sum(len(json.dumps(payload, ensure_ascii=False)) for _, payload in rows)
+
+
+def search_with_stats(
+    client: QdrantClient,
+    collection: str,
+    query_embedding: List[float],
+    top_k: int,
+    query_filter: Optional[Filter] = None,
+    source: Optional[str] = None,
+    titles: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    params: Optional[SearchParams] = None,
+    guard: Optional[DependencyGuard] = None,
+    sparse: Optional[SparseVec] = None,
+    prefetch_k: int = 64,
+    doc_ids: Optional[Sequence[str]] = None,
+) -> Tuple[List[Tuple[float, dict]], SearchStats]:
+    flt = build_filter(query_filter, source=source, titles=titles, doc_ids=doc_ids)
+
+    # Filtering and the score cut-off run inside Qdrant against the keyword
+    # payload indexes, so exactly top_k rows come back. One attempt per request:
+    # the guard hedges slow calls and trips the breaker on sustained failures.
+    guard = guard or qdrant_guard()
+    start = time.perf_counter()
+    rows = guard.call(
+        _vector_search,
+        client,
+        collection,
+        query_embedding,
+        top_k,
+        flt,
+        min_score,
+        params,
+        sparse=sparse,
+        prefetch_k=prefetch_k,
+    )
+    latency_ms = (time.perf_counter() - start) * 1000.0
+
+    stats = SearchStats(
+        hits=len(rows),
+        limit=top_k,
+        filtered=flt is not None,
+        payload_bytes=_payload_bytes(rows),
+        latency_ms=latency_ms,
+    )
+    if stats.filtered:
+        get_logger().debug(
+            "filtered search collection=%s hits=%d payload_bytes=%d latency_ms=%.1f",
+            collection,
+            stats.hits,
+            stats.payload_bytes,
+            stats.latency_ms,
+        )
+    return rows, stats
+
+
 def search(
     client: QdrantClient,
     collection: str,
@@ -167,27 +832,406 @@ def search(
     top_k: int,
     query_filter: Optional[Filter] = None,
     source: Optional[str] = None,
-    candidate_k: Optional[int] = None,
+    titles: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    params: Optional[SearchParams] = None,
+    guard: Optional[DependencyGuard] = None,
+    sparse: Optional[SparseVec] = None,
+    prefetch_k: int = 64,
+    doc_ids: Optional[Sequence[str]] = None,
 ) -> List[Tuple[float, dict]]:
-    src = (source or "").strip().lower() or _extract_source_from_filter(query_filter)
-
-    cap = 2000
-    base = top_k * 20
-    cand = int(candidate_k or max(128, min(cap, base)))
-
-    last_exc: Optional[Exception] = None
-
-    for lim in (cand, max(256, cand // 2), max(128, cand // 4), max(64, top_k * 10), top_k):
-        try:
-            rows = _unfiltered_vector_search(client, collection, query_embedding, limit=lim)
-            if src:
-                rows = _local_filter_by_source(rows, src)
-            return rows[:top_k]
-        except UnexpectedResponse as e:
-            last_exc = e
-        except Exception as e:
-            last_exc = e
-
-    if last_exc is not None:
-        raise last_exc
-    return []
+    rows, _ = search_with_stats(
+        client,
+        collection,
+        query_embedding,
+        top_k,
+        query_filter=query_filter,
+        source=source,
+        titles=titles,
+        min_score=min_score,
+        params=params,
+        guard=guard,
+        sparse=sparse,
+        prefetch_k=prefetch_k,
+        doc_ids=doc_ids,
+    )
+    return rows
+
+
+def search_with_vectors(
+    client: QdrantClient,
+    collection: str,
+    query_embedding: List[float],
+    top_k: int,
+    source: Optional[str] = None,
+    titles: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    params: Optional[SearchParams] = None,
+    guard: Optional[DependencyGuard] = None,
+    sparse: Optional[SparseVec] = None,
+    prefetch_k: int = 64,
+    doc_ids: Optional[Sequence[str]] = None,
+) -> Tuple[List[Tuple[float, dict]], np.ndarray]:
+    """Like ``search``, also returning the hits' stored vectors as an (n, dim) array."""
+    import numpy as np
+
+    flt = build_filter(source=source, titles=titles, doc_ids=doc_ids)
+    guard = guard or qdrant_guard()
+    points = guard.call(
+        _query_points,
+        client,
+        collection,
+        query_embedding,
+        top_k,
+        flt,
+        min_score,
+        params,
+        True,
+        sparse=sparse,
+        prefetch_k=prefetch_k,
+    )
+    rows = [(p.score, p.payload or {}) for p in points]
+    vectors = np.asarray(
+        [_dense_vector(p.vector) for p in points], dtype=np.float32
+    ).reshape(len(points), -1)
+    return rows, vectors
+
+
+def search_many(
+    client: QdrantClient,
+    collection: str,
+    query_embeddings: Sequence[List[float]],
+    top_k: int,
+    source: Optional[str] = None,
+    titles: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    params: Optional[SearchParams] = None,
+    guard: Optional[DependencyGuard] = None,
+    sparse: Optional[Sequence[Optional[SparseVec]]] = None,
+    prefetch_k: int = 64,
+    batch_size: int = 64,
+    doc_ids: Optional[Sequence[str]] = None,
+) -> List[List[Tuple[float, dict]]]:
+    """Run many searches with shared filters as ``query_batch_points`` round-trips.
+
+    Results are returned in input order, one row list per query.
+    """
+    from qdrant_client.models import Fusion, FusionQuery, QueryRequest
+
+    if sparse is not None and len(sparse) != len(query_embeddings):
+        raise ValueError(
+            "query_embeddings and sparse vectors must have the same length"
+        )
+
+    flt = build_filter(source=source, titles=titles, doc_ids=doc_ids)
+    guard = guard or qdrant_guard()
+
+    requests: List[QueryRequest] = []
+    for i, q in enumerate(query_embeddings):
+        q = q.tolist() if hasattr(q, "tolist") else list(q)
+        sp = sparse[i] if sparse is not None else None
+        if sp is not None:
+            requests.append(
+                QueryRequest(
+                    prefetch=_hybrid_prefetch(
+                        q, sp, top_k, flt, min_score, params, prefetch_k
+                    ),
+                    query=FusionQuery(fusion=Fusion.RRF),
+                    limit=top_k,
+                    with_payload=True,
+                )
+            )
+        else:
+            requests.append(
+                QueryRequest(
+                    query=q,
+                    filter=flt,
+                    params=params,
+                    score_threshold=min_score,
+                    limit=top_k,
+                    with_payload=True,
+                )
+            )
+
+    out: List[List[Tuple[float, dict]]] = []
+    for start in range(0, len(requests), batch_size):
+        responses = guard.call(
+            client.query_batch_points,
+            collection_name=collection,
+            requests=requests[start : start + batch_size],
+        )
+        out.extend(
+            [(p.score, p.payload or {}) for p in res.points] for res in responses
+        )
+    return out
+
+
+class QdrantVectorStore:
+    """VectorStore adapter over the module-level Qdrant helpers."""
+
+    def __init__(
+        self,
+        client: QdrantClient,
+        collection: str,
+        *,
+        profile: Optional[TuningProfile] = None,
+        guard: Optional[DependencyGuard] = None,
+        hybrid: bool = False,
+        prefetch_k: int = 64,
+        version_path: Optional[Path] = None,
+        slim_payloads: bool = False,
+        bulk: bool = False,
+        upload_parallel: int = 4,
+        upload_batch_bytes: int = 4 << 20,
+        upload_wait: bool = False,
+    ) -> None:
+        self.client = client
+        self.collection = collection
+        self.profile = profile
+        self.guard = guard
+        self.hybrid = hybrid
+        self.prefetch_k = prefetch_k
+        self.version_path = version_path
+        self.slim_payloads = slim_payloads
+        self.bulk = bulk
+        self.upload_parallel = upload_parallel
+        self.upload_batch_bytes = upload_batch_bytes
+        self.upload_wait = upload_wait
+        self.params = search_params(profile)
+
+    @classmethod
+    def from_settings(cls, cfg: Settings) -> "QdrantVectorStore":
+        return cls(
+            get_client(cfg),
+            cfg.qdrant_collection,
+            profile=cfg.tuning_profile(),
+            guard=qdrant_guard(cfg),
+            hybrid=cfg.hybrid,
+            prefetch_k=cfg.hybrid_prefetch,
+            version_path=index_version_path(cfg),
+            slim_payloads=cfg.slim_payloads,
+            bulk=cfg.qdrant_bulk_upload,
+            upload_parallel=cfg.qdrant_upload_parallel,
+            upload_batch_bytes=int(cfg.qdrant_upload_batch_mb * (1 << 20)),
+            upload_wait=cfg.qdrant_upload_wait,
+        )
+
+    @staticmethod
+    def captured_settings(cfg: Settings) -> Tuple[Any, ...]:
+        """What ``from_settings`` takes from ``cfg`` besides the collection name."""
+        return (
+            cfg.qdrant_api_key,
+            cfg.qdrant_prefer_grpc,
+            cfg.qdrant_grpc_port,
+            cfg.qdrant_pool_size,
+            cfg.qdrant_resilience,
+            cfg.tuning_profile(),
+            cfg.hybrid,
+            cfg.qdrant_bulk_upload,
+            cfg.qdrant_upload_parallel,
+            cfg.qdrant_upload_batch_mb,
+            cfg.qdrant_upload_wait,
+        )
+
+    def ensure_collection(self, vector_size: int) -> None:
+        ensure_collection(
+            self.client,
+            self.collection,
+            vector_size,
+            profile=self.profile,
+            sparse=self.hybrid,
+        )
+
+    def reset(self) -> None:
+        if self.client.collection_exists(self.collection):
+            self.client.delete_collection(collection_name=self.collection)
+            bump_index_version(self.version_path)
+
+    def points_exist(self, point_ids: List[str]) -> List[bool]:
+        return points_exist(self.client, self.collection, point_ids)
+
+    def count(self) -> int:
+        if not self.client.collection_exists(self.collection):
+            return 0
+        return self.client.count(collection_name=self.collection, exact=True).count
+
+    def upsert(
+        self,
+        chunks: Iterable[Chunk],
+        embeddings: Iterable[List[float]],
+        sparse: Optional[Sequence[SparseVec]] = None,
+        ids: Optional[Sequence[str]] = None,
+    ) -> int:
+        if self.bulk:
+            chunks = list(chunks)
+            written = bulk_upload(
+                self.client,
+                self.collection,
+                ids if ids is not None else [make_point_id(c.chunk_id) for c in chunks],
+                list(embeddings),
+                [chunk_payload(c, self.slim_payloads) for c in chunks],
+                sparse=sparse,
+                parallel=self.upload_parallel,
+                batch_bytes=self.upload_batch_bytes,
+                wait=self.upload_wait,
+            )
+        else:
+            written = upsert_chunks(
+                self.client,
+                self.collection,
+                chunks,
+                embeddings,
+                sparse=sparse,
+                slim=self.slim_payloads,
+                ids=ids,
+            )
+        bump_index_version(self.version_path)
+        return written
+
+    def doc_point_ids(self) -> Dict[str, List[str]]:
+        if not self.client.collection_exists(self.collection):
+            return {}
+        return doc_point_ids(self.client, self.collection)
+
+    def delete_points(self, point_ids: Sequence[str]) -> Tuple[int, int]:
+        if not point_ids or not self.client.collection_exists(self.collection):
+            return 0, 0
+        result = delete_points(self.client, self.collection, point_ids)
+        if result[0]:
+            bump_index_version(self.version_path)
+        return result
+
+    def flush(self) -> None:
+        if self.bulk and not self.upload_wait:
+            consistency_barrier(self.client, self.collection)
+            bump_index_version(self.version_path)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[SparseVec] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[float, dict]]:
+        return search(
+            self.client,
+            self.collection,
+            query_embedding,
+            top_k,
+            source=source,
+            titles=titles,
+            min_score=min_score,
+            params=self.params,
+            guard=self.guard,
+            sparse=sparse,
+            prefetch_k=self.prefetch_k,
+            doc_ids=doc_ids,
+        )
+
+    def search_with_vectors(
+        self,
+        query_embedding: List[float],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[SparseVec] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Tuple[float, dict]], np.ndarray]:
+        return search_with_vectors(
+            self.client,
+            self.collection,
+            query_embedding,
+            top_k,
+            source=source,
+            titles=titles,
+            min_score=min_score,
+            params=self.params,
+            guard=self.guard,
+            sparse=sparse,
+            prefetch_k=self.prefetch_k,
+            doc_ids=doc_ids,
+        )
+
+    def search_many(
+        self,
+        query_embeddings: Sequence[List[float]],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[Sequence[Optional[SparseVec]]] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> List[List[Tuple[float, dict]]]:
+        return search_many(
+            self.client,
+            self.collection,
+            query_embeddings,
+            top_k,
+            source=source,
+            titles=titles,
+            min_score=min_score,
+            params=self.params,
+            guard=self.guard,
+            sparse=sparse,
+            prefetch_k=self.prefetch_k,
+            doc_ids=doc_ids,
+        )
+
+    def list_titles(self) -> List[str]:
+        return list_titles(self.client, self.collection)
+
+    def iter_points(
+        self, batch_size: int = 1024
+    ) -> Iterator[Tuple[List[str], np.ndarray, List[Dict[str, Any]]]]:
+        import numpy as np
+
+        offset: Optional[Any] = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection,
+                limit=batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                yield (
+                    [str(p.id) for p in points],
+                    np.asarray(
+                        [_dense_vector(p.vector) for p in points], dtype=np.float32
+                    ),
+                    [p.payload or {} for p in points],
+                )
+            if offset is None or not points:
+                return
+
+    def upsert_points(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict[str, Any]],
+        sparse: Optional[Sequence[SparseVec]] = None,
+        parallel: int = 4,
+    ) -> int:
+        if len(ids) == 0:
+            return 0
+        if sparse is not None:
+            vectors = [_point_vector(v, sp) for v, sp in zip(vectors, sparse)]
+        self.client.upload_collection(
+            collection_name=self.collection,
+            vectors=vectors,
+            payload=list(payloads),
+            ids=list(ids),
+            batch_size=256,
+            parallel=parallel,
+            wait=True,
+        )
+        bump_index_version(self.version_path)
+        return len(ids)
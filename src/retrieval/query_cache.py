@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from src.utils.cache import LRUCache
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+Rows = List[Tuple[float, dict]]
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+
+def index_version_path(cfg: Settings) -> Path:
+    return Path(cfg.artifacts_dir) / f"{cfg.qdrant_collection}.index_version"
+
+
+def bump_index_version(path: Optional[Path]) -> None:
+    """Mark the index as changed; results cached under the old version go stale."""
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Per thread: upsert workers of one process bump concurrently.
+    tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(f"{time.time_ns()}-{os.getpid()}\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def index_version(path: Path) -> Tuple[int, int, int]:
+    # A stat is enough: every bump replaces the file, so inode and mtime change.
+    try:
+        st = path.stat()
+    except OSError:
+        return (0, 0, 0)
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+def _embedding_key(embedding: Sequence[float]) -> str:
+    return hashlib.blake2b(
+        np.asarray(embedding, dtype=np.float32).tobytes(), digest_size=16
+    ).hexdigest()
+
+
+def _rows_size(rows: Rows) -> int:
+    # Payload text dominates; 200 bytes covers the other fields and object overhead.
+    return sum(200 + len(str(p.get("text") or "")) for _, p in rows)
+
+
+class QueryCache:
+    """Question -> embedding and (embedding, filters, k) -> rows caches of an index."""
+
+    def __init__(self, cfg: Settings) -> None:
+        self.enabled = cfg.cache_enabled
+        self.embed_model = cfg.embed_model
+        self.version_path = index_version_path(cfg)
+        max_bytes = int(cfg.cache_max_mb * 1024 * 1024)
+        self.embeddings = LRUCache(
+            "embedding",
+            max_entries=cfg.cache_max_entries,
+            max_bytes=max_bytes,
+            ttl_s=cfg.cache_ttl_s,
+        )
+        self.results = LRUCache(
+            "results",
+            max_entries=cfg.cache_max_entries,
+            max_bytes=max_bytes,
+            ttl_s=cfg.cache_ttl_s,
+        )
+        self._version = index_version(self.version_path)
+        self._lock = threading.Lock()
+
+    def embed(self, embed_texts: EmbedFn, texts: Sequence[str]) -> List[List[float]]:
+        """Embeddings for ``texts``; only uncached texts go to ``embed_texts``."""
+        if not self.enabled:
+            return embed_texts(list(texts))
+
+        keys = [(self.embed_model, t.strip()) for t in texts]
+        found: Dict[Hashable, List[float]] = {}
+        for key in dict.fromkeys(keys):
+            value = self.embeddings.get(key)
+            if value is not None:
+                found[key] = value
+
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        if missing:
+            fresh = embed_texts([text for _, text in missing])
+            for key, emb in zip(missing, fresh):
+                found[key] = emb
+                # A list of Python floats costs ~32 bytes per element.
+                self.embeddings.put(key, emb, 32 * len(emb) + 100)
+        return [found[k] for k in keys]
+
+    def search(
+        self, embedding: Sequence[float], params: Hashable, run: Callable[[], Rows]
+    ) -> Rows:
+        """Cached result rows for ``embedding`` and ``params`` (filters, k, mode)."""
+        if not self.enabled:
+            return run()
+
+        key = (_embedding_key(embedding), params)
+        self._check_version()
+        rows = self.results.get(key)
+        if rows is None:
+            rows = run()
+            self.results.put(key, rows, _rows_size(rows))
+        return rows
+
+    def search_many(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        params: Hashable,
+        run: Callable[[List[int]], List[Rows]],
+    ) -> List[Rows]:
+        """Like ``search`` for a batch; ``run`` gets the positions that missed."""
+        if not self.enabled:
+            return run(list(range(len(embeddings))))
+
+        keys = [(_embedding_key(e), params) for e in embeddings]
+        self._check_version()
+        out: List[Optional[Rows]] = [self.results.get(k) for k in keys]
+        missing = [i for i, rows in enumerate(out) if rows is None]
+        if missing:
+            for i, rows in zip(missing, run(missing)):
+                out[i] = rows
+                self.results.put(keys[i], rows, _rows_size(rows))
+        return [rows or [] for rows in out]
+
+    def _check_version(self) -> None:
+        version = index_version(self.version_path)
+        with self._lock:
+            if version == self._version:
+                return
+            self._version = version
+        self.results.clear()
+
+
+_CACHES: Dict[Tuple[Hashable, ...], QueryCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_query_cache(cfg: Settings) -> QueryCache:
+    """Process-wide cache for the configured collection and embedding model."""
+    key = (
+        str(cfg.artifacts_dir),
+        cfg.qdrant_collection,
+        cfg.embed_model,
+        cfg.cache_enabled,
+        cfg.cache_max_entries,
+        cfg.cache_max_mb,
+        cfg.cache_ttl_s,
+    )
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = QueryCache(cfg)
+            _CACHES[key] = cache
+        return cache
@@ -1,40 +1,225 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
 
-from src.config.settings import Settings
 from src.llm.openai_client import OpenAIClient
-from src.retrieval.qdrant_store import get_client, search
+from src.retrieval.courses import course_settings, fan_out, merge_rows, shard_settings
+from src.retrieval.doc_router import route_docs
+from src.retrieval.mmr import mmr_search
+from src.retrieval.query_cache import get_query_cache
+from src.retrieval.side_store import get_side_store
+from src.retrieval.sparse import query_sparse
+from src.retrieval.store_base import get_vector_store
 from src.schemas import Citation
+from src.utils.tracing import span, traced
 
+if TYPE_CHECKING:
+    from src.config.settings import Settings
 
+
+@traced("retrieve")
 def retrieve(
     query: str,
     *,
     top_k: Optional[int] = None,
     source: Optional[str] = "pdf",
+    min_score: Optional[float] = None,
+    mmr: Optional[bool] = None,
+    cfg: Optional[Settings] = None,
 ) -> List[Citation]:
-    cfg = Settings.load()
-
-    k = int(top_k or cfg.top_k)
+    from src.config.settings import Settings
 
-    llm = OpenAIClient(cfg)
-    embedding = llm.embed_texts([query])[0]
+    cfg = (cfg or Settings.snapshot()).override(
+        top_k=top_k or None,
+        min_score=min_score,
+        mmr=mmr,
+    )
 
-    client = get_client(cfg)
-    rows = search(
-        client,
-        cfg.qdrant_collection,
+    cache = get_query_cache(cfg)
+    with span("embed_query"):
+        embedding = cache.embed(
+            lambda texts: OpenAIClient(cfg).embed_texts(texts), [query]
+        )[0]
+    rows = search_rows(
+        cfg,
+        query,
         embedding,
-        top_k=k,
+        top_k=int(cfg.top_k),
         source=source,
+        min_score=cfg.min_score,
     )
+    return _to_citations(rows)
+
 
+@traced("search")
+def search_rows(
+    cfg: Settings,
+    query: str,
+    embedding: List[float],
+    *,
+    top_k: int,
+    source: Optional[str] = "pdf",
+    titles: Optional[Sequence[str]] = None,
+    min_score: Optional[float] = None,
+    mmr: Optional[bool] = None,
+) -> List[Tuple[float, dict]]:
+    """Search (or MMR-search) the configured store, through the result cache.
+
+    With course shards, searches the selected course's collection, or every
+    course's in parallel and keeps the best ``top_k`` rows overall.
+    """
+    if cfg.course_shards:
+        results = fan_out(
+            shard_settings(cfg),
+            lambda shard: search_rows(
+                shard,
+                query,
+                embedding,
+                top_k=top_k,
+                source=source,
+                titles=titles,
+                min_score=min_score,
+                mmr=mmr,
+            ),
+        )
+        return merge_rows(results, top_k)
+
+    use_mmr = cfg.mmr if mmr is None else mmr
+    store = get_vector_store(cfg)
+    sparse = query_sparse(cfg, query)
+
+    def run() -> List[Tuple[float, dict]]:
+        with span("route"):
+            doc_ids = route_docs(cfg, embedding, source=source, titles=titles)
+        with span("store.search", backend=cfg.vector_backend) as sp:
+            if use_mmr:
+                rows = mmr_search(
+                    store,
+                    embedding,
+                    top_k=top_k,
+                    lambda_=cfg.mmr_lambda,
+                    oversample=cfg.mmr_oversample,
+                    source=source,
+                    titles=titles,
+                    min_score=min_score,
+                    sparse=sparse,
+                    doc_ids=doc_ids,
+                )
+            else:
+                rows = store.search(
+                    embedding,
+                    top_k=top_k,
+                    source=source,
+                    titles=titles,
+                    min_score=min_score,
+                    sparse=sparse,
+                    doc_ids=doc_ids,
+                )
+            sp.set(hits=len(rows))
+        # Slim payloads carry no text; load it for the final rows only.
+        with span("hydrate"):
+            return get_side_store(cfg).hydrate(rows)
+
+    params = _cache_params(
+        cfg, top_k, source, titles, min_score, use_mmr, sparse is not None
+    )
+    return get_query_cache(cfg).search(embedding, params, run)
+
+
+@traced("retrieve_many")
+def retrieve_many(
+    queries: Sequence[str],
+    *,
+    top_k: Optional[int] = None,
+    source: Optional[str] = "pdf",
+    min_score: Optional[float] = None,
+    mmr: Optional[bool] = None,
+    cfg: Optional[Settings] = None,
+) -> List[List[Citation]]:
+    """``retrieve`` for many queries, one citation list per query in input order.
+
+    Settings, clients and the store are resolved once. Distinct queries are
+    embedded in packed batches and searched through the store's batch API.
+    """
+    from src.config.settings import Settings
+
+    cfg = (cfg or Settings.snapshot()).override(
+        top_k=top_k or None,
+        min_score=min_score,
+        mmr=mmr,
+    )
+    if not queries:
+        return []
+    if cfg.course_shards and cfg.course:
+        cfg = course_settings(cfg, cfg.course)
+
+    k = int(cfg.top_k)
+    cache = get_query_cache(cfg)
+
+    unique = list(dict.fromkeys(queries))
+    llm = OpenAIClient(cfg)
+    vectors = cache.embed(lambda texts: llm.embed_texts(texts, batch_size=512), unique)
+    embeddings = dict(zip(unique, vectors))
+
+    if cfg.mmr or cfg.doc_routing or cfg.course_shards:
+        # MMR needs each query's candidate vectors, routing gives each query
+        # its own doc_id filter and a cross-course search fans out per query.
+        results = {
+            q: search_rows(
+                cfg, q, embeddings[q], top_k=k, source=source, min_score=cfg.min_score
+            )
+            for q in unique
+        }
+        return [_to_citations(results[q]) for q in queries]
+
+    store = get_vector_store(cfg)
+    sparse = [query_sparse(cfg, q) for q in unique] if cfg.hybrid else None
+
+    def run(positions: List[int]) -> List[List[Tuple[float, dict]]]:
+        batches = store.search_many(
+            [vectors[i] for i in positions],
+            top_k=k,
+            source=source,
+            min_score=cfg.min_score,
+            sparse=[sparse[i] for i in positions] if sparse is not None else None,
+        )
+        # One side-store lookup for every row of the batch.
+        flat = get_side_store(cfg).hydrate([row for rows in batches for row in rows])
+        out, start = [], 0
+        for rows in batches:
+            out.append(flat[start : start + len(rows)])
+            start += len(rows)
+        return out
+
+    params = _cache_params(cfg, k, source, None, cfg.min_score, False, cfg.hybrid)
+    rows = cache.search_many(vectors, params, run)
+    results = dict(zip(unique, rows))
+    return [_to_citations(results[q]) for q in queries]
+
+
+def _cache_params(
+    cfg: Settings,
+    top_k: int,
+    source: Optional[str],
+    titles: Optional[Sequence[str]],
+    min_score: Optional[float],
+    mmr: bool,
+    hybrid: bool,
+) -> Tuple:
+    return (
+        (source or "").strip().lower(),
+        tuple(sorted({t.strip() for t in titles or [] if t and t.strip()})),
+        int(top_k),
+        min_score,
+        (cfg.mmr_lambda, cfg.mmr_oversample) if mmr else None,
+        cfg.hybrid_prefetch if hybrid else None,
+        cfg.doc_routing_top if cfg.doc_routing else None,
+    )
+
+
+def _to_citations(rows: List[Tuple[float, dict]]) -> List[Citation]:
     citations: List[Citation] = []
     for score, payload in rows:
-        if score is not None and score < cfg.min_score:
-            continue
-
         ref = (
             payload.get("title")
             or payload.get("filename")
@@ -0,0 +1,294 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+# What stays in the vector store's payload when payloads are slim: ids plus the
+# fields queries filter on (see qdrant_store.INDEXED_FIELDS).
+SLIM_FIELDS = ("source", "doc_id", "chunk_id", "title")
+
+# Fields that are the same for every chunk of a document (set by ingest_pdfs);
+# they are stored once per doc_id. Any other payload field is kept per chunk.
+DOC_FIELDS = ("source", "title", "path", "filename", "relative_path", "course")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    chunk_id TEXT PRIMARY KEY,
+    doc_id   TEXT NOT NULL,
+    text     TEXT NOT NULL,
+    meta     TEXT
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id TEXT PRIMARY KEY,
+    meta   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS catalog (
+    doc_id       TEXT PRIMARY KEY,
+    title        TEXT NOT NULL,
+    chunks       INTEGER NOT NULL,
+    indexed_at   REAL NOT NULL,
+    content_hash TEXT NOT NULL
+);
+"""
+
+# Keep IN (...) lists under SQLite's default host-parameter limit.
+_MAX_PARAMS = 500
+
+
+def slim_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: payload[k] for k in SLIM_FIELDS if k in payload}
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    doc_id: str
+    title: str
+    chunks: int
+    indexed_at: float
+    content_hash: str
+
+
+class SideStore:
+    """Chunk text and per-document metadata in SQLite, keyed by chunk_id and doc_id.
+
+    The vector store keeps only ``SLIM_FIELDS``; ``hydrate`` restores the full
+    payload for the few rows that are actually returned. The same file holds
+    the document catalog that ``index_pdfs`` writes on every run.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def put_payloads(self, payloads: Iterable[Dict[str, Any]]) -> int:
+        """Store text and doc-level fields of full payloads."""
+        chunk_rows: List[Tuple[str, str, str, Optional[str]]] = []
+        doc_rows: Dict[str, str] = {}
+        for payload in payloads:
+            chunk_id, doc_id = payload.get("chunk_id"), payload.get("doc_id")
+            if not chunk_id or not doc_id:
+                continue
+            extra = {
+                k: v
+                for k, v in payload.items()
+                if k != "text" and k not in SLIM_FIELDS and k not in DOC_FIELDS
+            }
+            chunk_rows.append(
+                (
+                    chunk_id,
+                    doc_id,
+                    payload.get("text") or "",
+                    json.dumps(extra, ensure_ascii=False) if extra else None,
+                )
+            )
+            doc_meta = {k: payload[k] for k in DOC_FIELDS if k in payload}
+            doc_rows[doc_id] = json.dumps(doc_meta, ensure_ascii=False, sort_keys=True)
+
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "INSERT OR REPLACE INTO chunks (chunk_id, doc_id, text, meta) "
+                    "VALUES (?, ?, ?, ?)",
+                    chunk_rows,
+                )
+                db.executemany(
+                    "INSERT OR REPLACE INTO docs (doc_id, meta) VALUES (?, ?)",
+                    list(doc_rows.items()),
+                )
+        return len(chunk_rows)
+
+    def chunks(self, chunk_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        """Text plus any chunk-level fields, by chunk_id."""
+        rows = self._fetch(
+            "SELECT chunk_id, text, meta FROM chunks WHERE chunk_id IN ({})", chunk_ids
+        )
+        return {
+            cid: {**(json.loads(meta) if meta else {}), "text": text}
+            for cid, text, meta in rows
+        }
+
+    def chunk_ids(self, doc_ids: Sequence[str]) -> List[Tuple[str, str]]:
+        """(doc_id, chunk_id) of every stored chunk of ``doc_ids``."""
+        if not self.path.exists():
+            return []
+        return self._fetch(
+            "SELECT doc_id, chunk_id FROM chunks WHERE doc_id IN ({})", doc_ids
+        )
+
+    def docs(self, doc_ids: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        rows = self._fetch(
+            "SELECT doc_id, meta FROM docs WHERE doc_id IN ({})", doc_ids
+        )
+        return {doc_id: json.loads(meta) for doc_id, meta in rows}
+
+    def hydrate_payloads(
+        self, payloads: Sequence[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Full payloads: doc fields, then chunk fields and text, then the payload.
+
+        Raises RuntimeError when slim payloads have no text in this side store.
+        """
+        need = [p for p in payloads if "text" not in p and p.get("chunk_id")]
+        if not need:
+            return list(payloads)
+
+        chunks: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            chunks = self.chunks([p["chunk_id"] for p in need])
+        missing = sum(1 for p in need if p["chunk_id"] not in chunks)
+        if missing:
+            raise RuntimeError(
+                f"{missing} slim payloads have no text in {self.path}; slim stores "
+                "need the side store written by the host that indexed them"
+            )
+        docs = self.docs(sorted({p["doc_id"] for p in need if p.get("doc_id")}))
+        out: List[Dict[str, Any]] = []
+        for p in payloads:
+            if "text" in p or not p.get("chunk_id"):
+                out.append(p)
+                continue
+            doc = docs.get(p.get("doc_id") or "", {})
+            out.append({**doc, **chunks.get(p["chunk_id"], {}), **p})
+        return out
+
+    def hydrate(
+        self, rows: Sequence[Tuple[float, Dict[str, Any]]]
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        payloads = self.hydrate_payloads([p for _, p in rows])
+        return [(score, p) for (score, _), p in zip(rows, payloads)]
+
+    def put_catalog(self, entries: Iterable[CatalogEntry]) -> None:
+        """Upsert catalog rows; ``indexed_at`` only moves when the content changes."""
+        rows = [
+            (e.doc_id, e.title, e.chunks, e.indexed_at, e.content_hash) for e in entries
+        ]
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    """
+                    INSERT INTO catalog
+                        (doc_id, title, chunks, indexed_at, content_hash)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(doc_id) DO UPDATE SET
+                        title = excluded.title,
+                        chunks = excluded.chunks,
+                        indexed_at = CASE
+                            WHEN catalog.content_hash = excluded.content_hash
+                            THEN catalog.indexed_at ELSE excluded.indexed_at END,
+                        content_hash = excluded.content_hash
+                    """,
+                    rows,
+                )
+
+    def catalog(self) -> List[CatalogEntry]:
+        """Every indexed document, by title; empty if nothing was indexed here."""
+        if not self.path.exists():
+            return []
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT doc_id, title, chunks, indexed_at, content_hash FROM catalog "
+                "ORDER BY title, doc_id"
+            ).fetchall()
+        return [CatalogEntry(*row) for row in rows]
+
+    def titles(self) -> List[str]:
+        return sorted({e.title for e in self.catalog() if e.title})
+
+    def delete(
+        self, chunk_ids: Sequence[str] = (), doc_ids: Sequence[str] = ()
+    ) -> None:
+        """Forget chunks, and documents (their metadata and catalog rows)."""
+        if not self.path.exists():
+            return
+        with self._lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    "DELETE FROM chunks WHERE chunk_id = ?", [(c,) for c in chunk_ids]
+                )
+                for table in ("chunks", "docs", "catalog"):
+                    db.executemany(
+                        f"DELETE FROM {table} WHERE doc_id = ?", [(d,) for d in doc_ids]
+                    )
+
+    def merge_from(self, other: Path) -> int:
+        """Copy chunks, documents and catalog rows of another side store file in."""
+        other = Path(other)
+        if not other.exists():
+            return 0
+        with self._lock:
+            db = self._db()
+            db.execute("ATTACH DATABASE ? AS other", (str(other),))
+            try:
+                with db:
+                    (n,) = db.execute("SELECT COUNT(*) FROM other.chunks").fetchone()
+                    for table in ("chunks", "docs"):
+                        db.execute(
+                            f"INSERT OR REPLACE INTO main.{table} "
+                            f"SELECT * FROM other.{table}"
+                        )
+            finally:
+                db.execute("DETACH DATABASE other")
+        # Through put_catalog, so unchanged documents keep their indexed_at.
+        self.put_catalog(SideStore(other).catalog())
+        return n
+
+    def reset(self) -> None:
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute("DELETE FROM chunks")
+                db.execute("DELETE FROM docs")
+                db.execute("DELETE FROM catalog")
+
+    def _fetch(self, sql: str, keys: Sequence[str]) -> List[Tuple[Any, ...]]:
+        keys = list(dict.fromkeys(keys))
+        out: List[Tuple[Any, ...]] = []
+        with self._lock:
+            db = self._db()
+            for lo in range(0, len(keys), _MAX_PARAMS):
+                part = keys[lo : lo + _MAX_PARAMS]
+                out.extend(
+                    db.execute(sql.format(",".join("?" * len(part))), part).fetchall()
+                )
+        return out
+
+
+def side_store_path(cfg: Settings) -> Path:
+    from src.retrieval.versions import storage_name
+
+    return Path(cfg.artifacts_dir) / f"{storage_name(cfg)}.side.sqlite"
+
+
+_STORES: Dict[Path, SideStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_side_store(cfg: Settings) -> SideStore:
+    path = side_store_path(cfg)
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            store = SideStore(path)
+            _STORES[path] = store
+        return store
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+# (term indices, weights); the same shape Qdrant's SparseVector takes.
+SparseVec = Tuple[List[int], List[float]]
+
+# One document's share of a vocabulary: (chunks, tokens, {term id: chunks}).
+_DocCounts = Tuple[int, int, Dict[int, int]]
+
+SPARSE_VECTOR_NAME = "bm25"
+
+# Keeps symbols that carry meaning in data-science terms together: "r^2",
+# "one-hot", "f1", "x_i". Compound tokens are also emitted as their parts.
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[\^\-_'.][a-z0-9]+)*")
+_SPLIT_RE = re.compile(r"[\^\-_'.]")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens: List[str] = []
+    for tok in _TOKEN_RE.findall((text or "").lower()):
+        tokens.append(tok)
+        parts = _SPLIT_RE.split(tok)
+        if len(parts) > 1:
+            tokens.extend(p for p in parts if p)
+    return tokens
+
+
+@dataclass
+class SparseVocab:
+    """BM25 vocabulary built at index time.
+
+    Document vectors hold only the saturated, length-normalised term frequency;
+    the IDF goes into the query vector. A sparse dot product then equals the
+    BM25 score, and refreshing document frequencies never requires
+    re-upserting points. Term ids are append-only so stored vectors stay valid.
+    Counts are kept per source document, so re-indexing one replaces its own
+    counts and leaves the rest of the corpus as it was.
+    """
+
+    terms: Dict[str, int] = field(default_factory=dict)
+    df: List[int] = field(default_factory=list)
+    n_docs: int = 0
+    avg_len: float = 0.0
+    k1: float = 1.2
+    b: float = 0.75
+    # doc_id -> (chunks, tokens, chunks containing each term id). Saved beside
+    # the vocabulary and only loaded for indexing.
+    docs: Dict[str, _DocCounts] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls, texts: Iterable[str], existing: Optional["SparseVocab"] = None
+    ) -> "SparseVocab":
+        """``existing`` (copied, not changed) plus ``texts`` as unnamed chunks."""
+        vocab = cls() if existing is None else existing.copy()
+        vocab._apply(vocab._count(texts), 1)
+        return vocab
+
+    def copy(self) -> "SparseVocab":
+        return replace(
+            self, terms=dict(self.terms), df=list(self.df), docs=dict(self.docs)
+        )
+
+    def add_document(self, doc_id: str, texts: Iterable[str]) -> None:
+        """Count one document's chunks in place of what was counted for it before."""
+        self.remove_document(doc_id)
+        counts = self._count(texts)
+        self._apply(counts, 1)
+        self.docs[doc_id] = counts
+
+    def remove_document(self, doc_id: str) -> None:
+        counts = self.docs.pop(doc_id, None)
+        if counts is not None:
+            self._apply(counts, -1)
+
+    def _count(self, texts: Iterable[str]) -> _DocCounts:
+        chunks = tokens = 0
+        df: Counter = Counter()
+        for text in texts:
+            terms = tokenize(text)
+            chunks += 1
+            tokens += len(terms)
+            for term in set(terms):
+                idx = self.terms.get(term)
+                if idx is None:
+                    idx = len(self.terms)
+                    self.terms[term] = idx
+                    self.df.append(0)
+                df[idx] += 1
+        return chunks, tokens, dict(df)
+
+    def _apply(self, counts: _DocCounts, sign: int) -> None:
+        chunks, tokens, df = counts
+        total = self.avg_len * self.n_docs + sign * tokens
+        self.n_docs += sign * chunks
+        for idx, n in df.items():
+            self.df[idx] += sign * n
+        self.avg_len = total / self.n_docs if self.n_docs > 0 else 0.0
+
+    def idf(self, idx: int) -> float:
+        df = self.df[idx] if idx < len(self.df) else 0
+        return math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+
+    def encode_document(self, text: str) -> SparseVec:
+        tokens = tokenize(text)
+        counts = Counter(t for t in tokens if t in self.terms)
+        norm = self.k1 * (1.0 - self.b + self.b * len(tokens) / (self.avg_len or 1.0))
+        items = sorted(
+            (self.terms[t], tf * (self.k1 + 1.0) / (tf + norm))
+            for t, tf in counts.items()
+        )
+        return [i for i, _ in items], [w for _, w in items]
+
+    def encode_query(self, text: str) -> SparseVec:
+        ids = sorted({self.terms[t] for t in tokenize(text) if t in self.terms})
+        return ids, [self.idf(i) for i in ids]
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        docs = {
+            doc_id: [chunks, tokens, list(df), list(df.values())]
+            for doc_id, (chunks, tokens, df) in self.docs.items()
+        }
+        # Before the vocabulary itself, which readers watch for changes.
+        _write_json(docs_path(path), docs)
+        data = {
+            "terms": self.terms,
+            "df": self.df,
+            "n_docs": self.n_docs,
+            "avg_len": self.avg_len,
+            "k1": self.k1,
+            "b": self.b,
+        }
+        _write_json(path, data)
+
+    @classmethod
+    def load(cls, path: Path, with_docs: bool = False) -> "SparseVocab":
+        """Read a saved vocabulary; ``with_docs`` adds the per-document counts."""
+        data = json.loads(path.read_text(encoding="utf-8"))
+        vocab = cls(
+            terms=data["terms"],
+            df=data["df"],
+            n_docs=data["n_docs"],
+            avg_len=data["avg_len"],
+            k1=data["k1"],
+            b=data["b"],
+        )
+        if with_docs:
+            docs = json.loads(docs_path(path).read_text(encoding="utf-8"))
+            vocab.docs = {
+                doc_id: (chunks, tokens, dict(zip(ids, counts)))
+                for doc_id, (chunks, tokens, ids, counts) in docs.items()
+            }
+        return vocab
+
+
+def _write_json(path: Path, data: object) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def vocab_path(cfg: Settings) -> Path:
+    from src.retrieval.versions import storage_name
+
+    return Path(cfg.artifacts_dir) / f"{storage_name(cfg)}.sparse_vocab.json"
+
+
+def docs_path(path: Path) -> Path:
+    """Where the per-document counts of the vocabulary at ``path`` are kept."""
+    return path.with_name(path.name.replace(".json", ".docs.json"))
+
+
+_VOCABS: Dict[Path, Tuple[Tuple[int, int], SparseVocab]] = {}
+_VOCABS_LOCK = threading.Lock()
+
+
+def load_vocab(cfg: Settings) -> Optional[SparseVocab]:
+    """The saved vocabulary, re-read only when the indexer rewrites it."""
+    path = vocab_path(cfg)
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    stamp = (st.st_mtime_ns, st.st_size)
+
+    with _VOCABS_LOCK:
+        cached = _VOCABS.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    vocab = SparseVocab.load(path)
+    with _VOCABS_LOCK:
+        _VOCABS[path] = (stamp, vocab)
+    return vocab
+
+
+def query_sparse(cfg: Settings, text: str) -> Optional[SparseVec]:
+    """Sparse query vector when hybrid retrieval is on and a vocabulary exists."""
+    if not cfg.hybrid:
+        return None
+    vocab = load_vocab(cfg)
+    if vocab is None:
+        return None
+    vec = vocab.encode_query(text)
+    return vec if vec[0] else None
@@ -1,25 +1,187 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Optional, Protocol, Tuple
+import threading
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+    Tuple,
+)
 
+from src.retrieval.sparse import SparseVec
+from src.retrieval.versions import storage_name
 from src.schemas import Chunk
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from src.config.settings import Settings
+
+# A batch of raw points: ids, an (n, dim) float matrix and one payload per id.
+PointBatch = Tuple[List[str], "np.ndarray", List[Dict[str, Any]]]
+
 
 class VectorStore(Protocol):
     def ensure_collection(self, vector_size: int) -> None: ...
 
+    def reset(self) -> None: ...
+
     def points_exist(self, point_ids: List[str]) -> List[bool]: ...
 
+    def count(self) -> int: ...
+
     def upsert(
         self,
         chunks: Iterable[Chunk],
         embeddings: Iterable[List[float]],
+        sparse: Optional[Sequence[SparseVec]] = None,
+        ids: Optional[Sequence[str]] = None,
     ) -> int: ...
 
+    def flush(self) -> None:
+        """Block until every acknowledged write is visible to queries."""
+        ...
+
+    def doc_point_ids(self) -> Dict[str, List[str]]: ...
+
+    def delete_points(self, point_ids: Sequence[str]) -> Tuple[int, int]:
+        """Delete points; returns (points deleted, bytes reclaimed)."""
+        ...
+
     def search(
         self,
         query_embedding: List[float],
         *,
         top_k: int,
         source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[SparseVec] = None,
+        doc_ids: Optional[Sequence[str]] = None,
     ) -> List[Tuple[float, dict]]: ...
+
+    def search_with_vectors(
+        self,
+        query_embedding: List[float],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[SparseVec] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[Tuple[float, dict]], np.ndarray]: ...
+
+    def search_many(
+        self,
+        query_embeddings: Sequence[List[float]],
+        *,
+        top_k: int,
+        source: Optional[str] = None,
+        titles: Optional[Sequence[str]] = None,
+        min_score: Optional[float] = None,
+        sparse: Optional[Sequence[Optional[SparseVec]]] = None,
+        doc_ids: Optional[Sequence[str]] = None,
+    ) -> List[List[Tuple[float, dict]]]: ...
+
+    def list_titles(self) -> List[str]: ...
+
+    def iter_points(self, batch_size: int = 1024) -> Iterator[PointBatch]: ...
+
+    def upsert_points(
+        self,
+        ids: Sequence[str],
+        vectors: np.ndarray,
+        payloads: Sequence[Dict[str, Any]],
+        sparse: Optional[Sequence[SparseVec]] = None,
+    ) -> int: ...
+
+
+def chunk_payload(chunk: Chunk, slim: bool = False) -> Dict[str, Any]:
+    """The payload stored for ``chunk``; ``slim`` keeps only ids and filter fields."""
+    from src.retrieval.side_store import slim_payload
+
+    payload = {
+        "source": chunk.source,
+        "doc_id": chunk.doc_id,
+        "chunk_id": chunk.chunk_id,
+        "text": chunk.text,
+        **(chunk.meta or {}),
+    }
+    return slim_payload(payload) if slim else payload
+
+
+# (backend, location, name) -> (settings the store captured, store)
+_STORES: Dict[Tuple[str, ...], Tuple[Tuple[Any, ...], VectorStore]] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def _store_key(cfg: Settings) -> Tuple[str, ...]:
+    backend = cfg.vector_backend
+    if backend == "qdrant":
+        return (backend, cfg.qdrant_url, cfg.qdrant_collection)
+    if backend == "numpy":
+        # Local stores have no aliases; they open the live version's directory.
+        return (backend, str(cfg.local_store_dir), storage_name(cfg))
+    raise ValueError(
+        f"unknown vector backend {backend!r}; expected 'qdrant' or 'numpy'"
+    )
+
+
+def _captured(cfg: Settings) -> Tuple[Any, ...]:
+    """The settings a store keeps from when it was opened."""
+    from src.retrieval.query_cache import index_version_path
+
+    common = (cfg.hybrid_prefetch, cfg.slim_payloads, index_version_path(cfg))
+    if cfg.vector_backend == "numpy":
+        return common + (cfg.local_store_dtype,)
+
+    from src.retrieval.qdrant_store import QdrantVectorStore
+
+    return common + QdrantVectorStore.captured_settings(cfg)
+
+
+def get_vector_store(cfg: Settings) -> VectorStore:
+    """Return the process-wide store for the configured backend.
+
+    A store is reopened when settings it captured (tuning profile, transport,
+    upload options, ...) differ, so a settings reload reaches it.
+    """
+    key = _store_key(cfg)
+    captured = _captured(cfg)
+    with _STORES_LOCK:
+        cached = _STORES.get(key)
+        if cached is None or cached[0] != captured:
+            cached = (captured, _open_store(cfg))
+            _STORES[key] = cached
+        return cached[1]
+
+
+def evict_vector_store(cfg: Settings) -> None:
+    """Forget the cached store of ``cfg``'s collection, e.g. after dropping it."""
+    with _STORES_LOCK:
+        _STORES.pop(_store_key(cfg), None)
+
+
+def _open_store(cfg: Settings) -> VectorStore:
+    if cfg.vector_backend == "numpy":
+        from src.retrieval.numpy_store import NumpyVectorStore
+        from src.retrieval.query_cache import index_version_path
+
+        return NumpyVectorStore(
+            cfg.local_store_dir / storage_name(cfg),
+            dtype=cfg.local_store_dtype,
+            prefetch_k=cfg.hybrid_prefetch,
+            version_path=index_version_path(cfg),
+            slim_payloads=cfg.slim_payloads,
+        )
+
+    from src.retrieval.qdrant_store import QdrantVectorStore
+
+    return QdrantVectorStore.from_settings(cfg)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+_VERSION_RE = re.compile(r"__v(\d+)$")
+
+# versions file -> (stat stamp, parsed content)
+_CACHE: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def versions_path(cfg: Settings) -> Path:
+    return Path(cfg.artifacts_dir) / f"{cfg.qdrant_collection}.versions.json"
+
+
+def _read(cfg: Settings) -> Dict[str, Any]:
+    path = versions_path(cfg)
+    try:
+        st = path.stat()
+    except OSError:
+        return {}
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    with _CACHE_LOCK:
+        _CACHE[path] = (stamp, data)
+    return data
+
+
+def _write(cfg: Settings, data: Dict[str, Any]) -> None:
+    path = versions_path(cfg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def storage_name(cfg: Settings) -> str:
+    """The collection that holds ``cfg.qdrant_collection``'s data right now.
+
+    With blue/green indexing, ``qdrant_collection`` is an alias and this is the
+    live version behind it. Side stores, vocabularies, document vectors and
+    local stores are keyed by this name, so they switch together with the alias.
+    """
+    return _read(cfg).get("live") or cfg.qdrant_collection
+
+
+def live_settings(cfg: Settings) -> Settings:
+    """Settings that write straight into the live version (aliases cannot be
+    created over)."""
+    name = storage_name(cfg)
+    if name == cfg.qdrant_collection:
+        return cfg
+    return cfg.override(qdrant_collection=name)
+
+
+def list_versions(cfg: Settings) -> List[str]:
+    """Known versions, oldest first."""
+    return list(_read(cfg).get("versions", []))
+
+
+def next_version(cfg: Settings) -> str:
+    numbers = [
+        int(m.group(1)) for v in list_versions(cfg) if (m := _VERSION_RE.search(v))
+    ]
+    return f"{cfg.qdrant_collection}__v{max(numbers, default=0) + 1}"
+
+
+def promote(cfg: Settings, version: str) -> Optional[str]:
+    """Make ``version`` live; returns the version it replaced.
+
+    On Qdrant the ``qdrant_collection`` alias is repointed in one atomic
+    request, so queries never see a missing or half-built collection.
+    """
+    from src.retrieval.query_cache import bump_index_version, index_version_path
+
+    data = _read(cfg)
+    previous = data.get("live")
+    if cfg.vector_backend == "qdrant":
+        from src.retrieval.qdrant_store import get_client, point_alias
+
+        point_alias(get_client(cfg), cfg.qdrant_collection, version)
+    versions = [v for v in data.get("versions", []) if v != version] + [version]
+    _write(cfg, {"live": version, "versions": versions})
+    # Cached results of the alias belong to the old version.
+    bump_index_version(index_version_path(cfg))
+    return previous
+
+
+def rollback(cfg: Settings, version: Optional[str] = None) -> str:
+    """Repoint the alias to ``version``, or to the version before the live one."""
+    versions = list_versions(cfg)
+    live = storage_name(cfg)
+    if version is None:
+        older = versions[: versions.index(live)] if live in versions else []
+        if not older:
+            raise ValueError(f"no version older than {live} to roll back to")
+        version = older[-1]
+    elif version not in versions:
+        raise ValueError(f"unknown version {version!r}; known: {versions}")
+    promote(cfg, version)
+    return version
+
+
+def prune(cfg: Settings, keep: int) -> List[str]:
+    """Drop all but the newest ``keep`` versions; the live one is always kept."""
+    versions = list_versions(cfg)
+    live = storage_name(cfg)
+    keep_set = set(versions[-max(1, int(keep)) :]) | {live}
+    dropped = [v for v in versions if v not in keep_set]
+    for version in dropped:
+        drop_version(cfg.override(qdrant_collection=version))
+    if dropped:
+        _write(cfg, {"live": live, "versions": [v for v in versions if v in keep_set]})
+    return dropped
+
+
+def drop_version(cfg: Settings) -> None:
+    """Delete a version's collection, document vectors and artifacts."""
+    from src.retrieval.doc_router import doc_settings, get_doc_store
+    from src.retrieval.store_base import evict_vector_store, get_vector_store
+
+    get_vector_store(cfg).reset()
+    get_doc_store(cfg).reset()
+    evict_vector_store(cfg)
+    evict_vector_store(doc_settings(cfg))
+    artifacts = Path(cfg.artifacts_dir)
+    for prefix in (cfg.qdrant_collection, doc_settings(cfg).qdrant_collection):
+        for path in artifacts.glob(f"{prefix}.*"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.retrieval.query_cache import QueryCache, index_version_path
+from src.schemas import Chunk
+from src.utils import metrics
+from src.utils.cache import LRUCache
+
+
+@pytest.fixture(autouse=True)
+def _required_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    metrics.reset()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_evicts_by_entries_bytes_and_ttl() -> None:
+    clock = _Clock()
+    cache = LRUCache("t", max_entries=2, max_bytes=100, ttl_s=10, clock=clock)
+    cache.put("a", 1, 10)
+    cache.put("b", 2, 10)
+    assert cache.get("a") == 1
+    cache.put("c", 3, 10)  # "b" is least recently used
+    assert cache.get("b") is None and len(cache) == 2
+
+    cache.put("big", 4, 95)  # over the byte bound: evicts until it fits
+    assert len(cache) == 1 and cache.nbytes == 95
+
+    clock.now = 11
+    assert cache.get("big") is None
+    assert metrics.get("cache_hits_total", cache="t") == 1
+    assert metrics.get("cache_misses_total", cache="t") == 2
+    assert 'cache_hit_ratio{cache="t"}' in metrics.render_prometheus()
+
+
+def test_results_invalidated_by_index_writes(tmp_path: Path) -> None:
+    cfg = Settings(artifacts_dir=tmp_path / "artifacts")
+    cache = QueryCache(cfg)
+    store = NumpyVectorStore(tmp_path / "kb", version_path=index_version_path(cfg))
+    store.ensure_collection(2)
+
+    calls = []
+
+    def run():
+        calls.append(1)
+        return store.search([1.0, 0.0], top_k=3)
+
+    def embed(texts):
+        calls.append(len(texts))
+        return [[1.0, 0.0] for _ in texts]
+
+    emb = cache.embed(embed, ["what is R^2?"])[0]
+    assert cache.embed(embed, ["what is R^2? "]) == [emb]
+    assert cache.search(emb, ("pdf", 3), run) == []
+    assert cache.search(emb, ("pdf", 3), run) == []
+    assert calls == [1, 1]
+
+    chunk = Chunk(source="pdf", doc_id="d", chunk_id="pdf::d::0", text="x", meta={})
+    store.upsert([chunk], [[1.0, 0.0]])
+    rows = cache.search(emb, ("pdf", 3), run)
+    assert len(rows) == 1 and calls == [1, 1, 1]
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+from src.retrieval.courses import (
+    course_of,
+    course_settings,
+    list_courses,
+    list_titles,
+    save_courses,
+)
+from src.retrieval.retriever import search_rows
+from src.retrieval.store_base import get_vector_store
+from src.schemas import Chunk
+
+
+@pytest.fixture()
+def cfg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    return Settings(
+        embedding_dim=2,
+        vector_backend="numpy",
+        local_store_dir=tmp_path / "store",
+        artifacts_dir=tmp_path / "artifacts",
+        slim_payloads=False,
+        course_shards=True,
+    )
+
+
+def test_course_is_first_directory_under_pdf_dir() -> None:
+    assert course_of("DS101 Intro/week1/notes.pdf") == "DS101 Intro"
+    assert course_of("loose.pdf") == "general"
+
+
+def _index(cfg: Settings, course: str, vectors) -> None:
+    shard = course_settings(cfg, course)
+    store = get_vector_store(shard)
+    store.ensure_collection(2)
+    chunks = [
+        Chunk(
+            source="pdf",
+            doc_id=course,
+            chunk_id=f"pdf::{course}::{i}",
+            text=f"{course} {i}",
+            meta={"title": f"{course}.pdf"},
+        )
+        for i in range(len(vectors))
+    ]
+    store.upsert(chunks, vectors)
+
+
+def test_queries_touch_selected_course_or_fan_out(cfg: Settings) -> None:
+    _index(cfg, "DS101 Intro", [[1.0, 0.0], [0.8, 0.6]])
+    _index(cfg, "ML 201", [[0.9, 0.1], [0.0, 1.0]])
+    save_courses(cfg, ["DS101 Intro", "ML 201"])
+    assert list_courses(cfg) == ["DS101 Intro", "ML 201"]
+    shard = course_settings(cfg, "ML 201")
+    assert shard.qdrant_collection == "ai_teaching_assistant_kb__ml_201"
+
+    one = search_rows(
+        cfg.override(course="ML 201"), "q", [1.0, 0.0], top_k=5, source="pdf"
+    )
+    assert {p["title"] for _, p in one} == {"ML 201.pdf"}
+
+    merged = search_rows(cfg, "q", [1.0, 0.0], top_k=3, source="pdf")
+    assert [p["chunk_id"] for _, p in merged] == [
+        "pdf::DS101 Intro::0",
+        "pdf::ML 201::0",
+        "pdf::DS101 Intro::1",
+    ]
+    assert list_titles(cfg) == ["DS101 Intro.pdf", "ML 201.pdf"]
+
+
+def test_courses_sharing_a_slug_are_refused(cfg: Settings) -> None:
+    save_courses(cfg, ["ML 101"])
+    with pytest.raises(ValueError, match="'ML 101' / 'ml-101'"):
+        save_courses(cfg, ["ml-101"])
+    assert list_courses(cfg) == ["ML 101"]
+    # A rebuild replaces the list, so a renamed directory is accepted then.
+    assert save_courses(cfg, ["ml-101"], replace=True) == ["ml-101"]
@@ -0,0 +1,139 @@
+import json
+import threading
+import warnings
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+from src.indexing import distributed, index_build
+from src.indexing.ingest_pdfs import PDFDoc, doc_id_for
+from src.indexing.leases import LeaseQueue
+from src.retrieval import qdrant_store
+from src.retrieval.side_store import get_side_store
+from src.retrieval.store_base import get_vector_store
+
+qdrant_client = pytest.importorskip("qdrant_client")
+
+
+class _Embedder:
+    def __init__(self, cfg: Settings) -> None:
+        pass
+
+    def embed_texts(self, texts, bulk=False):
+        return [[float(len(t) % 7) + 1.0, float(len(t) % 3), 1.0, 0.5] for t in texts]
+
+
+@pytest.fixture()
+def cfg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    for name in ("stats", "ml", "sql", "nlp", "cv"):
+        (pdf_dir / f"{name}.pdf").write_bytes(b"")
+
+    def fake_ingest(p: Path, root: Path) -> PDFDoc:
+        text = " ".join(f"{p.stem} line {i}." for i in range(200))
+        return PDFDoc(doc_id_for(p), p.name, text, {"source": "pdf", "title": p.name})
+
+    client = qdrant_client.QdrantClient(":memory:")
+    monkeypatch.setattr(qdrant_store, "get_client", lambda cfg=None: client)
+    monkeypatch.setattr(index_build, "ingest_pdf", fake_ingest)
+    monkeypatch.setattr(index_build, "OpenAIClient", _Embedder)
+    return Settings(
+        embedding_dim=4,
+        vector_backend="qdrant",
+        pdf_dir=pdf_dir,
+        artifacts_dir=tmp_path / "artifacts",
+        qdrant_collection=f"kb_{tmp_path.name}",
+        chunk_chars=600,
+        index_lease_s=30.0,
+        index_poll_s=0.05,
+    )
+
+
+def test_leases_are_exclusive_and_expired_ones_are_taken_over(tmp_path: Path) -> None:
+    now = [1000.0]
+    a = LeaseQueue(tmp_path, owner="a", lease_s=10, clock=lambda: now[0])
+    b = LeaseQueue(tmp_path, owner="b", lease_s=10, clock=lambda: now[0])
+
+    assert a.claim("x") and not b.claim("x")
+    now[0] += 5
+    a.renew()
+    now[0] += 9
+    assert not b.claim("x")  # renewed, still live
+
+    now[0] += 2
+    assert b.claim("x") and b.recovered == 1
+    a.renew()
+    assert a.held() == set()  # a noticed it lost the lease
+    lease = json.loads((tmp_path / "leases" / "x.lease").read_text())
+    assert lease == {"owner": "b", "expires": now[0] + 10}
+    a.release("x")
+    assert (tmp_path / "leases" / "x.lease").exists()
+
+    b.complete("x", {"chunks": 3})
+    assert a.is_done("x") and not a.claim("x")
+    assert a.result("x") == {"owner": "b", "chunks": 3}
+
+
+def test_expired_lease_is_not_renewed(tmp_path: Path) -> None:
+    now = [1000.0]
+    a = LeaseQueue(tmp_path, owner="a", lease_s=10, clock=lambda: now[0])
+    assert a.claim("x")
+    now[0] += 11
+    # Nobody claimed it yet, but a renewal now could race with one that does.
+    a.renew()
+    assert a.held() == set()
+    lease = json.loads((tmp_path / "leases" / "x.lease").read_text())
+    assert lease["expires"] == 1010.0
+
+
+def test_workers_split_the_files_and_one_aggregates(cfg: Settings) -> None:
+    # A dead worker left a lease behind that expired long ago.
+    dead = LeaseQueue(
+        distributed.run_dir(cfg, "r1"), owner="dead", lease_s=1, clock=lambda: 0.0
+    )
+    assert dead.claim(distributed._task_key("", "ml.pdf"))
+    # Another stalled while merging; its lease runs out during the run.
+    stalled = LeaseQueue(distributed.run_dir(cfg, "r1"), owner="stalled", lease_s=0.5)
+    assert stalled.claim(distributed._AGGREGATE)
+
+    reports = {}
+
+    def work(name: str) -> None:
+        reports[name] = distributed.run_worker(
+            "r1", worker_id=name, reset=True, cfg=cfg
+        )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        threads = [threading.Thread(target=work, args=(n,)) for n in ("w1", "w2")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert set(reports) == {"w1", "w2"}
+    totals = [r.total for r in reports.values() if r.total is not None]
+    assert len(totals) == 1
+    total = totals[0]
+    assert total.docs == 5
+    assert sum(r.stats.docs for r in reports.values()) == 5
+    assert sum(r.leases_recovered for r in reports.values()) == 2
+
+    assert get_vector_store(cfg).count() == total.chunks_total
+    # Side stores written by the workers were merged into the shared one.
+    side = get_side_store(cfg)
+    assert len(side.catalog()) == 5
+    assert sum(e.chunks for e in side.catalog()) == total.chunks_total
+
+    # A late worker finds nothing left to do.
+    late = distributed.run_worker("r1", worker_id="w3", cfg=cfg)
+    assert late.stats.docs == 0 and late.total is None
+
+
+def test_worker_mode_rejects_a_local_store(cfg: Settings) -> None:
+    with pytest.raises(ValueError, match="numpy"):
+        distributed.run_worker("r2", cfg=cfg.override(vector_backend="numpy"))
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.config.settings import Settings
+from src.retrieval.doc_router import (
+    build_doc_vectors,
+    get_doc_store,
+    refresh_doc_vectors,
+    route_docs,
+)
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.schemas import Chunk
+
+
+@pytest.fixture()
+def cfg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    return Settings(
+        embedding_dim=4,
+        vector_backend="numpy",
+        local_store_dir=tmp_path / "store",
+        artifacts_dir=tmp_path / "artifacts",
+        doc_routing=True,
+        doc_routing_top=1,
+    )
+
+
+def _fill(store: NumpyVectorStore) -> None:
+    # Doc "a" lives along axis 0, doc "b" along axis 1; "c" is in between.
+    centers = {
+        "a": [1.0, 0.0, 0.0, 0.0],
+        "b": [0.0, 1.0, 0.0, 0.0],
+        "c": [0.6, 0.6, 0.5, 0.0],
+    }
+    rng = np.random.default_rng(0)
+    chunks, vectors = [], []
+    for doc, center in centers.items():
+        for i in range(4):
+            chunks.append(
+                Chunk(
+                    source="pdf",
+                    doc_id=doc,
+                    chunk_id=f"pdf::{doc}::{i}",
+                    text="x",
+                    meta={"title": doc},
+                )
+            )
+            vectors.append((np.asarray(center) + rng.normal(0, 0.05, 4)).tolist())
+    store.ensure_collection(4)
+    store.upsert(chunks, vectors)
+
+
+def test_centroids_route_search_to_the_closest_doc(cfg: Settings) -> None:
+    from src.retrieval.store_base import get_vector_store
+
+    store = get_vector_store(cfg)
+    _fill(store)
+
+    ids, matrix, payloads = build_doc_vectors(store)
+    assert [p["doc_id"] for p in payloads] == ["a", "b", "c"]
+    assert matrix.shape == (3, 4) and payloads[0]["chunks"] == 4
+
+    assert refresh_doc_vectors(cfg, store, ["a", "b", "c"]) == 3
+    assert refresh_doc_vectors(cfg, store, ["a", "b", "c"]) == 0
+    assert refresh_doc_vectors(cfg, store, ["a", "b", "c"], changed={"b"}) == 1
+
+    query = [0.1, 1.0, 0.0, 0.0]
+    assert route_docs(cfg, query) == ["b"]
+    rows = store.search(query, top_k=20, doc_ids=route_docs(cfg, query))
+    assert len(rows) == 4 and {p["doc_id"] for _, p in rows} == {"b"}
+    assert route_docs(cfg.override(doc_routing=False), query) is None
+
+
+def test_unbuilt_doc_store_falls_back_to_flat_search(cfg: Settings) -> None:
+    assert get_doc_store(cfg).count() == 0
+    assert route_docs(cfg, [1.0, 0.0, 0.0, 0.0]) is None
@@ -1,8 +1,21 @@
 from pathlib import Path
 
+import pytest
+
 from src.indexing.ingest_pdfs import ingest_pdf_dir
 
 
 def test_ingest_empty_dir(tmp_path: Path) -> None:
     docs = ingest_pdf_dir(tmp_path)
     assert docs == []
+
+
+def test_ingest_counts_pages_from_the_extraction_pass(tmp_path: Path) -> None:
+    fitz = pytest.importorskip("fitz")
+    pdf = fitz.open()
+    for i in range(3):
+        pdf.new_page().insert_text((72, 72), f"Regression page {i}")
+    pdf.save(str(tmp_path / "notes.pdf"))
+
+    (doc,) = ingest_pdf_dir(tmp_path)
+    assert doc.pages == 3 and "Regression page 2" in doc.text
@@ -0,0 +1,109 @@
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+from src.indexing import index_build
+from src.indexing.ingest_pdfs import PDFDoc
+from src.indexing.journal import Progress, open_journal
+
+
+class _FlakyEmbedder:
+    """Fails on call ``fail_on``; counts every text it embeds."""
+
+    calls = 0
+    embedded = 0
+    fail_on = None
+
+    def __init__(self, cfg: Settings) -> None:
+        self.dim = cfg.embedding_dim
+
+    def embed_texts(self, texts, bulk=False):
+        cls = type(self)
+        cls.calls += 1
+        if cls.calls == cls.fail_on:
+            raise RuntimeError("embedding API down")
+        cls.embedded += len(texts)
+        return [[1.0] + [0.5] * (self.dim - 1) for _ in texts]
+
+
+@pytest.fixture()
+def cfg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    for i in range(6):
+        (pdf_dir / f"book{i}.pdf").write_bytes(b"")
+
+    def fake_ingest(p: Path, root: Path) -> PDFDoc:
+        text = " ".join(f"{p.stem} term{i}" for i in range(400))
+        return PDFDoc(p.stem, p.name, text, {"source": "pdf", "title": p.name})
+
+    monkeypatch.setattr(index_build, "ingest_pdf", fake_ingest)
+    monkeypatch.setattr(index_build, "OpenAIClient", _FlakyEmbedder)
+    _FlakyEmbedder.calls = _FlakyEmbedder.embedded = 0
+    return Settings(
+        embedding_dim=4,
+        vector_backend="numpy",
+        pdf_dir=pdf_dir,
+        artifacts_dir=tmp_path / "artifacts",
+        local_store_dir=tmp_path / "store",
+        qdrant_collection="journaled",
+        index_batch_size=2,
+        index_embed_workers=1,
+        index_upsert_workers=1,
+    )
+
+
+def test_interrupted_run_resumes_without_redoing_work(cfg: Settings) -> None:
+    _FlakyEmbedder.fail_on = 4
+    with pytest.raises(RuntimeError, match="API down"):
+        index_build.index_pdfs(reset=True, cfg=cfg)
+    embedded_before = _FlakyEmbedder.embedded
+    assert embedded_before > 0
+
+    _FlakyEmbedder.fail_on = None
+    stats = index_build.index_pdfs(cfg=cfg)
+    # Every chunk was embedded exactly once across both runs.
+    assert _FlakyEmbedder.embedded == stats.chunks_total
+    assert stats.embeddings_computed == stats.chunks_total - embedded_before
+    assert stats.chunks_resumed + stats.embeddings_reused == embedded_before
+    assert stats.points_upserted == stats.chunks_total - stats.chunks_resumed
+    store = index_build.get_vector_store(cfg)
+    assert sum(len(ids) for ids, _, _ in store.iter_points()) == stats.chunks_total
+
+    left = open_journal(cfg).start()
+    assert left == {"resumed": 0, "embedded": 0, "written": 0}
+
+
+def test_journaled_vectors_need_matching_text_and_model(cfg: Settings) -> None:
+    from src.schemas import Chunk
+
+    chunk = Chunk(source="pdf", doc_id="d", chunk_id="pdf::d::0", text="hello", meta={})
+    journal = open_journal(cfg)
+    journal.start()
+    journal.put_embeddings([chunk], [[0.25, 0.5, 0.75, 1.0]])
+    assert journal.embeddings([chunk]) == {"pdf::d::0": [0.25, 0.5, 0.75, 1.0]}
+    assert journal.embeddings([chunk.model_copy(update={"text": "changed"})]) == {}
+
+    other = open_journal(cfg.override(embed_model="text-embedding-3-small"))
+    assert other.start()["embedded"] == 0
+
+
+def test_progress_extrapolates_total_and_eta() -> None:
+    now = [0.0]
+    lines = []
+    progress = Progress(
+        "kb", 4, interval_s=5.0, sink=lines.append, clock=lambda: now[0]
+    )
+    progress.chunked(100)
+    now[0] = 2.0
+    progress.advance(50)
+    assert lines == []
+
+    now[0] = 10.0
+    progress.advance(50)
+    assert progress.total() == 400 and progress.rate() == 10.0
+    assert progress.eta_s() == 30.0
+    assert lines == ["kb: 100/400 chunks (25%), files 1/4, 10.0 chunks/s, ETA 30s"]
@@ -0,0 +1,48 @@
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+from src.bench.microbench import (
+    compare,
+    fake_embeddings,
+    load_baseline,
+    run_suite,
+    save_baseline,
+    synthetic_book,
+)
+
+
+def test_corpus_and_embeddings_are_deterministic() -> None:
+    book = synthetic_book(3)
+    assert book == synthetic_book(3) and len(book) >= 3 * 3000
+    a = fake_embeddings(["x", "y", "x"], 16)
+    assert np.allclose(a[0], a[2]) and not np.allclose(a[0], a[1])
+    assert np.allclose(np.linalg.norm(a, axis=1), 1.0)
+
+
+def test_suite_runs_offline_and_flags_regressions(tmp_path: Path) -> None:
+    results = run_suite(pages=5, dim=16, min_time_s=0.001, repeats=1)
+    names = [r.name for r in results]
+    assert names[:5] == [
+        "normalize_text",
+        "chunk_text",
+        "make_point_id",
+        "numpy_search",
+        "hydrate_citations",
+    ]
+    assert all(r.ops_per_s > 0 and r.peak_kb >= 0 and r.calls >= 1 for r in results)
+
+    path = tmp_path / "baseline.json"
+    save_baseline(path, results, pages=5, dim=16)
+    baseline = load_baseline(path)
+    assert compare(results, baseline) == []
+
+    slower = [replace(results[0], ops_per_s=results[0].ops_per_s * 0.5)]
+    bigger = [replace(results[1], peak_kb=results[1].peak_kb * 3 + 1000)]
+    found = compare(slower + bigger, baseline, threshold=0.2)
+    assert [(r.name, r.metric) for r in found] == [
+        ("normalize_text", "ops_per_s"),
+        ("chunk_text", "peak_kb"),
+    ]
+    assert found[0].change == -0.5
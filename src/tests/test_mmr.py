@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.retrieval.mmr import mmr_search, mmr_select
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.schemas import Chunk
+
+
+def test_mmr_skips_near_duplicates() -> None:
+    query = [1.0, 0.0, 0.0]
+    candidates = np.array(
+        [
+            [0.95, 0.30, 0.0],
+            [0.95, 0.31, 0.0],  # near-copy of the first
+            [0.90, 0.0, 0.40],
+        ]
+    )
+    assert mmr_select(query, candidates, k=2, lambda_=1.0) == [0, 1]
+    assert mmr_select(query, candidates, k=2, lambda_=0.5) == [0, 2]
+    assert mmr_select(query, candidates, k=10) == mmr_select(query, candidates, k=3)
+    assert mmr_select(query, candidates[:0], k=3) == []
+
+
+def test_mmr_search_over_store(tmp_path: Path) -> None:
+    store = NumpyVectorStore(tmp_path / "kb")
+    store.ensure_collection(3)
+    vectors = [[1.0, 0.01 * i, 0.0] for i in range(6)] + [[0.8, 0.0, 0.6]]
+    chunks = [
+        Chunk(
+            source="pdf",
+            doc_id="d",
+            chunk_id=f"pdf::d::{i}",
+            text=str(i),
+            meta={"title": "A"},
+        )
+        for i in range(len(vectors))
+    ]
+    store.upsert(chunks, vectors)
+
+    plain = store.search([1.0, 0.0, 0.0], top_k=2)
+    diverse = mmr_search(store, [1.0, 0.0, 0.0], top_k=2, lambda_=0.3, oversample=4)
+    assert [p["chunk_id"] for _, p in plain] == ["pdf::d::0", "pdf::d::1"]
+    assert [p["chunk_id"] for _, p in diverse] == ["pdf::d::0", "pdf::d::6"]
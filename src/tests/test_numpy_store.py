@@ -0,0 +1,136 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.schemas import Chunk
+from src.utils.ids import make_point_id
+
+
+def _chunks(n: int, titles=("A.pdf", "B.pdf")):
+    return [
+        Chunk(
+            source="pdf",
+            doc_id=f"doc{i % len(titles)}",
+            chunk_id=f"pdf::doc{i % len(titles)}::{i}",
+            text=f"chunk {i}",
+            meta={"title": titles[i % len(titles)]},
+        )
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_exact_top_k_matches_brute_force(tmp_path: Path, dtype: str) -> None:
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((200, 16)).astype(np.float32)
+    store = NumpyVectorStore(tmp_path / "kb", dtype=dtype, block_rows=64)
+    store.ensure_collection(16)
+    assert store.upsert(_chunks(200), vectors.tolist()) == 200
+
+    query = rng.standard_normal(16).astype(np.float32)
+    rows = store.search(query.tolist(), top_k=5)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(unit @ (query / np.linalg.norm(query))))[:5]
+    expected_ids = [f"pdf::doc{i % 2}::{i}" for i in expected]
+    assert [p["chunk_id"] for _, p in rows] == expected_ids
+    assert rows[0][0] >= rows[-1][0]
+
+
+def test_search_many_matches_single_queries(tmp_path: Path) -> None:
+    rng = np.random.default_rng(1)
+    store = NumpyVectorStore(tmp_path / "kb", dtype="float16", block_rows=32)
+    store.ensure_collection(8)
+    store.upsert(_chunks(100), rng.standard_normal((100, 8)).tolist())
+
+    queries = rng.standard_normal((5, 8)).tolist()
+    batched = store.search_many(queries, top_k=4, titles=["B.pdf"])
+    single = [store.search(q, top_k=4, titles=["B.pdf"]) for q in queries]
+    assert [[p["chunk_id"] for _, p in r] for r in batched] == [
+        [p["chunk_id"] for _, p in r] for r in single
+    ]
+    assert store.search_many([], top_k=4) == []
+
+
+def test_filters_persistence_and_overwrite(tmp_path: Path) -> None:
+    store = NumpyVectorStore(tmp_path / "kb")
+    store.ensure_collection(4)
+    chunks = _chunks(6)
+    vectors = [[1.0, 0.0, 0.0, float(i)] for i in range(6)]
+    store.upsert(chunks, vectors)
+
+    rows = store.search([1.0, 0.0, 0.0, 0.0], top_k=10, titles=["B.pdf"], source="PDF")
+    assert {p["title"] for _, p in rows} == {"B.pdf"} and len(rows) == 3
+    assert store.search([1.0, 0.0, 0.0, 0.0], top_k=10, source="web") == []
+    close = store.search([1.0, 0.0, 0.0, 0.0], top_k=10, min_score=0.9)
+    assert all(s >= 0.9 for s, _ in close)
+
+    updated = chunks[0].model_copy(update={"text": "rewritten"})
+    store.upsert([updated], [[0.0, 1.0, 0.0, 0.0]])
+
+    reopened = NumpyVectorStore(tmp_path / "kb")
+    assert reopened.count() == 6
+    top = reopened.search([0.0, 1.0, 0.0, 0.0], top_k=1)
+    assert top[0][1]["text"] == "rewritten"
+    probe = [make_point_id(chunks[1].chunk_id), "missing"]
+    assert reopened.points_exist(probe) == [True, False]
+    assert reopened.list_titles() == ["A.pdf", "B.pdf"]
+
+
+def test_dimension_mismatch_is_rejected(tmp_path: Path) -> None:
+    store = NumpyVectorStore(tmp_path / "kb")
+    store.ensure_collection(4)
+    with pytest.raises(ValueError):
+        store.ensure_collection(8)
+
+
+def test_rewrites_append_and_leave_earlier_snapshots_intact(tmp_path: Path) -> None:
+    store = NumpyVectorStore(tmp_path / "kb")
+    store.ensure_collection(4)
+    chunks = _chunks(4)
+    store.upsert(chunks, [[1.0, 0.0, 0.0, float(i)] for i in range(4)])
+    before = store._load()
+    rows_before = before.rows.copy()
+
+    updated = chunks[0].model_copy(update={"text": "rewritten"})
+    store.upsert([updated], [[0.0, 1.0, 0.0, 0.0]])
+
+    # A search that took its snapshot before the write still reads old rows.
+    assert before.count == 4 and np.array_equal(before.rows, rows_before)
+    assert store._read_payloads(before, np.array([0]))[0]["text"] == "chunk 0"
+
+    assert store.count() == 4
+    rows = store.search([1.0, 0.0, 0.0, 0.0], top_k=10)
+    assert len(rows) == 4 and "chunk 0" not in {p["text"] for _, p in rows}
+    assert sum(len(ps) for _, _, ps in store.iter_points()) == 4
+
+    assert store.delete_points([])[0] == 0
+    assert store._load().count == 4 and store._load().live is None
+    assert store.search([0.0, 1.0, 0.0, 0.0], top_k=1)[0][1]["text"] == "rewritten"
+
+
+def test_writes_append_and_keep_the_cached_state(tmp_path: Path) -> None:
+    store = NumpyVectorStore(tmp_path / "kb")
+    store.ensure_collection(4)
+    meta = (tmp_path / "kb" / "meta.json").stat()
+    for start in range(0, 6, 2):
+        batch = _chunks(6)[start : start + 2]
+        store.upsert(batch, [[1.0, 0.0, 0.0, float(start)]] * 2)
+
+    # Metadata grows by lines; meta.json and the cached rows are not rewritten.
+    assert (tmp_path / "kb" / "meta.json").stat().st_mtime_ns == meta.st_mtime_ns
+    assert (tmp_path / "kb" / "ids.jsonl").read_text().count("\n") == 6
+    state = store._load()
+    assert state.count == 6 and np.shares_memory(state.rows, state.row_buffer)
+
+    # A torn id line from an interrupted write is ignored, then overwritten.
+    with (tmp_path / "kb" / "ids.jsonl").open("ab") as fh:
+        fh.write(b'"half-writ')
+    reopened = NumpyVectorStore(tmp_path / "kb")
+    assert reopened.count() == 6
+    reopened.upsert(_chunks(7)[6:], [[0.0, 1.0, 0.0, 0.0]])
+    assert NumpyVectorStore(tmp_path / "kb").count() == 7
+    top = NumpyVectorStore(tmp_path / "kb").search([0.0, 1.0, 0.0, 0.0], top_k=1)
+    assert top[0][1]["chunk_id"] == "pdf::doc0::6"
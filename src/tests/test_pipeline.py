@@ -0,0 +1,175 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+from src.indexing import index_build
+from src.indexing.ingest_pdfs import PDFDoc
+from src.indexing.pipeline import Stage, run_pipeline
+
+
+def test_stages_stream_items_across_workers() -> None:
+    def split(n: int):
+        yield from (n * 10 + i for i in range(3))
+
+    def square(n: int):
+        time.sleep(0.001)
+        yield n * n
+
+    out, stats = run_pipeline(
+        range(20), [Stage("split", split, 2), Stage("square", square, 4)], queue_size=2
+    )
+    assert sorted(out) == sorted((n * 10 + i) ** 2 for n in range(20) for i in range(3))
+    assert [(s.name, s.workers, s.items_in, s.items_out) for s in stats] == [
+        ("split", 2, 20, 60),
+        ("square", 4, 60, 60),
+    ]
+
+
+def test_bounded_queue_holds_back_the_source() -> None:
+    pulled = []
+    gate = threading.Event()
+
+    def source():
+        for i in range(100):
+            pulled.append(i)
+            yield i
+
+    def slow(n: int):
+        gate.wait(timeout=5)
+        yield n
+
+    t = threading.Thread(
+        target=run_pipeline,
+        args=(source(), [Stage("slow", slow, 1)]),
+        kwargs={"queue_size": 2},
+    )
+    t.start()
+    time.sleep(0.2)
+    # One item in the worker, two queued, one blocked in put().
+    assert len(pulled) <= 4
+    gate.set()
+    t.join(timeout=5)
+    assert len(pulled) == 100
+
+
+def test_first_stage_error_is_raised() -> None:
+    def boom(n: int):
+        if n == 7:
+            raise RuntimeError("bad item")
+        yield n
+
+    with pytest.raises(RuntimeError, match="bad item"):
+        run_pipeline(
+            range(1000),
+            [Stage("boom", boom, 3), Stage("id", lambda n: [n], 2)],
+            queue_size=1,
+        )
+
+
+class _FakeEmbedder:
+    def __init__(self, cfg: Settings) -> None:
+        self.dim = cfg.embedding_dim
+
+    def embed_texts(self, texts, bulk=False):
+        return [
+            [float(len(t) % 7 + 1)] + [float(i == j) for j in range(self.dim - 1)]
+            for i, t in enumerate(texts)
+        ]
+
+
+@pytest.mark.parametrize("hybrid", [False, True])
+def test_index_pdfs_streams_and_skips_existing_chunks(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path, hybrid: bool
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    for name in ("a.pdf", "b.pdf", "c.pdf"):
+        (pdf_dir / name).write_bytes(b"")
+
+    def fake_ingest(p: Path, root: Path) -> PDFDoc:
+        text = " ".join(f"{p.stem} word{i}" for i in range(300))
+        return PDFDoc(
+            p.stem,
+            p.name,
+            text,
+            {"source": "pdf", "title": p.name, "course": "general"},
+        )
+
+    monkeypatch.setattr(index_build, "ingest_pdf", fake_ingest)
+    monkeypatch.setattr(index_build, "OpenAIClient", _FakeEmbedder)
+    cfg = Settings(
+        embedding_dim=4,
+        vector_backend="numpy",
+        pdf_dir=pdf_dir,
+        artifacts_dir=tmp_path / "artifacts",
+        local_store_dir=tmp_path / "store",
+        qdrant_collection=f"pipe_{hybrid}",
+        hybrid=hybrid,
+        index_batch_size=3,
+        index_embed_workers=3,
+        index_queue_size=2,
+    )
+
+    first = index_build.index_pdfs(reset=True, cfg=cfg)
+    assert first.docs == 3 and first.chunks_total > 3
+    assert first.chunks_missing == first.embeddings_computed == first.chunks_total
+    assert first.points_upserted == first.chunks_total
+    catalog = index_build.get_side_store(cfg).catalog()
+    assert sorted(e.doc_id for e in catalog) == ["a", "b", "c"]
+
+    again = index_build.index_pdfs(cfg=cfg)
+    assert again.chunks_total == first.chunks_total
+    assert again.chunks_missing == again.points_upserted == 0
+    if hybrid:
+        # Re-read documents replace their counts rather than adding to them.
+        vocab = index_build.SparseVocab.load(index_build.vocab_path(cfg))
+        assert vocab.n_docs == first.chunks_total
+
+
+def test_index_report_has_stage_times_and_is_written(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    pdf_dir = tmp_path / "pdfs"
+    (pdf_dir / "course").mkdir(parents=True)
+    for i, name in enumerate(("a.pdf", "b.pdf", "course/c.pdf")):
+        (pdf_dir / name).write_bytes(b"%PDF" * (i + 1))
+
+    def fake_ingest(p: Path, root: Path) -> PDFDoc:
+        time.sleep(0.05 if p.stem == "c" else 0.0)
+        text = " ".join(f"{p.stem} word{i}" for i in range(300))
+        return PDFDoc(
+            p.stem, p.name, text, {"source": "pdf", "title": p.name}, pages=10
+        )
+
+    monkeypatch.setattr(index_build, "ingest_pdf", fake_ingest)
+    monkeypatch.setattr(index_build, "OpenAIClient", _FakeEmbedder)
+    cfg = Settings(
+        embedding_dim=4,
+        vector_backend="numpy",
+        pdf_dir=pdf_dir,
+        artifacts_dir=tmp_path / "artifacts",
+        local_store_dir=tmp_path / "store",
+        qdrant_collection="report",
+    )
+
+    stats = index_build.index_pdfs(reset=True, cfg=cfg)
+    assert stats.pages == 30 and stats.pdf_bytes == 4 * (1 + 2 + 3)
+    assert stats.text_bytes > 0 and stats.pages_per_s > 0 and stats.peak_rss_mb > 0
+    names = [s.name for s in stats.stages]
+    assert names == ["extract", "chunk", "dedupe", "embed", "upsert"]
+    assert all(s.wall_s > 0 for s in stats.stages)
+    assert stats.slowest_files[0][0] == "course/c.pdf"
+    assert any("embeddings/s" in line for line in index_build.format_report(stats))
+
+    (report,) = (tmp_path / "artifacts" / "index_reports").glob("*__report.json")
+    data = json.loads(report.read_text(encoding="utf-8"))
+    assert data["stats"]["rates"]["chunks_per_s"] == pytest.approx(stats.chunks_per_s)
+    assert index_build.IndexStats.from_dict(data["stats"]) == stats
@@ -0,0 +1,219 @@
+import warnings
+
+import pytest
+
+from src.retrieval.qdrant_store import (
+    ensure_collection,
+    list_titles,
+    search,
+    search_many,
+    search_with_stats,
+    upsert_chunks,
+)
+from src.schemas import Chunk
+from src.utils.resilience import DependencyGuard, GuardConfig
+
+qdrant_client = pytest.importorskip("qdrant_client")
+
+_BOOKS = {
+    "A.pdf": [1.0, 0.0, 0.0, 0.0],
+    "B.pdf": [0.9, 0.1, 0.0, 0.0],
+    "C.pdf": [0.0, 1.0, 0.0, 0.0],
+}
+
+
+@pytest.fixture()
+def client():
+    c = qdrant_client.QdrantClient(":memory:")
+    with warnings.catch_warnings():
+        # Local mode accepts but ignores payload indexes.
+        warnings.simplefilter("ignore")
+        ensure_collection(c, "kb", vector_size=4)
+
+    chunks, embs = [], []
+    for title, vec in _BOOKS.items():
+        for i in range(5):
+            chunks.append(
+                Chunk(
+                    source="pdf",
+                    doc_id=title,
+                    chunk_id=f"pdf::{title}::{i}",
+                    text=f"{title} chunk {i}",
+                    meta={"title": title},
+                )
+            )
+            embs.append([v + 0.01 * i for v in vec])
+    upsert_chunks(c, "kb", chunks, embs)
+    return c
+
+
+def _guard() -> DependencyGuard:
+    return DependencyGuard("test", GuardConfig(timeout_s=0, hedge=False))
+
+
+def test_title_filter_runs_server_side(client) -> None:
+    rows, stats = search_with_stats(
+        client,
+        "kb",
+        [1.0, 0.0, 0.0, 0.0],
+        top_k=4,
+        source="pdf",
+        titles=["C.pdf"],
+        guard=_guard(),
+    )
+    assert len(rows) == 4
+    assert {p["title"] for _, p in rows} == {"C.pdf"}
+    assert stats.filtered and stats.hits == 4 and stats.payload_bytes > 0
+
+
+def test_doc_id_filter_restricts_to_routed_docs(client) -> None:
+    rows = search(
+        client,
+        "kb",
+        [1.0, 0.0, 0.0, 0.0],
+        top_k=10,
+        doc_ids=["B.pdf", "C.pdf"],
+        guard=_guard(),
+    )
+    assert len(rows) == 10
+    assert {p["doc_id"] for _, p in rows} == {"B.pdf", "C.pdf"}
+
+
+def test_list_titles_reads_title_facet(client) -> None:
+    assert list_titles(client, "kb") == sorted(_BOOKS)
+    assert len(list_titles(client, "kb", limit=2)) == 2
+
+
+def test_min_score_becomes_score_threshold(client) -> None:
+    rows, stats = search_with_stats(
+        client, "kb", [1.0, 0.0, 0.0, 0.0], top_k=15, min_score=0.5, guard=_guard()
+    )
+    assert rows and all(score >= 0.5 for score, _ in rows)
+    assert {p["title"] for _, p in rows} == {"A.pdf", "B.pdf"}
+    assert not stats.filtered
+
+
+def test_search_many_matches_single_queries_in_order(client) -> None:
+    queries = [[0.0, 1.0, 0.0, 0.0], [1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]]
+    titles = ["A.pdf", "C.pdf"]
+    batched = search_many(
+        client, "kb", queries, top_k=3, titles=titles, guard=_guard(), batch_size=2
+    )
+    single = [
+        search(client, "kb", q, top_k=3, titles=titles, guard=_guard()) for q in queries
+    ]
+    assert [[p["chunk_id"] for _, p in rows] for rows in batched] == [
+        [p["chunk_id"] for _, p in rows] for rows in single
+    ]
+    assert {p["title"] for _, p in batched[0]} == {"C.pdf"}
+
+
+def test_tuning_profile_applies_at_creation_and_query() -> None:
+    from src.config.settings import TuningProfile
+    from src.retrieval.qdrant_store import estimate_ram_bytes, search_params
+
+    profile = TuningProfile(
+        quantization="scalar", on_disk_vectors=True, oversampling=3.0
+    )
+    c = qdrant_client.QdrantClient(":memory:")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ensure_collection(c, "tuned", vector_size=8, profile=profile)
+    assert c.get_collection("tuned").config.params.vectors.on_disk is True
+
+    params = search_params(profile)
+    assert params.hnsw_ef == profile.search_ef
+    assert params.quantization.rescore and params.quantization.oversampling == 3.0
+    assert search_params(TuningProfile()).quantization is None
+
+    ram = estimate_ram_bytes(profile, n_points=1000, vector_size=3072)
+    assert ram["vectors"] == 0 and ram["quantized"] == 1000 * 3072
+
+
+def test_get_client_is_shared_per_connection_settings(monkeypatch) -> None:
+    from src.config.settings import Settings
+    from src.retrieval import qdrant_store
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(qdrant_store, "new_client", lambda cfg: object())
+    cfg = Settings(qdrant_url="http://127.0.0.1:9")
+    client = qdrant_store.get_client(cfg)
+    assert qdrant_store.get_client(cfg.override(top_k=3)) is client
+    assert qdrant_store.get_client(cfg.override(qdrant_prefer_grpc=True)) is not client
+
+
+def test_bulk_upload_sizes_batches_by_bytes_and_passes_ids_through() -> None:
+    from src.retrieval.qdrant_store import QdrantVectorStore
+    from src.utils.ids import make_point_id
+
+    c = qdrant_client.QdrantClient(":memory:")
+    store = QdrantVectorStore(
+        c, "bulk", bulk=True, upload_parallel=2, upload_batch_bytes=2048
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        store.ensure_collection(4)
+
+    sent = []
+    upload_points = c.upload_points
+    c.upload_points = lambda **kw: sent.append(kw) or upload_points(**kw)
+
+    chunks = [
+        Chunk(
+            source="pdf", doc_id="d", chunk_id=f"pdf::d::{i}", text="x" * 500, meta={}
+        )
+        for i in range(20)
+    ]
+    ids = [make_point_id(ch.chunk_id) for ch in chunks]
+    vectors = [[1.0, 0.0, 0.0, float(i)] for i in range(20)]
+    assert store.upsert(chunks, vectors, ids=ids) == 20
+    store.flush()
+
+    # ~600-byte points in 2 KB requests.
+    first = sent[0]
+    assert first["batch_size"] == 3 and first["parallel"] == 2
+    assert first["wait"] is False
+    assert store.points_exist(ids) == [True] * 20
+
+
+def test_doc_point_ids_and_delete_points(client) -> None:
+    from src.retrieval.qdrant_store import delete_points, doc_point_ids
+    from src.utils.ids import make_point_id
+
+    by_doc = doc_point_ids(client, "kb")
+    assert {d: len(ids) for d, ids in by_doc.items()} == {t: 5 for t in _BOOKS}
+    assert make_point_id("pdf::A.pdf::3") in by_doc["A.pdf"]
+
+    missing = "00000000-0000-0000-0000-000000000001"
+    deleted, freed = delete_points(client, "kb", by_doc["C.pdf"] + [missing])
+    assert deleted == 5 and freed > 5 * 4 * 4
+    assert set(doc_point_ids(client, "kb")) == {"A.pdf", "B.pdf"}
+
+
+def test_dense_dim_of_named_vectors() -> None:
+    from qdrant_client.models import Distance, VectorParams
+
+    from src.retrieval.qdrant_store import _dense_dim
+
+    assert _dense_dim(VectorParams(size=4, distance=Distance.COSINE)) == 4
+    named = {"": VectorParams(size=8, distance=Distance.COSINE)}
+    assert _dense_dim(named) == 8
+
+
+def test_point_alias_replaces_a_legacy_collection_and_swaps_atomically() -> None:
+    from src.retrieval.qdrant_store import point_alias
+
+    c = qdrant_client.QdrantClient(":memory:")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for name in ("kb", "kb__v1", "kb__v2"):
+            ensure_collection(c, name, vector_size=4)
+
+    point_alias(c, "kb", "kb__v1")
+    aliases = c.get_aliases().aliases
+    assert {a.alias_name: a.collection_name for a in aliases} == {"kb": "kb__v1"}
+    assert "kb" not in {col.name for col in c.get_collections().collections}
+
+    point_alias(c, "kb", "kb__v2")
+    aliases = c.get_aliases().aliases
+    assert {a.alias_name: a.collection_name for a in aliases} == {"kb": "kb__v2"}
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+from src.indexing import index_build
+from src.indexing.ingest_pdfs import PDFDoc, doc_id_for
+from src.indexing.reconcile import reconcile
+from src.retrieval.side_store import get_side_store
+from src.retrieval.store_base import get_vector_store
+
+
+class _Embedder:
+    def __init__(self, cfg: Settings) -> None:
+        self.dim = cfg.embedding_dim
+
+    def embed_texts(self, texts, bulk=False):
+        return [
+            [1.0 + (len(t) % 5)] + [0.1 * i for i in range(1, self.dim)] for t in texts
+        ]
+
+
+@pytest.fixture()
+def cfg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    for name in ("stats", "ml", "sql"):
+        (pdf_dir / f"{name}.pdf").write_bytes(b"")
+
+    def fake_ingest(p: Path, root: Path) -> PDFDoc:
+        text = " ".join(f"{p.stem} sentence {i}." for i in range(600))
+        meta = {"source": "pdf", "title": p.name, "page": 1}
+        return PDFDoc(doc_id_for(p), p.name, text, meta)
+
+    monkeypatch.setattr(index_build, "ingest_pdf", fake_ingest)
+    monkeypatch.setattr(index_build, "OpenAIClient", _Embedder)
+    return Settings(
+        embedding_dim=4,
+        vector_backend="numpy",
+        pdf_dir=pdf_dir,
+        artifacts_dir=tmp_path / "artifacts",
+        local_store_dir=tmp_path / "store",
+        qdrant_collection="reconciled",
+        chunk_chars=800,
+        chunk_overlap=100,
+    )
+
+
+def test_reconcile_drops_removed_docs_and_rechunked_tails(cfg: Settings) -> None:
+    first = index_build.index_pdfs(reset=True, cfg=cfg)
+    store = get_vector_store(cfg)
+    assert store.count() == first.chunks_total
+
+    # Larger chunks: fewer chunk ids per document, the old tail stays behind.
+    bigger = cfg.override(chunk_chars=1600)
+    (Path(cfg.pdf_dir) / "sql.pdf").unlink()
+    second = index_build.index_pdfs(cfg=bigger)
+    assert store.count() == first.chunks_total
+
+    dry = reconcile(dry_run=True, cfg=bigger)
+    assert (dry.docs_checked, dry.docs_removed, dry.docs_trimmed) == (3, 1, 2)
+    assert dry.points_stale == first.chunks_total - second.chunks_total
+    assert dry.points_deleted == 0 and store.count() == first.chunks_total
+
+    stats = reconcile(cfg=bigger)
+    assert stats.points_deleted == dry.points_stale and stats.bytes_reclaimed > 0
+    assert store.count() == second.chunks_total
+    kept = {doc_id_for(Path(cfg.pdf_dir) / name) for name in ("stats.pdf", "ml.pdf")}
+    assert set(store.doc_point_ids()) == kept
+
+    # Compaction keeps payloads and vectors aligned.
+    rows = get_side_store(cfg).hydrate(store.search([1.0, 0.1, 0.2, 0.3], top_k=50))
+    assert rows and all(
+        p["title"] in ("stats.pdf", "ml.pdf") and p["text"] for _, p in rows
+    )
+    assert [e.title for e in get_side_store(cfg).catalog()] == ["ml.pdf", "stats.pdf"]
+
+    assert reconcile(cfg=bigger).points_stale == 0
@@ -0,0 +1,155 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.retrieval.qdrant_store import search
+from src.utils.resilience import (
+    CircuitOpenError,
+    DependencyGuard,
+    GuardConfig,
+    get_guard,
+)
+
+
+class FlakyService:
+    """Local stand-in that injects latency and failures per call number."""
+
+    def __init__(self, delays=(), failures=()) -> None:
+        self.delays = list(delays)
+        self.failures = set(failures)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value: str = "ok") -> str:
+        with self._lock:
+            n = self.calls
+            self.calls += 1
+        if n < len(self.delays):
+            time.sleep(self.delays[n])
+        if n in self.failures:
+            raise ConnectionError(f"injected failure on call {n}")
+        return f"{value}-{n}"
+
+
+def test_hedge_beats_slow_primary() -> None:
+    guard = DependencyGuard("t", GuardConfig(timeout_s=2.0, hedge_after_ms=20))
+    svc = FlakyService(delays=[1.0, 0.0])
+
+    start = time.perf_counter()
+    assert guard.call(svc) == "ok-1"
+    assert time.perf_counter() - start < 0.5
+    assert guard.hedges_sent == 1
+
+
+def test_fast_failure_is_raised_without_a_hedge() -> None:
+    guard = DependencyGuard("t", GuardConfig(timeout_s=2.0, hedge_after_ms=500))
+    svc = FlakyService(failures={0})
+
+    with pytest.raises(ConnectionError):
+        guard.call(svc)
+    assert svc.calls == 1 and guard.hedges_sent == 0
+
+
+def test_slow_failure_waits_for_the_hedge() -> None:
+    guard = DependencyGuard("t", GuardConfig(timeout_s=2.0, hedge_after_ms=20))
+    svc = FlakyService(delays=[0.1, 0.2], failures={0})
+
+    assert guard.call(svc) == "ok-1"
+    assert guard.hedges_sent == 1
+
+
+def test_timeout_when_all_attempts_hang() -> None:
+    guard = DependencyGuard("t", GuardConfig(timeout_s=0.1, hedge_after_ms=20))
+    svc = FlakyService(delays=[0.5, 0.5])
+
+    with pytest.raises(TimeoutError):
+        guard.call(svc)
+
+
+def test_breaker_opens_then_recovers() -> None:
+    cfg = GuardConfig(timeout_s=0, hedge=False, failure_threshold=3, reset_after_s=0.05)
+    guard = DependencyGuard("t", cfg)
+    svc = FlakyService(failures={0, 1, 2})
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            guard.call(svc)
+
+    with pytest.raises(CircuitOpenError):
+        guard.call(svc)
+    assert svc.calls == 3
+
+    time.sleep(0.06)
+    assert guard.breaker.state == "half_open"
+    assert guard.call(svc) == "ok-3"
+    assert guard.breaker.state == "closed"
+
+
+def test_search_does_not_retry_on_outage() -> None:
+    calls = []
+
+    class DownClient:
+        def query_points(self, **kwargs):
+            calls.append(kwargs["limit"])
+            raise ConnectionError("qdrant down")
+
+    guard = DependencyGuard(
+        "t", GuardConfig(timeout_s=0, hedge=False, failure_threshold=2)
+    )
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            search(DownClient(), "kb", [0.1, 0.2], top_k=3, guard=guard)
+
+    with pytest.raises(CircuitOpenError):
+        search(DownClient(), "kb", [0.1, 0.2], top_k=3, guard=guard)
+    assert len(calls) == 2
+
+
+def test_search_returns_hedged_result() -> None:
+    svc = FlakyService(delays=[1.0, 0.0])
+
+    class SlowClient:
+        def query_points(self, **kwargs):
+            tag = svc()
+            point = SimpleNamespace(
+                score=0.9, payload={"source": "pdf", "chunk_id": tag}
+            )
+            return SimpleNamespace(points=[point])
+
+    guard = DependencyGuard("t", GuardConfig(timeout_s=2.0, hedge_after_ms=20))
+    rows = search(SlowClient(), "kb", [0.1, 0.2], top_k=1, guard=guard)
+    assert rows[0][1]["chunk_id"] == "ok-1"
+
+
+def test_openai_chat_and_bulk_embeddings_are_not_hedged(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pytest.importorskip("openai")
+    from src.config.settings import Settings
+    from src.llm.openai_client import OpenAIClient, _sdk
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    client = OpenAIClient(Settings())
+
+    assert len({client.embed_guard, client.bulk_guard, client.chat_guard}) == 3
+    assert client.embed_guard.hedge_delay_s() is not None
+    assert client.bulk_guard.hedge_delay_s() is None
+    assert client.chat_guard.hedge_delay_s() is None
+    # The SDK keeps its backoff on 429 and 5xx responses.
+    embed_sdk = _sdk(client.client, client.embed_guard.cfg)
+    assert embed_sdk.max_retries == client.client.max_retries > 0
+
+
+def test_reconfigured_guard_keeps_its_open_breaker() -> None:
+    cfg = GuardConfig(timeout_s=0, hedge=False, failure_threshold=1, reset_after_s=60)
+    guard = get_guard("t-reload", cfg)
+    with pytest.raises(ConnectionError):
+        guard.call(FlakyService(failures={0}))
+
+    same = get_guard("t-reload", GuardConfig(timeout_s=1.0, failure_threshold=3))
+    assert same is guard
+    assert guard.cfg.failure_threshold == 3 and guard.breaker.failure_threshold == 3
+    assert guard.breaker.state == "open"
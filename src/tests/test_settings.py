@@ -0,0 +1,51 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+
+
+@pytest.fixture(autouse=True)
+def _required_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+
+
+def _write(path: Path, top_k: int, mtime_ns: int) -> None:
+    path.write_text(f"retrieval:\n  top_k: {top_k}\n", encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_snapshot_reused_until_mtime_changes(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    _write(path, 8, 1_000_000_000)
+
+    a = Settings.snapshot(path)
+    b = Settings.snapshot(path)
+    assert a is b
+    assert a.top_k == 8
+    assert a.pdf_dir == (tmp_path / "data/raw/books").resolve()
+
+    _write(path, 3, 2_000_000_000)
+    c = Settings.snapshot(path)
+    assert c is not a
+    assert c.top_k == 3
+
+
+def test_snapshot_is_immutable_and_overrides_copy(tmp_path: Path) -> None:
+    path = tmp_path / "config.yaml"
+    _write(path, 8, 1_000_000_000)
+    cfg = Settings.snapshot(path)
+
+    with pytest.raises(Exception):
+        cfg.top_k = 1
+
+    narrow = cfg.override(top_k=2, min_score=None)
+    assert narrow.top_k == 2
+    assert narrow.min_score == cfg.min_score
+    assert cfg.top_k == 8
+    assert cfg.override(top_k=None) is cfg
+
+    with pytest.raises(ValueError):
+        cfg.override(not_a_setting=1)
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import pytest
+
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.retrieval.side_store import SLIM_FIELDS, CatalogEntry, SideStore
+from src.retrieval.store_base import chunk_payload
+from src.schemas import Chunk
+
+
+def _chunks(n: int):
+    return [
+        Chunk(
+            source="pdf",
+            doc_id="d1",
+            chunk_id=f"pdf::d1::{i}",
+            text=f"chunk {i}",
+            meta={"title": "Stats.pdf", "path": "/c/Stats.pdf", "page": i + 1},
+        )
+        for i in range(n)
+    ]
+
+
+def test_slim_store_hydrates_from_side_store(tmp_path: Path) -> None:
+    chunks = _chunks(3)
+    side = SideStore(tmp_path / "side.sqlite")
+    assert side.put_payloads(chunk_payload(c) for c in chunks) == 3
+
+    store = NumpyVectorStore(tmp_path / "kb", slim_payloads=True)
+    store.ensure_collection(2)
+    store.upsert(chunks, [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]])
+
+    rows = store.search([1.0, 0.0], top_k=3)
+    assert all(set(p) <= set(SLIM_FIELDS) for _, p in rows)
+
+    full = side.hydrate(rows)
+    assert [s for s, _ in full] == [s for s, _ in rows]
+    by_id = {p["chunk_id"]: p for _, p in full}
+    assert by_id["pdf::d1::2"]["text"] == "chunk 2"
+    assert by_id["pdf::d1::2"]["page"] == 3
+    assert by_id["pdf::d1::0"]["path"] == "/c/Stats.pdf"
+    assert side.docs(["d1"])["d1"]["title"] == "Stats.pdf"
+
+
+def test_full_payloads_skip_the_side_store(tmp_path: Path) -> None:
+    side = SideStore(tmp_path / "side.sqlite")
+    payloads = [chunk_payload(c) for c in _chunks(2)]
+    assert side.hydrate_payloads(payloads) == payloads
+    assert not side.path.exists()
+
+
+def test_slim_rows_without_their_side_store_fail_loudly(tmp_path: Path) -> None:
+    slim = [(0.9, {"source": "pdf", "doc_id": "d1", "chunk_id": "pdf::d1::0"})]
+    side = SideStore(tmp_path / "elsewhere.sqlite")
+    with pytest.raises(RuntimeError, match="side store"):
+        side.hydrate(slim)
+    assert not side.path.exists()
+
+
+def test_catalog_keeps_indexed_at_until_content_changes(tmp_path: Path) -> None:
+    side = SideStore(tmp_path / "side.sqlite")
+    assert side.catalog() == [] and not side.path.exists()
+
+    side.put_catalog(
+        [
+            CatalogEntry("d1", "Stats.pdf", 3, 100.0, "h1"),
+            CatalogEntry("d2", "ML.pdf", 5, 100.0, "h2"),
+        ]
+    )
+    side.put_catalog(
+        [
+            CatalogEntry("d1", "Stats.pdf", 3, 200.0, "h1"),
+            CatalogEntry("d2", "ML.pdf", 6, 200.0, "h3"),
+        ]
+    )
+
+    by_id = {e.doc_id: e for e in side.catalog()}
+    assert by_id["d1"].indexed_at == 100.0
+    assert by_id["d2"].indexed_at == 200.0 and by_id["d2"].chunks == 6
+    assert side.titles() == ["ML.pdf", "Stats.pdf"]
@@ -0,0 +1,129 @@
+import json
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.config.settings import Settings
+from src.indexing.snapshot import export_bundle, import_bundle, read_header
+from src.retrieval.doc_router import get_doc_store
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.retrieval.side_store import CatalogEntry, get_side_store
+from src.schemas import Chunk
+
+
+@pytest.fixture()
+def cfg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    return Settings(embedding_dim=8, artifacts_dir=tmp_path / "artifacts")
+
+
+def _source_store(root: Path) -> NumpyVectorStore:
+    store = NumpyVectorStore(root)
+    store.ensure_collection(8)
+    chunks = [
+        Chunk(
+            source="pdf",
+            doc_id="d",
+            chunk_id=f"pdf::d::{i}",
+            text=f"text {i}",
+            meta={"title": "A.pdf"} if i % 2 else {"title": "B.pdf", "page": i},
+        )
+        for i in range(50)
+    ]
+    vectors = np.random.default_rng(1).standard_normal((50, 8))
+    store.upsert(chunks, vectors.tolist())
+    return store
+
+
+def test_round_trip_to_local_and_qdrant(tmp_path: Path, cfg: Settings) -> None:
+    src = _source_store(tmp_path / "src")
+    stats = export_bundle(src, tmp_path / "bundle", cfg, dtype="float16")
+    assert stats.points == 50
+
+    header = read_header(tmp_path / "bundle")
+    assert header["dim"] == 8 and header["embed_model"] == cfg.embed_model
+    assert header["chunking"]["chunk_chars"] == cfg.chunk_chars
+    assert np.load(tmp_path / "bundle" / "vectors.npy", mmap_mode="r").shape == (50, 8)
+
+    query = np.random.default_rng(2).standard_normal(8).tolist()
+    expected = [p["chunk_id"] for _, p in src.search(query, top_k=5)]
+
+    slim = cfg.override(slim_payloads=True)
+    dst = NumpyVectorStore(tmp_path / "dst", slim_payloads=True)
+    import_bundle(tmp_path / "bundle", dst, slim, batch_size=16)
+    rows = dst.search(query, top_k=5)
+    assert [p["chunk_id"] for _, p in rows] == expected
+    # Slim payloads get their text and chunk fields back from the side store.
+    assert all("text" not in p for _, p in rows)
+    hydrated = get_side_store(slim).hydrate(dst.search(query, top_k=50))
+    page_rows = [p for _, p in hydrated if p["title"] == "B.pdf"]
+    assert page_rows and all("page" in p and p["text"] for p in page_rows)
+
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from src.retrieval.qdrant_store import QdrantVectorStore
+
+    qstore = QdrantVectorStore(qdrant_client.QdrantClient(":memory:"), "kb")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        import_bundle(tmp_path / "bundle", qstore, cfg)
+        rows = qstore.search(query, top_k=5)
+    assert [p["chunk_id"] for _, p in rows] == expected
+
+
+def test_mismatched_bundle_is_refused(tmp_path: Path, cfg: Settings) -> None:
+    export_bundle(_source_store(tmp_path / "src"), tmp_path / "bundle", cfg)
+    header_path = tmp_path / "bundle" / "header.json"
+    header = json.loads(header_path.read_text())
+    header["embed_model"] = "other-model"
+    header_path.write_text(json.dumps(header))
+
+    with pytest.raises(ValueError, match="embed_model"):
+        import_bundle(tmp_path / "bundle", NumpyVectorStore(tmp_path / "dst"), cfg)
+    import_bundle(
+        tmp_path / "bundle", NumpyVectorStore(tmp_path / "dst"), cfg, force=True
+    )
+
+
+def test_bundle_without_catalog_is_refused(tmp_path: Path, cfg: Settings) -> None:
+    export_bundle(_source_store(tmp_path / "src"), tmp_path / "bundle", cfg)
+    (tmp_path / "bundle" / "catalog.jsonl").unlink()
+
+    with pytest.raises(ValueError, match="catalog"):
+        import_bundle(tmp_path / "bundle", NumpyVectorStore(tmp_path / "dst"), cfg)
+
+
+def test_import_restores_catalog_and_doc_vectors(tmp_path: Path, cfg: Settings) -> None:
+    src = _source_store(tmp_path / "src")
+    entry = CatalogEntry("d", "A.pdf", 50, 1.0, "abc")
+    get_side_store(cfg).put_catalog([entry])
+    export_bundle(src, tmp_path / "bundle", cfg)
+
+    target = cfg.override(
+        artifacts_dir=tmp_path / "other",
+        doc_routing=True,
+        vector_backend="numpy",
+        local_store_dir=tmp_path / "local",
+    )
+    stats = import_bundle(
+        tmp_path / "bundle", NumpyVectorStore(tmp_path / "dst"), target, reset=True
+    )
+    assert get_side_store(target).catalog() == [entry]
+    assert stats.doc_vectors == 1 and get_doc_store(target).count() == 1
+
+
+def test_slim_points_without_side_store_are_not_exported(
+    tmp_path: Path, cfg: Settings
+) -> None:
+    src = _source_store(tmp_path / "src")
+    elsewhere = cfg.override(artifacts_dir=tmp_path / "elsewhere")
+    src.slim_payloads = True
+    src.upsert_points(
+        ["x"],
+        np.ones((1, 8)),
+        [{"source": "pdf", "doc_id": "e", "chunk_id": "pdf::e::0"}],
+    )
+    with pytest.raises(RuntimeError, match="slim payloads"):
+        export_bundle(src, tmp_path / "bundle", elsewhere)
@@ -0,0 +1,119 @@
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.retrieval.numpy_store import NumpyVectorStore
+from src.retrieval.sparse import SparseVocab, tokenize
+from src.schemas import Chunk
+
+TEXTS = [
+    "Linear regression reports R^2 as the share of explained variance.",
+    "Gradient descent updates weights using the learning rate.",
+    "Categorical features are often encoded with one-hot vectors.",
+    "Regularization shrinks weights to reduce variance.",
+]
+
+
+def _chunks():
+    return [
+        Chunk(
+            source="pdf",
+            doc_id="doc",
+            chunk_id=f"pdf::doc::{i}",
+            text=t,
+            meta={"title": "ML.pdf"},
+        )
+        for i, t in enumerate(TEXTS)
+    ]
+
+
+def _dense():
+    # Dense vectors deliberately rank the exact-term chunk last for the query.
+    vectors = np.eye(4, dtype=np.float32)
+    query = np.array([0.1, 1.0, 0.9, 0.8], dtype=np.float32)
+    return vectors, query
+
+
+def test_tokenize_keeps_symbolic_terms() -> None:
+    tokens = tokenize("Report R^2 and use one-hot encoding")
+    assert "r^2" in tokens and "one-hot" in tokens
+    assert {"r", "2", "one", "hot"} <= set(tokens)
+
+
+def test_vocab_scores_exact_term_highest() -> None:
+    vocab = SparseVocab.build(TEXTS)
+    q_idx, q_w = vocab.encode_query("R^2")
+
+    def score(text: str) -> float:
+        d_idx, d_w = vocab.encode_document(text)
+        weights = dict(zip(d_idx, d_w))
+        return sum(w * weights.get(i, 0.0) for i, w in zip(q_idx, q_w))
+
+    scores = [score(t) for t in TEXTS]
+    assert int(np.argmax(scores)) == 0
+
+    # Growing keeps existing term ids stable and carries the counts forward.
+    grown = SparseVocab.build(["ROC AUC curves"], existing=vocab)
+    assert all(grown.terms[t] == i for t, i in vocab.terms.items())
+    assert grown.n_docs == 5 and grown.df[:-3] == vocab.df and vocab.n_docs == 4
+
+
+def test_reindexed_document_replaces_its_counts(tmp_path: Path) -> None:
+    vocab = SparseVocab()
+    vocab.add_document("a", TEXTS[:2])
+    vocab.add_document("b", TEXTS[2:])
+    variance = vocab.terms["variance"]
+    assert vocab.n_docs == 4 and vocab.df[variance] == 2
+
+    vocab.save(tmp_path / "v.json")
+    again = SparseVocab.load(tmp_path / "v.json", with_docs=True)
+    again.add_document("a", ["Gradient descent only."])
+    assert again.n_docs == 3 and again.df[variance] == 1
+    lengths = [len(tokenize(t)) for t in ["Gradient descent only."] + TEXTS[2:]]
+    assert again.avg_len == pytest.approx(sum(lengths) / 3)
+    assert again.df[again.terms["gradient"]] == 1
+
+
+def test_numpy_hybrid_recovers_exact_term(tmp_path: Path) -> None:
+    vocab = SparseVocab.build(TEXTS)
+    vectors, query = _dense()
+    store = NumpyVectorStore(tmp_path / "kb", prefetch_k=4)
+    store.ensure_collection(4)
+    store.upsert(
+        _chunks(), vectors.tolist(), sparse=[vocab.encode_document(t) for t in TEXTS]
+    )
+
+    dense = store.search(query.tolist(), top_k=1)
+    hybrid = store.search(query.tolist(), top_k=1, sparse=vocab.encode_query("R^2"))
+    assert dense[0][1]["chunk_id"] == "pdf::doc::1"
+    assert hybrid[0][1]["chunk_id"] == "pdf::doc::0"
+
+    # Filters apply to the sparse list too.
+    assert store.search(
+        query.tolist(), top_k=4, titles=["Other.pdf"], sparse=vocab.encode_query("R^2")
+    ) == []
+
+
+def test_qdrant_hybrid_query() -> None:
+    qdrant_client = pytest.importorskip("qdrant_client")
+    from src.retrieval.qdrant_store import QdrantVectorStore
+
+    vocab = SparseVocab.build(TEXTS)
+    vectors, query = _dense()
+    store = QdrantVectorStore(
+        qdrant_client.QdrantClient(":memory:"), "kb", hybrid=True, prefetch_k=4
+    )
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        store.ensure_collection(4)
+    store.upsert(
+        _chunks(), vectors.tolist(), sparse=[vocab.encode_document(t) for t in TEXTS]
+    )
+
+    rows, found = store.search_with_vectors(
+        query.tolist(), top_k=1, sparse=vocab.encode_query("R^2")
+    )
+    assert rows[0][1]["chunk_id"] == "pdf::doc::0"
+    assert found.shape == (1, 4)
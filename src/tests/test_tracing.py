@@ -0,0 +1,88 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.retrieval.courses import fan_out
+from src.utils import metrics, tracing
+
+
+@pytest.fixture(autouse=True)
+def _clean():
+    metrics.reset()
+    yield
+    tracing.configure(False)
+    metrics.reset()
+
+
+def test_disabled_spans_are_a_shared_no_op() -> None:
+    tracing.configure(False)
+    with tracing.span("search", k=3) as sp:
+        sp.set(hits=1)
+    assert tracing.span("other") is sp
+    assert tracing.current_trace_id() is None
+    assert metrics.quantiles(tracing.SPAN_METRIC) == {}
+
+
+def test_nested_spans_share_a_trace_and_are_exported(tmp_path: Path) -> None:
+    traces, prom = tmp_path / "traces.jsonl", tmp_path / "metrics.prom"
+    tracing.configure(True, jsonl_path=traces, metrics_file=prom)
+
+    @tracing.traced("search")
+    def search(shard: str) -> str:
+        return tracing.current_trace_id()
+
+    with tracing.span("ask") as root:
+        # Fan-out threads continue the caller's trace.
+        ids = fan_out(["a", "b", "c"], search)
+        with pytest.raises(ValueError):
+            with tracing.span("chat"):
+                raise ValueError("boom")
+
+    assert ids == [root.trace_id] * 3
+    rows = [json.loads(line) for line in traces.read_text().splitlines()]
+    assert {r["trace_id"] for r in rows} == {root.trace_id}
+    assert [r["name"] for r in rows if r["parent_id"] is None] == ["ask"]
+    assert all(r["parent_id"] == root.span_id for r in rows if r["name"] != "ask")
+    chat = next(r for r in rows if r["name"] == "chat")
+    assert chat["attrs"] == {"error": "ValueError"}
+
+    summary = metrics.quantiles(tracing.SPAN_METRIC)
+    assert summary["search"]["count"] == 3 and summary["ask"]["count"] == 1
+    text = prom.read_text()
+    assert '# TYPE span_duration_seconds histogram' in text
+    assert 'span_duration_seconds_bucket{span="search",le="+Inf"} 3' in text
+    assert 'span_duration_seconds_count{span="ask"} 1' in text
+
+
+def test_histogram_quantiles_interpolate_within_buckets() -> None:
+    for v in [0.003] * 50 + [0.2] * 45 + [3.0] * 5:
+        metrics.observe("lat_seconds", v, stage="x")
+    q = metrics.quantiles("lat_seconds")["x"]
+    assert 0.0025 < q["p50"] <= 0.005
+    assert 0.1 < q["p95"] <= 0.25
+    assert 2.5 < q["p99"] <= 5.0
+    assert q["mean"] == pytest.approx((0.15 + 9.0 + 15.0) / 100)
+
+
+def test_first_request_opens_a_real_root_span(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    from src.agent import pipeline
+    from src.schemas import AnswerResult
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    traces = tmp_path / "traces.jsonl"
+    (tmp_path / "config.yaml").write_text(
+        f"tracing:\n  enabled: true\n  jsonl: {traces}\n", encoding="utf-8"
+    )
+    monkeypatch.chdir(tmp_path)
+    answer = AnswerResult(answer="ok", citations=[], warnings=[])
+    monkeypatch.setattr(pipeline, "_ask", lambda question, **kwargs: answer)
+
+    tracing.configure(False)
+    assert pipeline.ask("what is R^2?") is answer
+    tracing.configure(False)  # closes the trace file
+    rows = [json.loads(line) for line in traces.read_text().splitlines()]
+    assert [r["name"] for r in rows if r["parent_id"] is None][-1] == "ask"
@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import pytest
+
+from src.config.settings import Settings
+from src.indexing import index_build
+from src.indexing.ingest_pdfs import PDFDoc, doc_id_for
+from src.retrieval.query_cache import index_version_path, index_version
+from src.retrieval.side_store import get_side_store
+from src.retrieval import store_base
+from src.retrieval.store_base import get_vector_store
+from src.retrieval.versions import list_versions, rollback, storage_name
+
+
+class _Embedder:
+    def __init__(self, cfg: Settings) -> None:
+        self.dim = cfg.embedding_dim
+
+    def embed_texts(self, texts, bulk=False):
+        return [[float(len(t) % 11) + 1.0, float(len(t) % 3), 1.0, 0.5] for t in texts]
+
+
+@pytest.fixture()
+def cfg(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Settings:
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("QDRANT_URL", "http://localhost:6333")
+    pdf_dir = tmp_path / "pdfs"
+    pdf_dir.mkdir()
+    for name in ("stats", "ml", "sql"):
+        (pdf_dir / f"{name}.pdf").write_bytes(b"")
+
+    def fake_ingest(p: Path, root: Path) -> PDFDoc:
+        text = " ".join(f"{p.stem} line {i}." for i in range(300))
+        return PDFDoc(doc_id_for(p), p.name, text, {"source": "pdf", "title": p.name})
+
+    monkeypatch.setattr(index_build, "ingest_pdf", fake_ingest)
+    monkeypatch.setattr(index_build, "OpenAIClient", _Embedder)
+    return Settings(
+        embedding_dim=4,
+        vector_backend="numpy",
+        pdf_dir=pdf_dir,
+        artifacts_dir=tmp_path / "artifacts",
+        local_store_dir=tmp_path / "store",
+        qdrant_collection="kb",
+        chunk_chars=600,
+        blue_green=True,
+        keep_versions=2,
+    )
+
+
+def test_rebuilds_go_live_only_when_complete_and_can_roll_back(cfg: Settings) -> None:
+    first = index_build.index_pdfs(reset=True, cfg=cfg)
+    assert storage_name(cfg) == "kb__v1"
+    alias_store = get_vector_store(cfg)
+    assert alias_store.count() == first.chunks_total
+
+    # Larger chunks mean fewer points; the point-count check has to allow it.
+    index_build.index_pdfs(
+        reset=True, cfg=cfg.override(chunk_chars=1200, smoke_min_ratio=0.2)
+    )
+    assert storage_name(cfg) == "kb__v2" and list_versions(cfg) == ["kb__v1", "kb__v2"]
+    # Reads through the alias follow the switch: vectors and side store together.
+    rows = get_side_store(cfg).hydrate(
+        get_vector_store(cfg).search([1.0, 0.0, 1.0, 0.5], top_k=3)
+    )
+    assert rows and all(p["text"] for _, p in rows)
+    assert get_vector_store(cfg).count() < first.chunks_total
+
+    before = index_version(index_version_path(cfg))
+    assert rollback(cfg) == "kb__v1"
+    assert get_vector_store(cfg).count() == first.chunks_total
+    assert index_version(index_version_path(cfg)) != before
+
+    index_build.index_pdfs(reset=True, cfg=cfg)
+    assert list_versions(cfg) == ["kb__v1", "kb__v3"]
+    assert not (Path(cfg.local_store_dir) / "kb__v2").exists()
+    assert not list(Path(cfg.artifacts_dir).glob("kb__v2.*"))
+    # Pruned versions leave no cached store behind.
+    assert not [k for k in store_base._STORES if k[-1] == "kb__v2"]
+
+
+def test_cached_store_follows_reloaded_settings(cfg: Settings) -> None:
+    store = get_vector_store(cfg)
+    assert get_vector_store(cfg) is store
+
+    reloaded = get_vector_store(cfg.override(hybrid_prefetch=8))
+    assert reloaded is not store and reloaded.prefetch_k == 8
+
+
+def test_failed_smoke_check_keeps_the_live_version(cfg: Settings) -> None:
+    index_build.index_pdfs(reset=True, cfg=cfg)
+    for name in ("ml", "sql"):
+        (Path(cfg.pdf_dir) / f"{name}.pdf").unlink()
+
+    with pytest.raises(RuntimeError, match="smoke checks"):
+        index_build.index_pdfs(reset=True, cfg=cfg)
+    assert storage_name(cfg) == "kb__v1" and list_versions(cfg) == ["kb__v1"]
+
+    # Incremental runs write into the live version behind the alias.
+    stats = index_build.index_pdfs(cfg=cfg)
+    assert stats.chunks_missing == 0 and storage_name(cfg) == "kb__v1"
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from src.utils import metrics
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and approximate bytes, with a TTL.
+
+    Lookups and evictions are counted in ``src.utils.metrics`` under
+    ``cache_{hits,misses,evictions}_total{cache=<name>}``. The running hit
+    ratio goes to the ``cache_hit_ratio`` gauge.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        max_entries: int,
+        max_bytes: int,
+        ttl_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl_s = float(ttl_s)
+        self._clock = clock
+        # key -> (expires_at, size, value)
+        self._data: "OrderedDict[Hashable, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] < self._clock():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+            else:
+                self._data.move_to_end(key)
+                self._hits += 1
+            hits, total = self._hits, self._hits + self._misses
+
+        metrics.inc(
+            "cache_hits_total" if entry is not None else "cache_misses_total",
+            cache=self.name,
+        )
+        metrics.set_gauge("cache_hit_ratio", hits / total, cache=self.name)
+        return entry[2] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        if size > self.max_bytes or self.max_entries == 0:
+            return
+        evicted = 0
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (self._clock() + self.ttl_s, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                evicted += 1
+            nbytes = self._bytes
+
+        if evicted:
+            metrics.inc("cache_evictions_total", evicted, cache=self.name)
+        metrics.set_gauge("cache_bytes", nbytes, cache=self.name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
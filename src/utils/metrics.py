@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Sequence, Tuple
+
+# (metric name, sorted label pairs)
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+# Upper bounds in seconds, spaced for latencies from a cache hit to an LLM call.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+    0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+_LOCK = threading.Lock()
+_COUNTERS: Dict[_Key, float] = {}
+_GAUGES: Dict[_Key, float] = {}
+_HISTOGRAMS: Dict[_Key, "_Histogram"] = {}
+
+
+class _Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        # One count per bound plus the +Inf bucket; not cumulative.
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate by linear interpolation inside the bucket holding rank ``q``."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                if i == len(self.bounds):
+                    return lo  # +Inf bucket: the largest finite bound is all we know
+                return lo + (self.bounds[i] - lo) * (rank - seen) / n
+            seen += n
+        return self.bounds[-1]
+
+
+def _key(name: str, labels: Dict[str, str]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name: str, value: float = 1.0, **labels: str) -> None:
+    key = _key(name, labels)
+    with _LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    with _LOCK:
+        _GAUGES[_key(name, labels)] = float(value)
+
+
+def observe(
+    name: str, value: float, buckets: Sequence[float] = LATENCY_BUCKETS, **labels: str
+) -> None:
+    """Add ``value`` to a histogram; ``buckets`` apply when the series is first seen."""
+    key = _key(name, labels)
+    with _LOCK:
+        hist = _HISTOGRAMS.get(key)
+        if hist is None:
+            hist = _HISTOGRAMS[key] = _Histogram(buckets)
+        hist.observe(value)
+
+
+def quantiles(
+    name: str, qs: Sequence[float] = (0.5, 0.95, 0.99)
+) -> Dict[str, Dict[str, float]]:
+    """Per-series count, mean and estimated quantiles of histogram ``name``.
+
+    Series are keyed by their label values joined with ``,`` (e.g. the span name).
+    """
+    out: Dict[str, Dict[str, float]] = {}
+    with _LOCK:
+        for (hname, labels), hist in sorted(_HISTOGRAMS.items()):
+            if hname != name or not hist.count:
+                continue
+            row = {"count": float(hist.count), "mean": hist.total / hist.count}
+            row.update({f"p{round(q * 100):d}": hist.quantile(q) for q in qs})
+            out[",".join(v for _, v in labels)] = row
+    return out
+
+
+def get(name: str, **labels: str) -> float:
+    key = _key(name, labels)
+    with _LOCK:
+        return _COUNTERS.get(key, _GAUGES.get(key, 0.0))
+
+
+def peak_rss_mb() -> float:
+    """Highest resident set size of this process so far; 0.0 where it is unavailable."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def reset() -> None:
+    with _LOCK:
+        _COUNTERS.clear()
+        _GAUGES.clear()
+        _HISTOGRAMS.clear()
+
+
+def render_prometheus() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _LOCK:
+        counters = sorted(_COUNTERS.items())
+        gauges = sorted(_GAUGES.items())
+        histograms = [
+            (key, h.bounds, list(h.counts), h.total, h.count)
+            for key, h in sorted(_HISTOGRAMS.items())
+        ]
+
+    lines = []
+    for kind, items in (("counter", counters), ("gauge", gauges)):
+        typed = set()
+        for (name, labels), value in items:
+            if name not in typed:
+                lines.append(f"# TYPE {name} {kind}")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value:g}")
+
+    typed = set()
+    for (name, labels), bounds, counts, total, count in histograms:
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, n in zip(list(bounds) + [math.inf], counts):
+            cumulative += n
+            le = "+Inf" if bound == math.inf else f"{bound:g}"
+            lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {total:g}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+
+
+def write_prometheus(path: Path) -> None:
+    """Write ``render_prometheus()`` atomically, for node_exporter's textfile
+    collector."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(render_prometheus(), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+_SERVERS: Dict[int, Any] = {}
+
+
+def serve_prometheus(port: int, host: str = "127.0.0.1") -> None:
+    """Serve ``render_prometheus()`` over HTTP from a daemon thread; once per port."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    with _LOCK:
+        if port in _SERVERS:
+            return
+        server = ThreadingHTTPServer((host, port), Handler)
+        _SERVERS[port] = server
+    threading.Thread(
+        target=server.serve_forever, name=f"metrics-{port}", daemon=True
+    ).start()
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a dependency's circuit breaker is open and calls fail fast."""
+
+
+@dataclass(frozen=True)
+class GuardConfig:
+    timeout_s: float = 10.0
+    hedge: bool = True
+    hedge_after_ms: float = 250.0
+    hedge_quantile: float = 0.95
+    failure_threshold: int = 5
+    reset_after_s: float = 30.0
+
+
+class LatencyWindow:
+    """Rolling window of successful call latencies, used to pick the hedge delay."""
+
+    def __init__(self, size: int = 256, min_samples: int = 20) -> None:
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self._min_samples:
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[idx]
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open probe after cool-down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_after_s: float = 30.0) -> None:
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.configure(failure_threshold, reset_after_s)
+
+    def configure(self, failure_threshold: int, reset_after_s: float) -> None:
+        """Change the limits; an open breaker stays open."""
+        with self._lock:
+            self.failure_threshold = max(1, int(failure_threshold))
+            self.reset_after_s = float(reset_after_s)
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked(time.monotonic())
+
+    def _state_locked(self, now: float) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_after_s:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._state_locked(time.monotonic())
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        raise CircuitOpenError("circuit open; failing fast")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+class DependencyGuard:
+    """Per-dependency timeout, hedging and circuit breaking around a callable.
+
+    The hedge delay is the observed latency quantile (p95 by default) once enough
+    samples exist, and ``hedge_after_ms`` until then. Hedging is only meant for
+    idempotent reads such as searches, embeddings and chat completions. Errors
+    are never hedged: a request that failed fast would most likely fail again.
+    """
+
+    def __init__(self, name: str, cfg: Optional[GuardConfig] = None) -> None:
+        self.name = name
+        self.cfg = cfg or GuardConfig()
+        self.breaker = CircuitBreaker(
+            self.cfg.failure_threshold, self.cfg.reset_after_s
+        )
+        self.latency = LatencyWindow()
+        self.hedges_sent = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=16, thread_name_prefix=f"guard-{name}"
+        )
+
+    def reconfigure(self, cfg: GuardConfig) -> None:
+        """Apply new settings, keeping breaker state, latency samples and threads."""
+        self.cfg = cfg
+        self.breaker.configure(cfg.failure_threshold, cfg.reset_after_s)
+
+    def hedge_delay_s(self) -> Optional[float]:
+        if not self.cfg.hedge:
+            return None
+        observed = self.latency.quantile(self.cfg.hedge_quantile)
+        if observed is not None:
+            return observed
+        return max(0.0, self.cfg.hedge_after_ms / 1000.0)
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        self.breaker.before_call()
+        start = time.perf_counter()
+        try:
+            result = self._run(fn, args, kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        self.latency.add(time.perf_counter() - start)
+        return result
+
+    def _run(self, fn: Callable[..., T], args: Any, kwargs: Any) -> T:
+        timeout = self.cfg.timeout_s if (self.cfg.timeout_s or 0) > 0 else None
+        hedge_delay = self.hedge_delay_s()
+        if timeout is None and hedge_delay is None:
+            return fn(*args, **kwargs)
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        pending = {self._executor.submit(fn, *args, **kwargs)}
+        hedged = hedge_delay is None
+        last_exc: Optional[BaseException] = None
+
+        while pending:
+            remaining = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            wait_for = remaining
+            if not hedged:
+                wait_for = (
+                    hedge_delay if remaining is None else min(hedge_delay, remaining)
+                )
+
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for fut in done:
+                exc = fut.exception()
+                if exc is None:
+                    return fut.result()
+                last_exc = exc
+
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+            # Launch the duplicate once the hedge delay passes with the primary
+            # still running, and never more than one extra attempt.
+            if not hedged and not done:
+                hedged = True
+                self.hedges_sent += 1
+                pending.add(self._executor.submit(fn, *args, **kwargs))
+
+        if pending:
+            raise TimeoutError(f"{self.name} call exceeded {self.cfg.timeout_s:.2f}s")
+        assert last_exc is not None
+        raise last_exc
+
+
+_GUARDS: Dict[str, DependencyGuard] = {}
+_GUARDS_LOCK = threading.Lock()
+
+
+def get_guard(name: str, cfg: Optional[GuardConfig] = None) -> DependencyGuard:
+    """Return the process-wide guard for ``name``; all callers share its breaker.
+
+    A different ``cfg`` (e.g. after a settings reload) updates the existing
+    guard in place, so an open breaker stays open.
+    """
+    with _GUARDS_LOCK:
+        guard = _GUARDS.get(name)
+        if guard is None:
+            guard = DependencyGuard(name, cfg)
+            _GUARDS[name] = guard
+        elif cfg is not None and guard.cfg != cfg:
+            guard.reconfigure(cfg)
+        return guard
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, TextIO, TypeVar
+
+from src.utils import metrics
+
+if TYPE_CHECKING:
+    from src.config.settings import Settings
+
+# Histogram of span durations, labelled by span name.
+SPAN_METRIC = "span_duration_seconds"
+
+# Root spans rewrite the metrics file at most this often.
+_METRICS_FILE_EVERY_S = 1.0
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class _State:
+    """Process-wide tracing switches; ``enabled`` is the only thing checked when off."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.jsonl_path: Optional[Path] = None
+        self.metrics_file: Optional[Path] = None
+        self.config: tuple = ()
+        self.lock = threading.Lock()
+        self.sink: Optional[TextIO] = None
+        self.metrics_written = 0.0
+
+
+_STATE = _State()
+_CURRENT: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "span", default=None
+)
+
+
+class _NoSpan:
+    """Returned by ``span`` while tracing is off: a shared do-nothing context."""
+
+    __slots__ = ()
+    trace_id = None
+
+    def __enter__(self) -> "_NoSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+class Span:
+    """One timed step. Nested spans share the root's ``trace_id`` (the request id)."""
+
+    __slots__ = (
+        "name", "attrs", "trace_id", "span_id", "parent_id",
+        "start", "duration_s", "_t0", "_token",
+    )
+
+    def __init__(self, name: str, attrs: Dict[str, Any]) -> None:
+        self.name = name
+        self.attrs = attrs
+        self.duration_s = 0.0
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        parent = _CURRENT.get()
+        self.trace_id = parent.trace_id if parent is not None else uuid.uuid4().hex
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = uuid.uuid4().hex[:16]
+        self._token = _CURRENT.set(self)
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self.duration_s = time.perf_counter() - self._t0
+        _CURRENT.reset(self._token)
+        metrics.observe(SPAN_METRIC, self.duration_s, span=self.name)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        _finish(self)
+        return False
+
+
+def span(name: str, **attrs: Any):
+    """Time the enclosed block as ``name``; when off, a no-op costing one check."""
+    if not _STATE.enabled:
+        return _NO_SPAN
+    return Span(name, attrs)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator form of ``span``."""
+
+    def wrap(fn: F) -> F:
+        @functools.wraps(fn)
+        def inner(*args: Any, **kwargs: Any) -> Any:
+            if not _STATE.enabled:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+
+        return inner  # type: ignore[return-value]
+
+    return wrap
+
+
+def current_trace_id() -> Optional[str]:
+    current = _CURRENT.get()
+    return current.trace_id if current is not None else None
+
+
+def configure(
+    enabled: bool,
+    *,
+    jsonl_path: Optional[Path] = None,
+    metrics_file: Optional[Path] = None,
+) -> None:
+    """Switch tracing on or off; cheap to call again with the same values."""
+    config = (bool(enabled), jsonl_path, metrics_file)
+    if config == _STATE.config:
+        return
+    with _STATE.lock:
+        if _STATE.sink is not None:
+            _STATE.sink.close()
+            _STATE.sink = None
+        _STATE.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        _STATE.metrics_file = Path(metrics_file) if metrics_file else None
+        _STATE.config = config
+        _STATE.enabled = config[0]
+
+
+def configure_from(cfg: Settings) -> None:
+    configure(
+        cfg.tracing_enabled, jsonl_path=cfg.trace_jsonl, metrics_file=cfg.metrics_file
+    )
+    if cfg.tracing_enabled and cfg.metrics_port:
+        metrics.serve_prometheus(cfg.metrics_port, cfg.metrics_host)
+
+
+def _finish(s: Span) -> None:
+    if _STATE.jsonl_path is not None:
+        record = {
+            "trace_id": s.trace_id,
+            "span_id": s.span_id,
+            "parent_id": s.parent_id,
+            "name": s.name,
+            "start": s.start,
+            "duration_ms": round(s.duration_s * 1000, 3),
+            "attrs": s.attrs,
+        }
+        line = json.dumps(record, default=str) + "\n"
+        with _STATE.lock:
+            if _STATE.sink is None and _STATE.jsonl_path is not None:
+                _STATE.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+                _STATE.sink = _STATE.jsonl_path.open("a", encoding="utf-8")
+            if _STATE.sink is not None:
+                _STATE.sink.write(line)
+                if s.parent_id is None:
+                    _STATE.sink.flush()
+
+    if s.parent_id is None and _STATE.metrics_file is not None:
+        now = time.monotonic()
+        if now - _STATE.metrics_written >= _METRICS_FILE_EVERY_S:
+            _STATE.metrics_written = now
+            metrics.write_prometheus(_STATE.metrics_file)